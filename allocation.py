@@ -0,0 +1,111 @@
+"""Split an investment across Gecelik Mevduat, Gecelik Repo and funds.
+
+Every product's net result (after commission, BSMV and stopaj) is
+proportional to the amount placed in it, so a product has one fixed net
+return per TL for a given horizon, and the net result of an allocation is
+its weights times those rates. Maximising a linear objective under
+per-product caps, a minimum deposit share and a budget is a fractional
+knapsack: fill products in order of return per TL up to their caps. With
+one cap shared by all funds, keeping the ``max_funds`` best funds is optimal
+for the fund-count limit. The solution is therefore exact, without searching
+candidate allocations.
+
+``evaluate_allocations`` prices any number of candidate allocations in one
+matrix product, e.g. to compare the optimum with the single best product.
+"""
+import numpy as np
+
+from calculations import BSMV_RATE, fixed_income_returns, fund_returns, top_k
+
+DEPOSIT, REPO = 0, 1
+
+# Position of the funds' results in product_rates
+FUNDS = 2
+
+
+def product_rates(duration_days, deposit, repo, fund_daily_returns, bsmv_rate=BSMV_RATE, fund_costs=(0.0, 0.0)):
+    """Net result per TL of every product: deposit, repo, then each fund.
+
+    ``deposit`` and ``repo`` are ``(interest_rate, commission_rate, tax_rate)``
+    tuples in percent, ``fund_costs`` the funds' ``(commission_rate,
+    tax_rate)`` and ``bsmv_rate`` one rate for all products or a (deposit,
+    repo, fund) triple, as in ``calculate_growth``. Also returns the per-TL
+    commission, BSMV and stopaj of every product for the cost breakdown.
+    """
+    bsmv_deposit, bsmv_repo, bsmv_fund = np.broadcast_to(bsmv_rate, (3,))
+    results = [
+        fixed_income_returns(1.0, duration_days, *deposit, bsmv_rate=bsmv_deposit),
+        fixed_income_returns(1.0, duration_days, *repo, bsmv_rate=bsmv_repo),
+        fund_returns(
+            1.0, duration_days, np.asarray(fund_daily_returns, dtype=float),
+            commission_rate=fund_costs[0], tax_rate=fund_costs[1], bsmv_rate=bsmv_fund
+        ),
+    ]
+    fund_count = np.asarray(fund_daily_returns).size
+    per_product = lambda key: np.concatenate([
+        [results[DEPOSIT][key], results[REPO][key]],
+        np.broadcast_to(results[FUNDS][key], fund_count)
+    ]).astype(float)
+    rates = per_product("net_return")
+    # Funds without a return cost nothing as they never receive money
+    costs = {key: np.nan_to_num(per_product(key), nan=0.0) for key in ("commission", "bsmv", "tax")}
+    return rates, costs
+
+
+def evaluate_allocations(investment_amount, rates, weights):
+    """Net result of each candidate allocation (rows of ``weights``, shares summing to 1)."""
+    return investment_amount * (np.asarray(weights, dtype=float) @ np.nan_to_num(rates, nan=0.0))
+
+
+def optimize_allocation(investment_amount, duration_days, deposit, repo, fund_daily_returns,
+                        max_deposit_share=1.0, max_repo_share=1.0, max_fund_share=1.0,
+                        min_deposit_share=0.0, max_funds=None, bsmv_rate=BSMV_RATE, fund_costs=(0.0, 0.0)):
+    """Best split of ``investment_amount`` for a horizon under the given constraints.
+
+    Shares are fractions of the amount. ``bsmv_rate`` and ``fund_costs``
+    are passed to ``product_rates``. Funds without a return are never used. Raises ``ValueError`` when the caps cannot hold the whole amount.
+
+    Returns a dict: ``weights`` and ``amounts`` per product (deposit, repo,
+    then funds), ``net_returns`` per product, ``net_return``,
+    ``final_balance``, the total ``commission``, ``bsmv`` and ``tax`` in ₺,
+    and ``fund_count``.
+    """
+    if min_deposit_share > max_deposit_share:
+        raise ValueError("Minimum deposit share is above the deposit cap")
+
+    rates, costs = product_rates(duration_days, deposit, repo, fund_daily_returns, bsmv_rate, fund_costs)
+    fund_rates = rates[2:]
+    usable = ~np.isnan(fund_rates)
+
+    # Only the best max_funds funds may receive money
+    fund_caps = np.where(usable, max_fund_share, 0.0)
+    if max_funds is not None and max_funds < usable.sum():
+        allowed = np.zeros(fund_rates.size, dtype=bool)
+        allowed[top_k(np.where(usable, fund_rates, -np.inf), max_funds)] = True
+        fund_caps = np.where(allowed, fund_caps, 0.0)
+    caps = np.concatenate([[max_deposit_share, max_repo_share], fund_caps])
+
+    weights = np.zeros(rates.size)
+    weights[DEPOSIT] = min_deposit_share
+    remaining = 1.0 - weights.sum()
+    if caps.sum() - weights.sum() < remaining - 1e-12:
+        raise ValueError("The product caps add up to less than the whole amount")
+
+    # Fill products from the best return per TL down, each up to its cap
+    order = np.argsort(np.where(np.isnan(rates), -np.inf, rates), kind="stable")[::-1]
+    headroom = caps[order] - weights[order]
+    filled_before = np.cumsum(headroom) - headroom
+    weights[order] += np.clip(remaining - filled_before, 0.0, headroom)
+
+    amounts = investment_amount * weights
+    net_returns = amounts * np.nan_to_num(rates, nan=0.0)
+    net_return = float(net_returns.sum())
+    return {
+        "weights": weights,
+        "amounts": amounts,
+        "net_returns": net_returns,
+        "net_return": net_return,
+        "final_balance": investment_amount + net_return,
+        **{key: float(amounts @ values) for key, values in costs.items()},
+        "fund_count": int((weights[2:] > 0).sum()),
+    }
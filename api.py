@@ -0,0 +1,314 @@
+"""Local JSON API over the same comparison engine as the pages.
+
+    python api.py                        # http://127.0.0.1:8502
+    python api.py --host 0.0.0.0 --port 9000
+
+Endpoints:
+
+- ``GET /funds``: every fund with its name, latest daily return and date
+- ``POST /compare``: one scenario, e.g.
+  ``{"amount": 100000, "days": 30, "fund": "AAL", "deposit_rate": 45.5}``
+- ``POST /batch``: a list of scenarios (or ``{"scenarios": [...]}``)
+
+Both reject a request naming a fund that is not in the fund file with a
+404 listing the unknown codes; a fund without a daily return is priced with
+empty fund fields and never wins.
+- ``GET /export/{csv,parquet,xlsx}``: the day-by-day schedule of the deposit,
+  the repo and the funds in ``funds`` (comma separated), streamed as it is
+  generated, e.g. ``/export/csv?amount=100000&days=3650&funds=AAL,HVT``; funds without
+  a daily return are rejected with a 400
+- ``GET /metrics``: the process metrics in Prometheus text format
+
+Scenarios use the columns of ``batch.py`` (``amount``, ``days``, ``fund`` and
+the optional rate, commission and stopaj overrides) and are priced by
+``batch.price_scenarios``, so the numbers match the pages and the batch CLI.
+
+The service runs on Starlette and uvicorn (see requirements.txt). Funds
+come from ``dataset.get_fund_dataset``, the same cached ``load_fund_data``
+copy the pages read (refreshed hourly). Responses are cached by the
+normalized request, the dataset version and the valuation date the fee
+schedule is read for: the JSON body is parsed, rounded and re-serialized
+with sorted keys, so requests that differ only in key order, spacing or
+float noise share an entry. Loading the dataset (a fetch and parse on a
+cold start or an hourly refresh) and pricing batches run in a worker
+thread, so neither holds up the event loop for other requests.
+"""
+import argparse
+import functools
+import json
+import math
+from datetime import date
+
+import numpy as np
+import pandas as pd
+from anyio import to_thread
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse, PlainTextResponse, Response, StreamingResponse
+from starlette.routing import Route
+
+import metrics
+from batch import DEFAULT_DEPOSIT_RATE, DEFAULT_REPO_RATE, MAX_AMOUNT, MAX_DAYS, RATE_LIMITS, price_scenarios
+from dataset import get_fund_dataset
+from export import FORMATS, export_stream, fixed_income_product, fund_product
+from fees import DEPOSIT, FUND, REPO, get_fee_schedule
+
+DEFAULT_PORT = 8502
+
+# Largest batch accepted in one request
+MAX_BATCH_ROWS = 100_000
+
+# Responses kept per process; batch bodies can be megabytes, so fewer of them
+COMPARE_CACHE_ENTRIES = 4096
+BATCH_CACHE_ENTRIES = 16
+
+SCENARIO_FIELDS = (
+    "amount", "days", "fund",
+    "deposit_rate", "deposit_commission_rate", "deposit_tax_rate",
+    "repo_rate", "repo_commission_rate", "repo_tax_rate",
+    "fund_commission_rate", "fund_tax_rate",
+)
+
+
+class RequestError(ValueError):
+    """A request the API rejects, with its HTTP status."""
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+@functools.lru_cache(maxsize=2)
+def _fund_returns(funds):
+    """Latest returns by code, built once per dataset object."""
+    return pd.Series(funds.returns, index=funds.codes)
+
+
+def _number(scenario, field):
+    """Finite float of a scenario field."""
+    try:
+        # JSON true/false would otherwise pass as 1 and 0
+        if isinstance(scenario[field], bool):
+            raise ValueError
+        number = float(scenario[field])
+    except (TypeError, ValueError):
+        raise RequestError(f"{field} must be a finite number")
+    if not math.isfinite(number):
+        raise RequestError(f"{field} must be a finite number")
+    return number
+
+
+def normalize_scenario(scenario):
+    """Validated scenario with only the known fields and floats rounded."""
+    if not isinstance(scenario, dict):
+        raise RequestError("Every scenario must be a JSON object")
+    missing = [field for field in ("amount", "days", "fund") if scenario.get(field) is None]
+    if missing:
+        raise RequestError(f"Missing fields: {', '.join(missing)}")
+    unknown = set(scenario) - set(SCENARIO_FIELDS)
+    if unknown:
+        raise RequestError(f"Unknown fields: {', '.join(sorted(unknown))}")
+
+    normalized = {"fund": str(scenario["fund"]), "amount": round(_number(scenario, "amount"), 2)}
+    days = _number(scenario, "days")
+    if not days.is_integer():
+        raise RequestError("days must be a whole number")
+    normalized["days"] = int(days)
+    if not 0 < normalized["amount"] <= MAX_AMOUNT or not 1 <= normalized["days"] <= MAX_DAYS:
+        raise RequestError(f"amount must be positive and days between 1 and {MAX_DAYS}")
+
+    for field in SCENARIO_FIELDS[3:]:
+        if scenario.get(field) is not None:
+            value = _number(scenario, field)
+            low, high = RATE_LIMITS[field]
+            if not low <= value <= high:
+                raise RequestError(f"{field} must be between {low} and {high}")
+            normalized[field] = round(value, 6)
+    return normalized
+
+
+def price(scenarios, on):
+    """JSON records of normalized scenarios priced against the current dataset with the fees in force ``on``."""
+    funds = get_fund_dataset()
+    frame = pd.DataFrame.from_records(scenarios, columns=SCENARIO_FIELDS)
+    priced = price_scenarios(
+        frame,
+        _fund_returns(funds),
+        get_fee_schedule(),
+        deposit_rate=DEFAULT_DEPOSIT_RATE,
+        repo_rate=DEFAULT_REPO_RATE,
+        on=on
+    )
+    # normalize_scenario already rejected everything price_scenarios would flag
+    return priced.drop(columns="error").round(2).to_json(orient="records", force_ascii=False)
+
+
+# version and on are part of the cache keys, so a new dataset or a day on
+# which another fee rule is in force misses the cache
+
+@functools.lru_cache(maxsize=COMPARE_CACHE_ENTRIES)
+def _compare_body(canonical, version, on):
+    with metrics.span("api_compare"):
+        # The single record, not a list of one
+        return price(json.loads(canonical), on)[1:-1].encode("utf-8")
+
+
+@functools.lru_cache(maxsize=BATCH_CACHE_ENTRIES)
+def _batch_body(canonical, version, on):
+    with metrics.span("api_batch"):
+        return price(json.loads(canonical), on).encode("utf-8")
+
+
+def _cache_stats(cached):
+    info = cached.cache_info()
+    return {"hits": info.hits, "misses": info.misses, "entries": info.currsize}
+
+
+metrics.registry.register_cache("api_compare", functools.partial(_cache_stats, _compare_body))
+metrics.registry.register_cache("api_batch", functools.partial(_cache_stats, _batch_body))
+
+
+async def _json_body(request):
+    try:
+        return json.loads(await request.body())
+    except ValueError:
+        raise RequestError("Body must be JSON")
+
+
+def _canonical(scenarios):
+    return json.dumps(scenarios, sort_keys=True, separators=(",", ":"))
+
+
+def _error(error):
+    return JSONResponse({"error": str(error)}, status_code=error.status)
+
+
+async def _fund_dataset():
+    """The shared dataset, loaded off the event loop when it has to be fetched."""
+    return await to_thread.run_sync(get_fund_dataset)
+
+
+def _check_known(codes, funds):
+    unknown = [code for code in dict.fromkeys(codes) if code not in funds.index]
+    if unknown:
+        raise RequestError(f"Unknown funds: {', '.join(unknown)}", status=404)
+
+
+async def funds_endpoint(request):
+    metrics.count("api_requests", endpoint="funds")
+    funds = await _fund_dataset()
+    body = pd.DataFrame({
+        "code": funds.codes,
+        "name": funds.names,
+        "daily_return": funds.returns,
+        "date": pd.Series(funds.dates).dt.strftime("%Y-%m-%d"),
+    }).to_json(orient="records", force_ascii=False)
+    return Response(body, media_type="application/json")
+
+
+async def compare_endpoint(request):
+    metrics.count("api_requests", endpoint="compare")
+    try:
+        scenario = normalize_scenario(await _json_body(request))
+        funds = await _fund_dataset()
+        _check_known([scenario["fund"]], funds)
+    except RequestError as e:
+        return _error(e)
+    body = _compare_body(_canonical([scenario]), funds.version, date.today())
+    return Response(body, media_type="application/json")
+
+
+async def batch_endpoint(request):
+    metrics.count("api_requests", endpoint="batch")
+    try:
+        payload = await _json_body(request)
+        scenarios = payload.get("scenarios") if isinstance(payload, dict) else payload
+        if not isinstance(scenarios, list) or not scenarios:
+            raise RequestError("Expected a non-empty list of scenarios")
+        if len(scenarios) > MAX_BATCH_ROWS:
+            raise RequestError(f"At most {MAX_BATCH_ROWS} scenarios per request", status=413)
+        scenarios = [normalize_scenario(scenario) for scenario in scenarios]
+        funds = await _fund_dataset()
+        _check_known([scenario["fund"] for scenario in scenarios], funds)
+    except RequestError as e:
+        return _error(e)
+    body = await to_thread.run_sync(_batch_body, _canonical(scenarios), funds.version, date.today())
+    return Response(body, media_type="application/json")
+
+
+async def export_endpoint(request):
+    metrics.count("api_requests", endpoint="export")
+    export_format = request.path_params["format"]
+    try:
+        if export_format not in FORMATS:
+            raise RequestError(f"Unsupported format: {export_format}", status=404)
+        query = dict(request.query_params)
+        codes = [code for code in query.pop("funds", "").split(",") if code]
+        scenario = normalize_scenario({**query, "fund": ",".join(codes)})
+        funds = await _fund_dataset()
+        _check_known(codes, funds)
+        missing = [code for code in codes if np.isnan(funds.returns[funds.index[code]])]
+        if missing:
+            raise RequestError(f"No daily return for: {', '.join(missing)}")
+    except RequestError as e:
+        return _error(e)
+
+    days = scenario["days"]
+    fees = get_fee_schedule().rates([DEPOSIT, REPO, FUND], days)
+    rate = lambda field, default: scenario.get(field, default)
+    products = [
+        fixed_income_product(
+            "Gecelik Mevduat",
+            rate("deposit_rate", DEFAULT_DEPOSIT_RATE),
+            rate("deposit_commission_rate", fees["commission"][DEPOSIT]),
+            rate("deposit_tax_rate", fees["stopaj"][DEPOSIT]),
+            fees["bsmv"][DEPOSIT] / 100
+        ),
+        fixed_income_product(
+            "Gecelik Repo",
+            rate("repo_rate", DEFAULT_REPO_RATE),
+            rate("repo_commission_rate", fees["commission"][REPO]),
+            rate("repo_tax_rate", fees["stopaj"][REPO]),
+            fees["bsmv"][REPO] / 100
+        ),
+    ] + [
+        fund_product(
+            code,
+            funds.returns[funds.index[code]],
+            rate("fund_commission_rate", fees["commission"][FUND]),
+            rate("fund_tax_rate", fees["stopaj"][FUND]),
+            fees["bsmv"][FUND] / 100
+        )
+        for code in codes
+    ]
+
+    _, media_type, extension = FORMATS[export_format]
+    # Starlette iterates the generator in a worker thread, sending each chunk as it is written
+    return StreamingResponse(
+        export_stream(export_format, scenario["amount"], days, products),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="gunluk_tablo_{days}_gun.{extension}"'}
+    )
+
+
+async def metrics_endpoint(request):
+    return PlainTextResponse(metrics.registry.prometheus())
+
+
+app = Starlette(routes=[
+    Route("/funds", funds_endpoint, methods=["GET"]),
+    Route("/compare", compare_endpoint, methods=["POST"]),
+    Route("/batch", batch_endpoint, methods=["POST"]),
+    Route("/export/{format}", export_endpoint, methods=["GET"]),
+    Route("/metrics", metrics_endpoint, methods=["GET"]),
+])
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Serve the comparison engine as a JSON API.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    args = parser.parse_args()
+
+    uvicorn.run(app, host=args.host, port=args.port, access_log=False)
@@ -0,0 +1,257 @@
+"""Price a CSV of customer scenarios through the deposit/repo/fund comparison.
+
+    python batch.py scenarios.csv results.csv
+    python batch.py scenarios.csv results.csv --workers 8 --chunk-size 500000
+    python batch.py scenarios.csv results.csv --funds https://raw.githubusercontent.com/srtczn/compBoard/main/funds.csv
+
+Every input row is one scenario with the columns ``amount`` (₺), ``days`` and
+``fund`` (fund code). Optional columns override the defaults per row:
+``deposit_rate``, ``deposit_commission_rate``, ``deposit_tax_rate``,
+``repo_rate``, ``repo_commission_rate``, ``repo_tax_rate``,
+``fund_commission_rate`` and ``fund_tax_rate`` (all percent, as in the
+sidebar; empty cells keep the default). Rates default to
+the command-line values, commissions and stopaj to ``fees.csv``.
+
+The output repeats the input columns and adds ``commission``, ``bsmv``,
+``tax``, ``net_return`` and ``final_balance`` for each of ``deposit``,
+``repo`` and ``fund``, plus ``best``: the product with the highest net return.
+Funds missing from the fund file give empty fund columns and never win.
+
+Rows are checked with the rules of the API (``api.normalize_scenario``):
+``days`` a whole number from 1 to 3650, ``amount`` finite and positive,
+``fund`` present and every override within ``RATE_LIMITS``. A row that
+breaks one gets empty result columns and the reason in ``error``; the other
+rows are priced as usual. ``days`` is written back as a whole number.
+
+The input is read in chunks of ``--chunk-size`` rows. Each chunk is priced
+with the same array functions the pages use, on a process pool, and written
+out in input order as soon as it is ready. At most two chunks per worker are
+in flight, so memory stays bounded whatever the size of the input.
+"""
+import argparse
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from calculations import fixed_income_returns, fund_returns
+from fees import DEPOSIT, FEES_FILE, FUND, PRODUCT_TYPES, REPO, get_fee_schedule
+from ingest import read_snapshot
+
+DEFAULT_CHUNK_SIZE = 200_000
+
+# Sidebar defaults of the main page
+DEFAULT_DEPOSIT_RATE = 45.5
+DEFAULT_REPO_RATE = 45.0
+
+RESULT_FIELDS = ("commission", "bsmv", "tax", "net_return", "final_balance")
+RESULT_COLUMNS = [f"{product}_{field}" for product in PRODUCT_TYPES for field in RESULT_FIELDS] + ["best", "error"]
+
+# Accepted scenarios: amount in (0, MAX_AMOUNT], days in 1..MAX_DAYS
+MAX_AMOUNT = 1e12
+MAX_DAYS = 3650
+
+# Accepted range of every override, in percent (the sidebar input ranges)
+RATE_LIMITS = {
+    "deposit_rate": (0.0, 90.0),
+    "deposit_commission_rate": (0.0, 5.0),
+    "deposit_tax_rate": (0.0, 50.0),
+    "repo_rate": (0.0, 90.0),
+    "repo_commission_rate": (0.0, 5.0),
+    "repo_tax_rate": (0.0, 50.0),
+    "fund_commission_rate": (0.0, 5.0),
+    "fund_tax_rate": (0.0, 50.0),
+}
+
+
+def load_fund_returns(source):
+    """Latest daily return of every fund in a ``funds.csv``-style file or URL, by code."""
+    snapshot = read_snapshot(source).drop_duplicates("Fon Kodu", keep="last")
+    return pd.Series(snapshot["Değişim"].to_numpy(dtype=np.float64), index=snapshot["Fon Kodu"].to_numpy())
+
+
+def _column(scenarios, name, default):
+    """Per-row values of an optional override column, ``default`` where missing."""
+    if name not in scenarios:
+        return np.broadcast_to(np.asarray(default, dtype=float), len(scenarios))
+    values = pd.to_numeric(scenarios[name], errors="coerce").to_numpy(dtype=np.float64)
+    return np.where(np.isnan(values), default, values)
+
+
+def _numbers(scenarios, name):
+    """Float values of a column, NaN where missing or not a number."""
+    return pd.to_numeric(scenarios[name], errors="coerce").to_numpy(dtype=np.float64, na_value=np.nan)
+
+
+def validate_scenarios(scenarios):
+    """Why each scenario row cannot be priced: an object array of messages, None for valid rows."""
+    amount = _numbers(scenarios, "amount")
+    days = _numbers(scenarios, "days")
+    errors = np.full(len(scenarios), None, dtype=object)
+
+    def flag(invalid, message):
+        # Keep the first problem of a row
+        errors[invalid & pd.isna(errors)] = message
+
+    flag(scenarios["fund"].isna().to_numpy(), "Missing fields: fund")
+    flag(~((amount > 0) & (amount <= MAX_AMOUNT)), "amount must be positive")
+    flag(~((days >= 1) & (days <= MAX_DAYS) & (days % 1 == 0)), f"days must be a whole number between 1 and {MAX_DAYS}")
+    for field, (low, high) in RATE_LIMITS.items():
+        if field in scenarios:
+            values = _numbers(scenarios, field)
+            given = scenarios[field].notna().to_numpy()
+            flag(given & ~((values >= low) & (values <= high)), f"{field} must be between {low} and {high}")
+    return errors
+
+
+def price_scenarios(scenarios, fund_daily_returns, schedule, deposit_rate=DEFAULT_DEPOSIT_RATE,
+                    repo_rate=DEFAULT_REPO_RATE, on=None):
+    """Results of every scenario row, as a frame of the input columns plus the result columns.
+
+    Rows ``validate_scenarios`` rejects get empty results and their message
+    in ``error``.
+    """
+    errors = validate_scenarios(scenarios)
+    valid = pd.isna(errors)
+    # Rejected rows are priced as 1 ₺ for 1 day and then blanked
+    amount = np.where(valid, _numbers(scenarios, "amount"), 1.0)
+    given_days = _numbers(scenarios, "days")
+    days = np.where(valid, given_days, 1).astype(np.int64)
+    daily_return = fund_daily_returns.reindex(scenarios["fund"].astype(str)).to_numpy(dtype=np.float64)
+
+    fees = schedule.rates(np.array([DEPOSIT, REPO, FUND])[:, np.newaxis], days, on)
+    bsmv_rates = fees["bsmv"] / 100
+
+    results = {
+        "deposit": fixed_income_returns(
+            amount, days,
+            _column(scenarios, "deposit_rate", deposit_rate),
+            _column(scenarios, "deposit_commission_rate", fees["commission"][DEPOSIT]),
+            _column(scenarios, "deposit_tax_rate", fees["stopaj"][DEPOSIT]),
+            bsmv_rate=bsmv_rates[DEPOSIT]
+        ),
+        "repo": fixed_income_returns(
+            amount, days,
+            _column(scenarios, "repo_rate", repo_rate),
+            _column(scenarios, "repo_commission_rate", fees["commission"][REPO]),
+            _column(scenarios, "repo_tax_rate", fees["stopaj"][REPO]),
+            bsmv_rate=bsmv_rates[REPO]
+        ),
+        "fund": fund_returns(
+            amount, days, daily_return,
+            commission_rate=_column(scenarios, "fund_commission_rate", fees["commission"][FUND]),
+            tax_rate=_column(scenarios, "fund_tax_rate", fees["stopaj"][FUND]),
+            bsmv_rate=bsmv_rates[FUND]
+        ),
+    }
+
+    columns = {
+        f"{product}_{field}": np.where(valid, results[product][field], np.nan)
+        for product in PRODUCT_TYPES for field in RESULT_FIELDS
+    }
+
+    # Funds without a return never win
+    net_returns = np.stack([results[product]["net_return"] for product in PRODUCT_TYPES])
+    best = np.array(PRODUCT_TYPES, dtype=object)[np.nan_to_num(net_returns, nan=-np.inf).argmax(axis=0)]
+    columns["best"] = np.where(valid, best, None)
+    columns["error"] = errors
+
+    # Whole days stay whole even when an empty cell made the column float
+    whole = np.isfinite(given_days) & (given_days % 1 == 0) & (np.abs(given_days) <= 2 ** 53)
+    scenarios = scenarios.assign(days=pd.array(np.where(whole, given_days, np.nan), dtype="Int64"))
+
+    # One concat instead of a column insert per result
+    return pd.concat([scenarios, pd.DataFrame(columns, index=scenarios.index)], axis=1)
+
+
+# Per-process state of the pool workers, set once by _init_worker
+_worker = {}
+
+
+def _init_worker(fund_daily_returns, fees_path, options):
+    _worker["funds"] = fund_daily_returns
+    _worker["schedule"] = get_fee_schedule(fees_path)
+    _worker["options"] = options
+
+
+def _price_chunk(scenarios):
+    """Row count and CSV text (without a header) of one priced chunk.
+
+    Formatting the numbers costs more than pricing them, so it runs in the
+    worker as well and the parent only writes text.
+    """
+    priced = price_scenarios(scenarios, _worker["funds"], _worker["schedule"], **_worker["options"])
+    return len(priced), priced.round(2).to_csv(header=False, index=False)
+
+
+def run_batch(input_path, output_path, funds_source="funds.csv", fees_path=FEES_FILE,
+              chunk_size=DEFAULT_CHUNK_SIZE, workers=None, **options):
+    """Price ``input_path`` into ``output_path``. Returns a dict with ``rows``, ``chunks`` and ``elapsed_s``.
+
+    ``options`` are passed to ``price_scenarios`` (``deposit_rate``,
+    ``repo_rate``, ``on``).
+    """
+    started = time.perf_counter()
+    fund_daily_returns = load_fund_returns(funds_source)
+    workers = os.cpu_count() if workers is None else workers
+    chunks = pd.read_csv(input_path, chunksize=chunk_size, dtype={"fund": str})
+    header = pd.DataFrame(columns=list(pd.read_csv(input_path, nrows=0).columns) + RESULT_COLUMNS)
+
+    rows = chunk_count = 0
+    with open(output_path, "w", encoding="utf-8", newline="") as output:
+        header.to_csv(output, index=False)
+
+        def write(priced):
+            nonlocal rows, chunk_count
+            count, text = priced
+            output.write(text)
+            rows += count
+            chunk_count += 1
+
+        if workers <= 1:
+            _init_worker(fund_daily_returns, fees_path, options)
+            for scenarios in chunks:
+                write(_price_chunk(scenarios))
+        else:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                     initargs=(fund_daily_returns, fees_path, options)) as pool:
+                pending = deque()
+                for scenarios in chunks:
+                    pending.append(pool.submit(_price_chunk, scenarios))
+                    # Keep the pool busy without reading the whole input ahead
+                    if len(pending) >= 2 * workers:
+                        write(pending.popleft().result())
+                while pending:
+                    write(pending.popleft().result())
+
+    return {"rows": rows, "chunks": chunk_count, "elapsed_s": round(time.perf_counter() - started, 2)}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Price a CSV of scenarios through the deposit/repo/fund comparison.")
+    parser.add_argument("input", help="scenario CSV (amount, days, fund and optional override columns)")
+    parser.add_argument("output", help="result CSV to write")
+    parser.add_argument("--funds", default="funds.csv", help="fund file or URL in the funds.csv schema")
+    parser.add_argument("--fees", default=FEES_FILE, help="tax and fee schedule")
+    parser.add_argument("--deposit-rate", type=float, default=DEFAULT_DEPOSIT_RATE, help="default deposit rate (%%)")
+    parser.add_argument("--repo-rate", type=float, default=DEFAULT_REPO_RATE, help="default repo rate (%%)")
+    parser.add_argument("--date", help="valuation date for the fee schedule (YYYY-MM-DD, default today)")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="rows per chunk")
+    parser.add_argument("--workers", type=int, help="worker processes (default: CPU count, 1 = no pool)")
+    args = parser.parse_args()
+
+    stats = run_batch(
+        args.input,
+        args.output,
+        funds_source=args.funds,
+        fees_path=args.fees,
+        chunk_size=args.chunk_size,
+        workers=args.workers,
+        deposit_rate=args.deposit_rate,
+        repo_rate=args.repo_rate,
+        on=args.date
+    )
+    print(f"{args.output}: {stats['rows']} rows in {stats['chunks']} chunks ({stats['elapsed_s']} s)")
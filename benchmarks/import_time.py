@@ -0,0 +1,116 @@
+"""Import-time budget for the calculator's cold start.
+
+Runs a fresh interpreter with ``-X importtime`` over the modules the pages
+import before their first widget renders, and reports the cumulative time of
+each top-level import against a budget. The modules are read from the
+module-level imports of ``main.py`` and ``pages/*.py``, so the list follows the
+real startup path:
+
+    python benchmarks/import_time.py
+    python benchmarks/import_time.py --budget-ms 1500 --json
+
+The deferred modules (matplotlib, PIL) are measured separately so a change
+that pulls them back into startup shows up as a budget regression.
+"""
+import argparse
+import ast
+import glob
+import json
+import os
+import subprocess
+import sys
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Scripts whose module-level imports make up startup
+STARTUP_SCRIPTS = ["main.py", os.path.join("pages", "*.py")]
+
+# Imported only when a chart or the logo is drawn
+DEFERRED_MODULES = ["matplotlib.figure", "PIL.Image"]
+
+DEFAULT_BUDGET_MS = 2000
+
+
+def startup_modules(scripts=STARTUP_SCRIPTS):
+    """Modules imported at module level (not inside functions) by ``scripts``, in first-seen order."""
+    modules = []
+    paths = [path for pattern in scripts for path in sorted(glob.glob(os.path.join(REPO_ROOT, pattern)))]
+    for path in paths:
+        with open(path, encoding="utf-8") as f:
+            tree = ast.parse(f.read(), filename=path)
+        pending = list(tree.body)
+        while pending:
+            node = pending.pop(0)
+            if isinstance(node, ast.Import):
+                modules.extend(alias.name for alias in node.names)
+            elif isinstance(node, ast.ImportFrom) and node.level == 0:
+                modules.append(node.module)
+            elif not isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+                # if/try/with blocks at module level still run at import
+                pending.extend(child for child in ast.iter_child_nodes(node) if isinstance(child, ast.stmt))
+    return list(dict.fromkeys(modules))
+
+
+def _importtime(code):
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=REPO_ROOT,
+        capture_output=True,
+        text=True,
+        check=True
+    )
+
+    timings = {}
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        # Nested imports are indented; only top-level entries add up to the total
+        if name.startswith(" ") and not name[1:2].isspace():
+            timings[name.strip()] = int(cumulative) / 1000
+    return timings
+
+
+def measure(modules):
+    """Cumulative import time in ms for each top-level import of ``modules``.
+
+    Modules the interpreter imports on its own at startup are left out.
+    """
+    interpreter = _importtime("pass")
+    timings = _importtime("; ".join(f"import {module}" for module in modules))
+    return {name: ms for name, ms in timings.items() if name not in interpreter}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS, help="startup import budget")
+    parser.add_argument("--json", action="store_true", help="print machine-readable results")
+    args = parser.parse_args()
+
+    modules = startup_modules()
+    startup = measure(modules)
+    startup_total = sum(startup.values())
+    deferred = measure(modules + DEFERRED_MODULES)
+    deferred_total = sum(deferred.values()) - startup_total
+
+    result = {
+        "startup_ms": round(startup_total, 1),
+        "deferred_ms": round(deferred_total, 1),
+        "budget_ms": args.budget_ms,
+        "within_budget": startup_total <= args.budget_ms,
+        "modules": {name: round(ms, 1) for name, ms in sorted(startup.items(), key=lambda item: -item[1])},
+    }
+
+    if args.json:
+        print(json.dumps(result, indent=2))
+    else:
+        for name, ms in result["modules"].items():
+            print(f"{name:<40} {ms:>9.1f} ms")
+        print(f"{'startup total':<40} {result['startup_ms']:>9.1f} ms (budget {args.budget_ms:.0f} ms)")
+        print(f"{'deferred (matplotlib, PIL)':<40} {result['deferred_ms']:>9.1f} ms")
+
+    return 0 if result["within_budget"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
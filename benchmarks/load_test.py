@@ -0,0 +1,143 @@
+"""Concurrent-session load test for the Streamlit pages.
+
+Drives simulated advisor sessions in-process through Streamlit's AppTest.
+Each session opens a page and then reruns it repeatedly after changing
+one random input: investment amount, duration, a rate or the fund
+selection. Prints throughput, p50/p95/p99 rerun latency, peak RSS and
+the mean time of each instrumented stage (see metrics.py):
+
+    python benchmarks/load_test.py --sessions 50 --reruns 10 --concurrency 8
+    python benchmarks/load_test.py --page pages/funds.py --json
+
+funds.csv is served from a local stub server, so the run is fully offline.
+"""
+import argparse
+import json
+import os
+import random
+import resource
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+import numpy as np
+
+import metrics
+from stub_server import serve_funds_locally
+
+PAGES = ("main.py", "pages/funds.py")
+
+
+def _random_fund(app, rng):
+    selectbox = app.selectbox[rng.randrange(len(app.selectbox))]
+    selectbox.set_value(rng.choice(selectbox.options))
+
+
+def main_page_change(app, rng):
+    """Change one sidebar input of main.py."""
+    change = rng.choice(["amount", "duration", "rate", "fund"])
+    if change == "amount":
+        app.number_input[0].set_value(rng.randrange(1000, 10_000_000, 1000))
+    elif change == "duration":
+        app.number_input[1].set_value(rng.randint(1, 3650))
+    elif change == "rate":
+        key = rng.choice(["interest_a", "interest_b", "commission_a", "tax_a", "tax_b"])
+        widget = app.number_input(key=key)
+        widget.set_value(round(rng.uniform(widget.min, min(widget.max, 60.0)), 2))
+    else:
+        _random_fund(app, rng)
+
+
+def funds_page_change(app, rng):
+    """Change one sidebar input or the fund selection of pages/funds.py."""
+    change = rng.choice(["amount", "duration", "fund"])
+    if change == "amount":
+        app.number_input[0].set_value(rng.randrange(1000, 10_000_000, 1000))
+    elif change == "duration":
+        widget = app.number_input[1]
+        widget.set_value(rng.randint(1, int(widget.max)))
+    else:
+        widget = app.multiselect(key="funds")
+        widget.set_value(rng.sample(widget.options, rng.randint(1, min(50, len(widget.options)))))
+
+
+CHANGES = {"main.py": main_page_change, "pages/funds.py": funds_page_change}
+
+
+def run_session(page, reruns, seed):
+    """One simulated session; returns the latency of every run in ms."""
+    from streamlit.testing.v1 import AppTest
+
+    rng = random.Random(seed)
+    latencies = []
+
+    started = time.perf_counter()
+    app = AppTest.from_file(os.path.join(REPO_ROOT, "main.py"), default_timeout=120)
+    app.run()
+    if page != "main.py":
+        app.switch_page(page).run()
+    latencies.append((time.perf_counter() - started) * 1000)
+
+    for _ in range(reruns):
+        CHANGES[page](app, rng)
+        started = time.perf_counter()
+        app.run()
+        latencies.append((time.perf_counter() - started) * 1000)
+        if app.exception:
+            raise RuntimeError(f"{page}: {app.exception[0].message}")
+    return latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test the calculator pages with simulated sessions.")
+    parser.add_argument("--page", choices=PAGES + ("all",), default="all", help="page to drive")
+    parser.add_argument("--sessions", type=int, default=20, help="simulated sessions")
+    parser.add_argument("--reruns", type=int, default=10, help="input changes per session")
+    parser.add_argument("--concurrency", type=int, default=4, help="sessions running at the same time")
+    parser.add_argument("--seed", type=int, default=0, help="seed for the random inputs")
+    parser.add_argument("--json", action="store_true", help="print machine-readable results")
+    args = parser.parse_args()
+
+    serve_funds_locally()
+    os.chdir(REPO_ROOT)
+    pages = PAGES if args.page == "all" else (args.page,)
+    jobs = [(pages[i % len(pages)], args.reruns, args.seed + i) for i in range(args.sessions)]
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        sessions = list(pool.map(lambda job: run_session(*job), jobs))
+    elapsed = time.perf_counter() - started
+
+    runs = np.array([latency for session in sessions for latency in session])
+    p50, p95, p99 = np.percentile(runs, [50, 95, 99])
+    result = {
+        "pages": list(pages),
+        "sessions": args.sessions,
+        "concurrency": args.concurrency,
+        "runs": int(runs.size),
+        "elapsed_s": round(elapsed, 3),
+        "throughput_runs_per_s": round(runs.size / elapsed, 2),
+        "p50_ms": round(p50, 2),
+        "p95_ms": round(p95, 2),
+        "p99_ms": round(p99, 2),
+        "max_ms": round(runs.max(), 2),
+        # ru_maxrss is reported in kilobytes on Linux
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        "span_mean_ms": {
+            name: round(histogram.sum / histogram.count * 1000, 2)
+            for name, histogram in sorted(metrics.registry.histograms.items())
+        },
+    }
+
+    if args.json:
+        print(json.dumps(result, indent=2))
+    else:
+        for name, value in result.items():
+            print(f"{name:<24} {value}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,332 @@
+"""Offline benchmark suite for the calculator's hot paths.
+
+    python benchmarks/run.py                      # run everything, print a table
+    python benchmarks/run.py -k growth            # only benchmarks matching "growth"
+    python benchmarks/run.py --output results.json
+    python benchmarks/run.py --save-baseline      # record benchmarks/baseline.json
+    python benchmarks/run.py --baseline benchmarks/baseline.json --threshold 1.2
+
+With ``--baseline`` every result is compared to the recorded median and the
+run exits non-zero when any benchmark is slower than ``threshold`` times its
+baseline, so a regression can fail a pre-deploy check.
+
+Nothing touches the network: the fund file is served to the Streamlit pages
+from a local HTTP server on a free port.
+"""
+import argparse
+import functools
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+import numpy as np
+import pandas as pd
+
+from business_calendar import BusinessCalendar
+from calculations import calculate_growth
+from dataset import FundDataset
+from export import export_bytes, fixed_income_product, fund_product
+from fees import FeeSchedule
+from formatting import format_turkish, format_turkish_array
+from fund_file import parse_fund_frame, read_fund_csv
+from simulation import bootstrap_model, normal_model, simulate_fund_bands
+from stub_server import serve_funds_locally
+
+DEFAULT_BASELINE = os.path.join(REPO_ROOT, "benchmarks", "baseline.json")
+DEFAULT_THRESHOLD = 1.2
+
+# Registered as (name, setup, repeat); setup returns the callable to time
+BENCHMARKS = []
+
+
+def benchmark(name, repeat=20):
+    def register(setup):
+        BENCHMARKS.append((name, setup, repeat))
+        return setup
+    return register
+
+
+def fund_csv(rows):
+    """funds.csv-style text with ``rows`` distinct funds, built by tiling the real file."""
+    base = pd.read_csv(os.path.join(REPO_ROOT, "funds.csv"), encoding="utf-8-sig", dtype=str)
+    frame = base.iloc[np.arange(rows) % len(base)].reset_index(drop=True)
+    frame["Fon Kodu"] = frame["Fon Kodu"] + "_" + pd.Series(np.arange(rows) // len(base)).astype(str)
+    return frame.to_csv(index=False)
+
+
+# calculate_growth
+
+for days in (30, 365, 3650):
+    @benchmark(f"calculate_growth[{days}d]", repeat=200)
+    def _growth(days=days):
+        return functools.partial(
+            calculate_growth, 10000, days,
+            deposit=(45.5, 1.5, 15.0),
+            repo=(45.0, 0.0, 15.0),
+            daily_return=0.0013
+        )
+
+
+@benchmark("calculate_growth[3650d, table]", repeat=200)
+def _growth_table():
+    fund_factors = (1 + 0.0013) ** np.arange(3651)
+    return functools.partial(
+        calculate_growth, 10000, 3650,
+        deposit=(45.5, 1.5, 15.0),
+        repo=(45.0, 0.0, 15.0),
+        daily_return=0.0013,
+        fund_factors=fund_factors
+    )
+
+
+# Monte Carlo bands
+
+@benchmark("simulate_fund_bands[normal 10k x 3650d]", repeat=5)
+def _simulate_normal():
+    return functools.partial(simulate_fund_bands, 10000, 3650, normal_model(0.0013, 0.003), paths=10_000)
+
+
+@benchmark("simulate_fund_bands[bootstrap 10k x 3650d]", repeat=5)
+def _simulate_bootstrap():
+    history = np.random.default_rng(0).normal(0.0013, 0.003, 500)
+    return functools.partial(simulate_fund_bands, 10000, 3650, bootstrap_model(history), paths=10_000)
+
+
+# Tax and fee rules
+
+@benchmark("fee_schedule.evaluate[100k scenarios]", repeat=20)
+def _fees():
+    rng = np.random.default_rng(0)
+    schedule = FeeSchedule.from_csv(os.path.join(REPO_ROOT, "fees.csv"))
+    product = rng.integers(0, 3, 100_000)
+    days = rng.integers(1, 3651, 100_000)
+    rate = np.where(product == 2, 0.0013, 45.0)
+    on = np.datetime64("2024-01-01") + rng.integers(0, 1000, 100_000)
+    return functools.partial(schedule.evaluate, 100000, days, product, rate, on)
+
+
+# Business-day accrual
+
+@benchmark("growth_factor[rollover, 10k ranges]", repeat=20)
+def _rollover():
+    rng = np.random.default_rng(0)
+    calendar = BusinessCalendar.from_csv(os.path.join(REPO_ROOT, "holidays.csv"))
+    start = np.datetime64("2024-01-01") + rng.integers(0, 1000, 10_000)
+    end = start + rng.integers(1, 3651, 10_000)
+    return functools.partial(calendar.growth_factor, "rollover", 0.455 / 365, start, end)
+
+
+# Day-by-day schedule exports
+
+for export_format in ("csv", "parquet"):
+    @benchmark(f"export_{export_format}[52 products x 3650d]", repeat=5)
+    def _export(export_format=export_format):
+        products = [
+            fixed_income_product("Gecelik Mevduat", 45.5, 1.5, 15.0),
+            fixed_income_product("Gecelik Repo", 45.0, 0.0, 15.0),
+        ] + [fund_product(f"F{i}", 0.0013 + i * 1e-5) for i in range(50)]
+        return functools.partial(export_bytes, export_format, 100000, 3650, products)
+
+
+# Turkish number formatting
+
+@benchmark("format_turkish[scalar x10k]", repeat=10)
+def _format_scalar():
+    values = np.random.default_rng(0).normal(0, 1e6, 10_000).tolist()
+    return lambda: [format_turkish(value) for value in values]
+
+
+@benchmark("format_turkish_array[10k]", repeat=20)
+def _format_array():
+    values = np.random.default_rng(0).normal(0, 1e6, 10_000)
+    return functools.partial(format_turkish_array, values)
+
+
+# Fund file parsing
+
+for rows in (40, 4_000, 400_000):
+    @benchmark(f"parse_funds[{rows} rows]", repeat=3 if rows >= 400_000 else 20)
+    def _parse(rows=rows):
+        data = fund_csv(rows).encode("utf-8")
+        return lambda: FundDataset(read_fund_csv(io.BytesIO(data)))
+
+
+@benchmark("parse_fund_history[1M rows]", repeat=3)
+def _parse_history():
+    # A daily history of the real funds with Turkish decimal commas
+    base = pd.read_csv(os.path.join(REPO_ROOT, "funds.csv"), encoding="utf-8-sig", dtype=str)
+    rows = 1_000_000
+    days = rows // len(base) + 1
+    returns = np.random.default_rng(0).normal(0.0013, 0.001, rows).round(9)
+    data = pd.DataFrame({
+        "Fon Kodu": np.tile(base["Fon Kodu"], days)[:rows],
+        "Fon Adı": np.tile(base["Fon Adı"], days)[:rows],
+        "Tarih": np.repeat(pd.date_range("2015-01-01", periods=days).strftime("%d.%m.%Y"), len(base))[:rows],
+        "Değişim": pd.Series(returns).astype(str).str.replace(".", ",", regex=False),
+    }).to_csv(index=False).encode("utf-8")
+    return lambda: parse_fund_frame(read_fund_csv(io.BytesIO(data)))
+
+
+# Full headless script runs
+
+def app_run(page):
+    from streamlit.testing.v1 import AppTest
+
+    serve_funds_locally()
+    os.chdir(REPO_ROOT)
+
+    def run():
+        app = AppTest.from_file(os.path.join(REPO_ROOT, "main.py"), default_timeout=60)
+        app.run()
+        if page != "main.py":
+            app.switch_page(page).run()
+        if app.exception:
+            raise RuntimeError(f"{page}: {app.exception[0].message}")
+    return run
+
+
+for page in ("main.py", "pages/funds.py"):
+    @benchmark(f"apptest[{page}]", repeat=5)
+    def _app(page=page):
+        return app_run(page)
+
+
+# JSON API over HTTP against a local server
+
+def api_client():
+    """Session and base URL of api.py served from this process on a free port."""
+    import threading
+
+    import requests
+    import uvicorn
+
+    serve_funds_locally()
+    os.chdir(REPO_ROOT)
+    from api import app
+
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=0, log_level="warning", access_log=False))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.01)
+    port = server.servers[0].sockets[0].getsockname()[1]
+    return requests.Session(), f"http://127.0.0.1:{port}"
+
+
+@benchmark("api[compare, uncached]", repeat=200)
+def _api_compare():
+    session, url = api_client()
+    amounts = iter(range(1000, 10**9, 1000))
+    return lambda: session.post(f"{url}/compare", json={"amount": next(amounts), "days": 365, "fund": "AAL"}).raise_for_status()
+
+
+@benchmark("api[batch 10k, uncached]", repeat=10)
+def _api_batch():
+    session, url = api_client()
+    rng = np.random.default_rng(0)
+    funds = pd.read_csv(os.path.join(REPO_ROOT, "funds.csv"), encoding="utf-8-sig")["Fon Kodu"].tolist()
+    batches = iter(lambda: [
+        {"amount": int(amount), "days": int(days), "fund": fund}
+        for amount, days, fund in zip(rng.integers(1, 1000, 10_000) * 1000, rng.integers(1, 3651, 10_000), rng.choice(funds, 10_000))
+    ], None)
+    return lambda: session.post(f"{url}/batch", json=next(batches)).raise_for_status()
+
+
+def time_benchmark(setup, repeat):
+    target = setup()
+    target()  # Warm-up
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        target()
+        timings.append((time.perf_counter() - started) * 1000)
+    return {
+        "median_ms": round(statistics.median(timings), 4),
+        "min_ms": round(min(timings), 4),
+        "mean_ms": round(statistics.mean(timings), 4),
+        "repeat": repeat,
+    }
+
+
+def environment():
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=REPO_ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "commit": commit,
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "machine": platform.platform(),
+    }
+
+
+def compare(results, baseline, threshold):
+    """Ratio of each median to its baseline and the names that regressed."""
+    ratios, regressions = {}, []
+    for name, result in results.items():
+        previous = baseline.get("results", {}).get(name)
+        if previous is None or previous["median_ms"] == 0:
+            continue
+        ratio = result["median_ms"] / previous["median_ms"]
+        ratios[name] = round(ratio, 3)
+        if ratio > threshold:
+            regressions.append(name)
+    return ratios, regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the calculator benchmarks.")
+    parser.add_argument("-k", dest="pattern", help="only run benchmarks whose name contains this text")
+    parser.add_argument("--output", help="write results as JSON to this file")
+    parser.add_argument("--baseline", help="compare against a results file from an earlier run")
+    parser.add_argument("--save-baseline", action="store_true", help=f"also write results to {DEFAULT_BASELINE}")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="allowed median slowdown ratio")
+    args = parser.parse_args()
+
+    results = {}
+    for name, setup, repeat in BENCHMARKS:
+        if args.pattern and args.pattern not in name:
+            continue
+        results[name] = time_benchmark(setup, repeat)
+        print(f"{name:<36} {results[name]['median_ms']:>12.3f} ms", file=sys.stderr)
+
+    report = {"environment": environment(), "results": results}
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        ratios, regressions = compare(results, baseline, args.threshold)
+        report["baseline"] = {"file": args.baseline, "threshold": args.threshold, "ratios": ratios, "regressions": regressions}
+        for name, ratio in ratios.items():
+            flag = "  REGRESSION" if name in regressions else ""
+            print(f"{name:<36} {ratio:>8.2f}x baseline{flag}", file=sys.stderr)
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+    if args.save_baseline:
+        with open(DEFAULT_BASELINE, "w", encoding="utf-8") as f:
+            f.write(output + "\n")
+
+    return 1 if report.get("baseline", {}).get("regressions") else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,26 @@
+"""Local HTTP stand-in for the GitHub raw URL the app loads funds.csv from."""
+import functools
+import http.server
+import os
+import threading
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class _QuietHandler(http.server.SimpleHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+_stub_server = None
+
+
+def serve_funds_locally(directory=REPO_ROOT):
+    """Serve ``directory`` on a free local port and point the app at its funds.csv."""
+    global _stub_server
+    if _stub_server is None:
+        handler = functools.partial(_QuietHandler, directory=directory)
+        _stub_server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), handler)
+        threading.Thread(target=_stub_server.serve_forever, daemon=True).start()
+    os.environ["COMPBOARD_FUNDS_URL"] = f"http://127.0.0.1:{_stub_server.server_port}/funds.csv"
+    return os.environ["COMPBOARD_FUNDS_URL"]
@@ -0,0 +1,143 @@
+"""Business-day calendar for accruing products over real date ranges.
+
+``duration_days`` elsewhere in the app is a count of calendar days. Over a
+real start/end date range the products accrue differently:
+
+- ``calendar``: Gecelik Mevduat accrues and compounds every calendar day.
+- ``rollover``: Gecelik Repo is placed on a business day and matures on the
+  next one, earning simple interest for every night in between (three nights
+  over a weekend), then rolls over. A rollover that has not matured by the
+  end date has not paid yet.
+- ``business``: a fund's price, and so its daily return (Değişim), only
+  moves on business days.
+
+Business days are weekdays that are not listed in ``holidays.csv`` (full-day
+public holidays; half-day eves count as business days). The table only
+covers the years it lists (``holiday_coverage``): outside them only weekends
+are skipped, so callers should warn when a date range leaves it
+(``covers_holidays``) until the table is extended.
+
+The calendar is precomputed once as a bitmap of business days between
+``FIRST_DAY`` and ``LAST_DAY`` with prefix sums over it: the business days in
+any range are one subtraction, and the rollovers of each length (1 to the
+longest holiday gap) have a prefix sum each. Any number of date ranges is
+then answered with a few array lookups, without stepping through days.
+"""
+import functools
+
+import numpy as np
+import pandas as pd
+
+HOLIDAYS_FILE = "holidays.csv"
+
+# Days covered by the precomputed tables
+FIRST_DAY = np.datetime64("2015-01-01")
+LAST_DAY = np.datetime64("2045-12-31")
+
+# Product code -> accrual convention
+CONVENTIONS = {"deposit": "calendar", "repo": "rollover", "fund": "business"}
+
+
+class BusinessCalendar:
+    """Business-day bitmap and prefix sums between ``first_day`` and ``last_day``."""
+
+    def __init__(self, holidays=(), first_day=FIRST_DAY, last_day=LAST_DAY):
+        self.first_day = np.datetime64(first_day, "D")
+        self.last_day = np.datetime64(last_day, "D")
+        self.holidays = np.unique(np.asarray(holidays, dtype="datetime64[D]"))
+        # First and last day of the years the holiday table lists
+        if self.holidays.size:
+            years = self.holidays.astype("datetime64[Y]")
+            self.holiday_coverage = (years.min().astype("datetime64[D]"), (years.max() + 1).astype("datetime64[D]") - 1)
+        else:
+            self.holiday_coverage = None
+        days = np.arange(self.first_day, self.last_day + 1)
+        self.business = np.is_busday(days, holidays=self.holidays)
+
+        # Business days before each day index
+        self._business_prefix = np.concatenate([[0], np.cumsum(self.business)])
+
+        # Nights from each business day to the next one, and the rollovers of
+        # each length starting before each day index
+        business_index = np.flatnonzero(self.business)
+        nights = np.zeros(days.size, dtype=np.int64)
+        nights[business_index[:-1]] = np.diff(business_index)
+        self.max_nights = int(nights.max(initial=1))
+        self._rollover_prefix = np.zeros((self.max_nights, days.size + 1), dtype=np.int32)
+        for length in range(1, self.max_nights + 1):
+            np.cumsum(nights == length, out=self._rollover_prefix[length - 1, 1:])
+
+        # Last business day on or before each day (-1 when there is none)
+        self._last_business = np.maximum.accumulate(np.where(self.business, np.arange(days.size), -1))
+
+    @classmethod
+    def from_csv(cls, path=HOLIDAYS_FILE, **kwargs):
+        return cls(pd.read_csv(path, dtype={"date": str})["date"].values, **kwargs)
+
+    def _index(self, dates):
+        dates = np.asarray(dates, dtype="datetime64[D]")
+        if np.any((dates < self.first_day) | (dates > self.last_day)):
+            raise ValueError(f"Dates must be between {self.first_day} and {self.last_day}")
+        return (dates - self.first_day).astype(np.int64)
+
+    def covers_holidays(self, start, end):
+        """Whether the holiday table lists the holidays of every day from ``start`` to ``end``."""
+        if self.holiday_coverage is None:
+            return False
+        first, last = self.holiday_coverage
+        return bool(np.datetime64(start, "D") >= first and np.datetime64(end, "D") <= last)
+
+    def is_business_day(self, dates):
+        return self.business[self._index(dates)]
+
+    def calendar_days(self, start, end):
+        """Calendar days from ``start`` to ``end``."""
+        return self._index(end) - self._index(start)
+
+    def business_days(self, start, end):
+        """Business days after ``start`` up to and including ``end``."""
+        return self._business_prefix[self._index(end) + 1] - self._business_prefix[self._index(start) + 1]
+
+    def rollover_nights(self, start, end):
+        """Matured rollovers between ``start`` and ``end`` counted by length.
+
+        Returns an array of shape ``(..., max_nights)``: column ``k`` holds
+        the rollovers that spanned ``k + 1`` nights.
+        """
+        start, end = np.broadcast_arrays(self._index(start), self._index(end))
+        # Rollovers mature by the end date when they start before its last business day
+        stop = np.maximum(self._last_business[end], start)
+        counts = self._rollover_prefix[:, stop] - self._rollover_prefix[:, start]
+        return np.moveaxis(counts, 0, -1)
+
+    def accrual_days(self, convention, start, end):
+        """Days that earn a return under ``convention`` (not for ``rollover``)."""
+        if convention == "calendar":
+            return self.calendar_days(start, end)
+        if convention == "business":
+            return self.business_days(start, end)
+        raise ValueError(f"No single day count for the {convention!r} convention")
+
+    def growth_factor(self, convention, daily_rate, start, end):
+        """Growth of 1 ₺ from ``start`` to ``end`` at ``daily_rate`` (a decimal) per accruing day.
+
+        Broadcasts over rates and date ranges; a rollover earns
+        ``daily_rate * nights`` as simple interest.
+        """
+        daily_rate = np.asarray(daily_rate, dtype=float)
+        if convention != "rollover":
+            return (1 + daily_rate) ** self.accrual_days(convention, start, end)
+        counts = self.rollover_nights(start, end)
+        nights = np.arange(1, self.max_nights + 1)
+        return np.exp((counts * np.log1p(daily_rate[..., np.newaxis] * nights)).sum(axis=-1))
+
+    def growth_curve(self, convention, daily_rate, start, days):
+        """Growth factors from ``start`` to each of the following 0..``days`` days."""
+        start = np.datetime64(start, "D")
+        return self.growth_factor(convention, daily_rate, start, start + np.arange(days + 1))
+
+
+@functools.lru_cache(maxsize=4)
+def get_business_calendar(path=HOLIDAYS_FILE):
+    """Calendar built once per process and holiday file."""
+    return BusinessCalendar.from_csv(path)
@@ -0,0 +1,183 @@
+"""Return calculations for Gecelik Mevduat, Gecelik Repo and investment funds.
+
+Every function accepts scalars or NumPy arrays and broadcasts them against
+each other, so a single call prices one scenario for the UI or thousands of
+scenarios in a batch. Rates are percentages, exactly as entered in the
+sidebar (``45.5`` means 45,5%); fund returns are daily decimals as they
+appear in ``funds.csv``.
+"""
+import numpy as np
+
+# BSMV tax rate (fixed at 5% of commission)
+BSMV_RATE = 0.05
+
+
+def fixed_income_returns(investment_amount, duration_days, interest_rate, commission_rate, tax_rate, bsmv_rate=BSMV_RATE, growth_factor=None):
+    """Net return breakdown of a daily compounding product.
+
+    ``growth_factor`` optionally replaces the compounding over calendar days,
+    e.g. with a ``business_calendar.BusinessCalendar`` rollover growth.
+
+    Returns a dict of arrays: ``gross_return``, ``commission``, ``bsmv``,
+    ``tax`` (stopaj), ``net_return`` and ``final_balance``.
+    """
+    investment_amount = np.asarray(investment_amount, dtype=float)
+    duration_days = np.asarray(duration_days)
+    daily_rate = np.asarray(interest_rate, dtype=float) / 100 / 365
+    daily_commission_rate = np.asarray(commission_rate, dtype=float) / 100 / 365
+    tax_rate_decimal = np.asarray(tax_rate, dtype=float) / 100
+
+    # Daily compounded interest for the investment period
+    if growth_factor is None:
+        growth_factor = (1 + daily_rate) ** duration_days
+    future_value = investment_amount * growth_factor
+    gross_return = future_value - investment_amount
+
+    # Commission accrues at the daily rate on the principal
+    commission = investment_amount * daily_commission_rate * duration_days
+
+    # BSMV is charged on the commission
+    bsmv = commission * bsmv_rate
+
+    # Stopaj is calculated directly on the gross return
+    tax = gross_return * tax_rate_decimal
+
+    net_return = gross_return - commission - bsmv - tax
+    final_balance = investment_amount + net_return
+
+    return {
+        "gross_return": gross_return,
+        "commission": commission,
+        "bsmv": bsmv,
+        "tax": tax,
+        "net_return": net_return,
+        "final_balance": final_balance,
+    }
+
+
+def fund_returns(investment_amount, duration_days, daily_return, growth_factor=None, commission_rate=0.0, tax_rate=0.0, bsmv_rate=BSMV_RATE):
+    """Return of a fund that repeats its latest daily return every day.
+
+    ``growth_factor`` is an optional precomputed ``(1 + daily_return) **
+    duration_days``, e.g. from a ``compounding.CompoundingTable``.
+    ``commission_rate`` (yearly, on the principal) and ``tax_rate`` (stopaj,
+    on the gross return) are percentages, as in ``fixed_income_returns``.
+
+    Returns a dict of arrays: ``gross_return``, ``commission``, ``bsmv``,
+    ``tax``, ``net_return``, ``final_balance``, ``total_return`` (gross
+    compounded return in percent) and ``daily_return_amount``.
+    """
+    investment_amount = np.asarray(investment_amount, dtype=float)
+    duration_days = np.asarray(duration_days)
+    daily_return = np.asarray(daily_return, dtype=float)
+    if growth_factor is None:
+        growth_factor = (1 + daily_return) ** duration_days
+
+    future_value = investment_amount * growth_factor
+    gross_return = future_value - investment_amount
+
+    # Same cost model as the deposit and the repo
+    commission = investment_amount * (np.asarray(commission_rate, dtype=float) / 100 / 365) * duration_days
+    bsmv = commission * bsmv_rate
+    tax = gross_return * (np.asarray(tax_rate, dtype=float) / 100)
+
+    net_return = gross_return - commission - bsmv - tax
+    final_balance = investment_amount + net_return
+
+    return {
+        "gross_return": gross_return,
+        "commission": commission,
+        "bsmv": bsmv,
+        "tax": tax,
+        "net_return": net_return,
+        "final_balance": final_balance,
+        "total_return": ((future_value / investment_amount) - 1) * 100,
+        "daily_return_amount": investment_amount * daily_return,
+    }
+
+
+def to_scalars(result):
+    """Convert a single-scenario result dict to plain floats."""
+    return {key: float(value) for key, value in result.items()}
+
+
+def calculate_growth(investment_amount, days, deposit, repo, daily_return, bsmv_rate=BSMV_RATE, fund_factors=None, fund_costs=(0.0, 0.0), deposit_factors=None, repo_factors=None):
+    """Day-by-day balances (day 0..days) for the deposit, the repo and the fund.
+
+    ``deposit`` and ``repo`` are ``(interest_rate, commission_rate, tax_rate)``
+    tuples in percent. The curves are the card formulas evaluated over a day
+    index, so the last point of each curve equals the card value.
+    ``fund_factors`` optionally gives the fund's compounding factors for day
+    0..days (``CompoundingTable.curve``) so they are not recomputed.
+    ``fund_costs`` is the fund's ``(commission_rate, tax_rate)`` and
+    ``bsmv_rate`` one rate for all products or a (deposit, repo, fund) triple.
+    ``deposit_factors`` and ``repo_factors`` likewise replace the daily
+    compounding of the deposit and the repo (e.g. over a business calendar).
+    """
+    day_index = np.arange(days + 1)
+    bsmv_a, bsmv_b, bsmv_fund = np.broadcast_to(bsmv_rate, (3,))
+    growth_a = fixed_income_returns(investment_amount, day_index, *deposit, bsmv_rate=bsmv_a, growth_factor=deposit_factors)["final_balance"]
+    growth_b = fixed_income_returns(investment_amount, day_index, *repo, bsmv_rate=bsmv_b, growth_factor=repo_factors)["final_balance"]
+    growth_fund = fund_returns(investment_amount, day_index, daily_return, growth_factor=fund_factors, commission_rate=fund_costs[0], tax_rate=fund_costs[1], bsmv_rate=bsmv_fund)["final_balance"]
+    return growth_a, growth_b, growth_fund
+
+
+# Product order used by the sensitivity grid
+PRODUCTS = ("Gecelik Mevduat", "Gecelik Repo", "Yatırım Fonu")
+
+
+def sensitivity_grid(investment_amount, interest_rates, durations, deposit_costs, repo_costs, daily_return, repo_spread=0.0, bsmv_rate=BSMV_RATE, fund_factors=None, fund_costs=(0.0, 0.0)):
+    """Net returns of all three products over an interest rate × duration grid.
+
+    ``interest_rates`` is the deposit rate axis (percent); the repo is priced at
+    ``interest_rates + repo_spread``. ``deposit_costs`` and ``repo_costs`` are
+    ``(commission_rate, tax_rate)`` tuples in percent. ``fund_factors``
+    optionally gives the fund's compounding factor per day index
+    (``CompoundingTable.curve``), looked up at ``durations``. As in
+    ``calculate_growth``, ``fund_costs`` is the fund's ``(commission_rate,
+    tax_rate)`` and ``bsmv_rate`` one rate or a (deposit, repo, fund) triple.
+    Every cost may also be an array over ``durations`` (e.g. the fee
+    schedule's bracket for each holding period), with the triple then of
+    shape ``(3, len(durations))``.
+
+    Returns ``(net_returns, winner, margin)``: ``net_returns`` has shape
+    ``(3, len(interest_rates), len(durations))`` in ``PRODUCTS`` order,
+    ``winner`` holds the index of the best product per cell and ``margin`` its
+    lead over the runner-up in ₺.
+    """
+    rates = np.asarray(interest_rates, dtype=float)[:, np.newaxis]
+    days = np.asarray(durations)[np.newaxis, :]
+    shape = (rates.shape[0], days.shape[1])
+
+    bsmv_rate = np.asarray(bsmv_rate, dtype=float)
+    bsmv_a, bsmv_b, bsmv_fund = np.broadcast_to(bsmv_rate, (3,) + bsmv_rate.shape[1:])
+
+    net_returns = np.empty((len(PRODUCTS),) + shape)
+    net_returns[0] = fixed_income_returns(investment_amount, days, rates, *deposit_costs, bsmv_rate=bsmv_a)["net_return"]
+    net_returns[1] = fixed_income_returns(investment_amount, days, rates + repo_spread, *repo_costs, bsmv_rate=bsmv_b)["net_return"]
+    fund_growth = None if fund_factors is None else np.asarray(fund_factors)[days]
+    net_returns[2] = fund_returns(investment_amount, days, daily_return, growth_factor=fund_growth, commission_rate=fund_costs[0], tax_rate=fund_costs[1], bsmv_rate=bsmv_fund)["net_return"]
+
+    # A fund without a return (NaN) never wins
+    ranked = np.nan_to_num(net_returns, nan=-np.inf)
+    winner = ranked.argmax(axis=0)
+    top_two = np.partition(ranked, len(PRODUCTS) - 2, axis=0)[-2:]
+    margin = top_two[1] - top_two[0]
+    return net_returns, winner, margin
+
+
+def top_k(values, k):
+    """Indices of the ``k`` largest values, largest first.
+
+    Uses a partial selection so only the selected ``k`` are sorted, which
+    keeps ranking a large universe close to linear time.
+    """
+    values = np.asarray(values)
+    k = min(k, values.size)
+    if k <= 0:
+        return np.array([], dtype=np.intp)
+    if k < values.size:
+        candidates = np.argpartition(values, values.size - k)[values.size - k:]
+    else:
+        candidates = np.arange(values.size)
+    return candidates[np.argsort(values[candidates], kind="stable")[::-1]]
@@ -0,0 +1,111 @@
+"""Shared matplotlib helpers for the Streamlit pages.
+
+matplotlib is imported on first use rather than at page load, so a rerun
+that draws no chart never pays for it. Rendered charts are kept as PNG bytes
+in a process-wide LRU keyed on the chart's inputs, so a repeated view (the
+same session rerunning for an unrelated widget, or another session asking
+for the same chart) skips matplotlib entirely.
+"""
+import io
+import math
+import threading
+from collections import OrderedDict
+
+import metrics
+
+# Same output settings st.pyplot uses
+PNG_OPTIONS = {"format": "png", "dpi": 200, "bbox_inches": "tight"}
+
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+
+def figure(**kwargs):
+    """A new standalone matplotlib ``Figure``.
+
+    The figure is not registered with pyplot, so it has no shared "current
+    figure" state: concurrent sessions can draw at the same time, and the
+    ``plt.close("all")`` Streamlit runs after every script run cannot close
+    it mid-draw.
+    """
+    from matplotlib.figure import Figure
+    return Figure(**kwargs)
+
+
+def chart_key(name, **inputs):
+    """Normalized, hashable cache key for a chart and everything it draws.
+
+    Floats are rounded so values that differ only by float noise share a key,
+    NaN and infinities become strings, and lists and arrays become tuples.
+    """
+    def normalize(value):
+        if isinstance(value, float):
+            # NaN never equals itself, so non-finite values are keyed by name
+            return round(value, 10) if math.isfinite(value) else str(value)
+        if isinstance(value, (list, tuple)):
+            return tuple(normalize(item) for item in value)
+        if hasattr(value, "tolist"):
+            # NumPy scalars and arrays
+            return normalize(value.tolist())
+        return value
+
+    return (name,) + tuple(sorted((key, normalize(value)) for key, value in inputs.items()))
+
+
+class ChartCache:
+    """Size-bounded LRU of rendered chart PNGs with hit/miss counters."""
+
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_render(self, key, render):
+        """PNG bytes for ``key``; calls ``render()`` for a figure on a miss."""
+        with self._lock:
+            png = self._entries.get(key)
+            if png is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return png
+            self.misses += 1
+
+        buffer = io.BytesIO()
+        with metrics.span("chart_draw"):
+            fig = render()
+        with metrics.span("chart_png"):
+            fig.savefig(buffer, **PNG_OPTIONS)
+        png = buffer.getvalue()
+
+        with self._lock:
+            if key not in self._entries:
+                self._entries[key] = png
+                self.size += len(png)
+            while self.size > self.max_bytes and len(self._entries) > 1:
+                _, evicted = self._entries.popitem(last=False)
+                self.size -= len(evicted)
+                self.evictions += 1
+        return png
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self.size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+
+
+# One cache per server process, shared by every session and page
+chart_cache = ChartCache()
+metrics.registry.register_cache("chart", chart_cache.stats)
@@ -0,0 +1,187 @@
+"""Memory-mapped table of fund compounding factors.
+
+Row ``i`` of the table is ``(1 + r_i) ** day`` for ``day = 0..max_days``,
+where ``r_i`` is a fund's latest daily return (Değişim). A fund's projection
+at any horizon is then one cell times the investment amount, and a whole
+growth curve is a contiguous slice of its row. The cells are the same
+``np.power`` values ``fund_returns`` computes, so results do not change.
+
+The table lives in a directory (``data/compounding`` by default):
+
+- ``factors-<hash>.f8``: float64 matrix of shape ``(funds, max_days + 1)``,
+  one row per fund code in the order the codes were first seen. The hash
+  covers the codes and returns the rows were built from, so a file never
+  changes once written.
+- ``meta.json``: ``max_days``, the codes and returns of the current file and
+  the names of the current and the previous file
+
+Processes open the file read-only through ``np.memmap`` and share the page
+cache. ``sync`` brings the table up to date with a new fund file: when a
+return changes or a fund is added it writes a new file, copying the
+unchanged rows and computing only the new and changed ones, then points
+``meta.json`` at it. Rows another process has mapped are never rewritten, so
+a process still serving the previous data version keeps reading the
+factors it synced. Files older than the previous one are removed.
+"""
+import hashlib
+import json
+import os
+
+import numpy as np
+
+DEFAULT_TABLE_DIR = os.path.join("data", "compounding")
+FACTORS_PREFIX = "factors-"
+FACTORS_SUFFIX = ".f8"
+META_FILE = "meta.json"
+
+# Longest horizon offered by the pages
+MAX_DAYS = 3650
+
+# Rows computed per block when building
+BUILD_BLOCK_ROWS = 256
+
+
+class CompoundingTable:
+    """Fund × day matrix of compounding factors backed by a memory-mapped file."""
+
+    def __init__(self, path=DEFAULT_TABLE_DIR, max_days=MAX_DAYS):
+        self.path = path
+        self.max_days = max_days
+        self.rows = np.array([], dtype=np.int64)
+        self._factors = None
+
+    @property
+    def meta(self):
+        meta_path = os.path.join(self.path, META_FILE)
+        if os.path.exists(meta_path):
+            with open(meta_path, encoding="utf-8") as f:
+                meta = json.load(f)
+            if meta["max_days"] == self.max_days and "file" in meta:
+                return meta
+        return {"max_days": self.max_days, "codes": [], "returns": [], "file": None, "previous": None}
+
+    @property
+    def factors(self):
+        """Read-only ``(funds, max_days + 1)`` view of the memory-mapped matrix."""
+        if self._factors is None:
+            meta = self.meta
+            self._factors = self._open(meta["file"], len(meta["codes"]))
+        return self._factors
+
+    def sync(self, codes, returns):
+        """Update the table for the latest returns of ``codes``.
+
+        Afterwards ``at`` and ``curve`` take positions in ``codes`` and read
+        the file this sync settled on, whatever later syncs write. Returns a
+        dict with the number of ``funds`` synced and the rows ``appended``
+        and ``recomputed``.
+        """
+        returns = np.asarray(returns, dtype=np.float64)
+        meta = self.meta
+        old_file = meta["file"]
+        if old_file is not None and not os.path.exists(os.path.join(self.path, old_file)):
+            # Removed underneath us; start over
+            meta = {"max_days": self.max_days, "codes": [], "returns": [], "file": None, "previous": None}
+            old_file = None
+
+        index = {code: row for row, code in enumerate(meta["codes"])}
+        stored = np.array(meta["returns"], dtype=np.float64)
+
+        rows = np.empty(len(codes), dtype=np.int64)
+        new_positions = []
+        for position, code in enumerate(codes):
+            row = index.get(code)
+            if row is None:
+                row = index[code] = len(meta["codes"])
+                meta["codes"].append(code)
+                new_positions.append(position)
+            rows[position] = row
+
+        existing = rows < stored.size
+        old = stored[rows[existing]]
+        new = returns[existing]
+        # NaN compares unequal to itself, but a NaN row does not need rebuilding
+        changed = (old != new) & ~(np.isnan(old) & np.isnan(new))
+        changed_rows = rows[existing][changed]
+        appended = len(meta["codes"]) - stored.size
+
+        all_returns = np.concatenate([stored, np.full(appended, np.nan)])
+        all_returns[rows] = returns
+
+        os.makedirs(self.path, exist_ok=True)
+        if changed_rows.size or appended:
+            name = self._file_name(meta["codes"], all_returns)
+            if not os.path.exists(os.path.join(self.path, name)):
+                recompute = np.zeros(stored.size, dtype=bool)
+                recompute[changed_rows] = True
+                self._write_factors(name, old_file, recompute, all_returns)
+            meta["file"], meta["previous"] = name, old_file
+            meta["returns"] = all_returns.tolist()
+            self._write_meta(meta)
+            self._remove_old_files(meta)
+
+        self._factors = self._open(meta["file"], len(meta["codes"]))
+        self.rows = rows
+        return {"funds": len(codes), "appended": int(appended), "recomputed": int(changed_rows.size)}
+
+    def at(self, positions, day):
+        """Factors of the funds at ``positions`` after ``day`` days."""
+        return self.factors[self.rows[positions], day]
+
+    def curve(self, position, days):
+        """Factors of one fund for day 0..``days``, as a view."""
+        return self.factors[self.rows[position], :days + 1]
+
+    def _build(self, returns):
+        return np.power(1 + returns[:, np.newaxis], np.arange(self.max_days + 1))
+
+    def _open(self, name, funds):
+        if name is None or funds == 0:
+            return np.empty((0, self.max_days + 1))
+        return np.memmap(os.path.join(self.path, name), dtype=np.float64, mode="r", shape=(funds, self.max_days + 1))
+
+    def _file_name(self, codes, returns):
+        digest = hashlib.sha1("\0".join(codes).encode("utf-8"))
+        digest.update(np.asarray(returns, dtype=np.float64).tobytes())
+        digest.update(str(self.max_days).encode("ascii"))
+        return f"{FACTORS_PREFIX}{digest.hexdigest()[:16]}{FACTORS_SUFFIX}"
+
+    def _write_factors(self, name, old_file, recompute, returns):
+        """Write a new factors file: rows of ``old_file`` unless marked in ``recompute``, then new rows."""
+        stored = recompute.size
+        old = self._open(old_file, stored) if stored else None
+        tmp_path = os.path.join(self.path, f"{name}.{os.getpid()}.tmp")
+        with open(tmp_path, "wb") as f:
+            for start in range(0, stored, BUILD_BLOCK_ROWS):
+                stop = min(start + BUILD_BLOCK_ROWS, stored)
+                block = np.array(old[start:stop])
+                redo = recompute[start:stop]
+                if redo.any():
+                    block[redo] = self._build(returns[start:stop][redo])
+                f.write(block.tobytes())
+            for start in range(stored, returns.size, BUILD_BLOCK_ROWS):
+                f.write(self._build(returns[start:start + BUILD_BLOCK_ROWS]).tobytes())
+        del old
+        os.replace(tmp_path, os.path.join(self.path, name))
+
+    def _remove_old_files(self, meta):
+        """Delete factors files other than the current and the previous one.
+
+        Processes that mapped a deleted file keep reading it; the space is
+        freed once they let go.
+        """
+        keep = {meta["file"], meta["previous"]}
+        for entry in os.listdir(self.path):
+            # "factors.f8" is the single file earlier versions rewrote in place
+            factors = entry.startswith(FACTORS_PREFIX) and entry.endswith(FACTORS_SUFFIX) or entry == "factors.f8"
+            if factors and entry not in keep:
+                try:
+                    os.remove(os.path.join(self.path, entry))
+                except OSError:
+                    pass
+
+    def _write_meta(self, meta):
+        tmp_path = os.path.join(self.path, f"{META_FILE}.{os.getpid()}.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(meta, f, ensure_ascii=False)
+        os.replace(tmp_path, os.path.join(self.path, META_FILE))
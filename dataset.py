@@ -0,0 +1,140 @@
+"""Process-wide, read-only fund dataset shared by every page and session.
+
+``get_fund_dataset`` loads ``funds.csv`` once per server process (refreshed
+hourly) through ``st.cache_resource``, so all sessions read the same object
+instead of each holding its own DataFrame copy, parsed columns and lookup
+dicts. The arrays are marked read-only and the lookups are immutable views;
+sessions only ever index into them.
+"""
+import hashlib
+import io
+import os
+from types import MappingProxyType
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+import metrics
+from compounding import CompoundingTable
+from fetch import fetch
+from fund_file import parse_dates, parse_returns, read_fund_csv
+
+# GitHub raw content URL for the funds.csv file. COMPBOARD_FUNDS_URL overrides
+# it, e.g. to point at a local stub; it is read on every fetch, so a stub
+# started after this module was imported is still used.
+FUNDS_URL = "https://raw.githubusercontent.com/srtczn/compBoard/main/funds.csv"
+
+LOCAL_FUNDS_FILE = "funds.csv"
+
+# (connect, read) timeouts of the funds.csv request, which the first page load waits for
+STARTUP_TIMEOUT = (3.05, 5)
+
+# Minimal fallback data if all else fails
+FALLBACK_DATA = """Fon Kodu,Fon Adı,Tarih,Değişim
+HVTAL,ALBATROSS PORTFÖY BİRİNCİ PARA PİYASASI (TL) FONU,08.05.2025,0.001542316975"""
+
+
+def load_fund_data():
+    """Fetch funds.csv from GitHub, falling back to the local file, then to minimal data."""
+    try:
+        # Served from the on-disk copy; once it is an hour old it is revalidated
+        # with a conditional request in the background. Only a first start
+        # without a copy waits for GitHub, with a short timeout before the
+        # local fallback.
+        with metrics.span("fetch"):
+            url = os.environ.get("COMPBOARD_FUNDS_URL", FUNDS_URL)
+            content, source = fetch(url, max_age=3600, timeout=STARTUP_TIMEOUT, background=True)
+        metrics.count("fetch", source=source)
+        if source == "stale":
+            st.warning("Could not reach GitHub, using the last downloaded funds.csv")
+        return read_fund_csv(io.BytesIO(content))
+    except Exception as e:
+        st.error(f"Error loading fund data: {e}")
+        # Try local file as fallback
+        if os.path.exists(LOCAL_FUNDS_FILE):
+            st.warning("Using local funds.csv file as fallback")
+            return read_fund_csv(LOCAL_FUNDS_FILE)
+        else:
+            st.warning("Using minimal fallback data")
+            return read_fund_csv(io.BytesIO(FALLBACK_DATA.encode("utf-8")))
+
+
+def _read_only(array):
+    array = np.ascontiguousarray(array)
+    array.flags.writeable = False
+    return array
+
+
+class FundDataset:
+    """Compact columnar form of the fund file.
+
+    - ``codes``: fund codes, one per row (object array)
+    - ``name_codes`` / ``name_categories``: fund names as categorical codes
+    - ``returns``: contiguous float64 latest daily returns (Değişim), NaN when
+      the file has no usable return for a fund
+    - ``return_status``: why a return is missing, as ``fund_file.RETURN_*`` codes
+    - ``dates``: datetime64 of each row's Tarih (NaT when unparseable)
+    - ``index``: fund code -> row
+    - ``display`` / ``display_index``: "CODE - Name" labels for select boxes and their rows
+    - ``version``: hash of the codes and returns, which changes with the data
+    """
+
+    def __init__(self, frame):
+        # Later rows win for repeated codes, as the old per-page dicts did
+        frame = frame.drop_duplicates("Fon Kodu", keep="last").reset_index(drop=True)
+
+        codes = frame["Fon Kodu"].astype("string")
+        names = pd.Categorical(frame["Fon Adı"].astype("string"))
+        returns, status = parse_returns(frame["Değişim"])
+
+        self.codes = _read_only(codes.to_numpy(dtype=object))
+        self.name_codes = _read_only(names.codes)
+        self.name_categories = _read_only(names.categories.to_numpy(dtype=object))
+        self.returns = _read_only(returns)
+        self.return_status = _read_only(status)
+        self.dates = _read_only(parse_dates(frame["Tarih"]))
+
+        self.index = MappingProxyType({code: i for i, code in enumerate(self.codes)})
+        self.display = tuple(codes + " - " + pd.Series(self.names, dtype="string"))
+        self.display_index = MappingProxyType({label: i for i, label in enumerate(self.display)})
+
+        digest = hashlib.sha1("\0".join(self.codes).encode("utf-8"))
+        digest.update(self.returns.tobytes())
+        self.version = digest.hexdigest()[:16]
+
+    def __len__(self):
+        return len(self.codes)
+
+    def name(self, i):
+        return self.name_categories[self.name_codes[i]]
+
+    @property
+    def names(self):
+        return self.name_categories[self.name_codes]
+
+    @property
+    def latest_date(self):
+        """Most recent Tarih in the file, or None when no date could be parsed."""
+        dates = self.dates[~np.isnat(self.dates)]
+        return pd.Timestamp(dates.max()) if dates.size else None
+
+
+@st.cache_resource(ttl=3600)  # One shared copy per process, refreshed hourly
+def get_fund_dataset():
+    frame = load_fund_data()
+    with metrics.span("parse"):
+        return FundDataset(frame)
+
+
+@st.cache_resource(max_entries=1)  # Synced once per data version
+def _compounding_table(version, _funds):
+    table = CompoundingTable()
+    with metrics.span("compounding_sync"):
+        table.sync(_funds.codes, _funds.returns)
+    return table
+
+
+def get_compounding_table(funds):
+    """Compounding factors for ``funds``; ``at``/``curve`` take dataset rows."""
+    return _compounding_table(funds.version, funds)
@@ -0,0 +1,164 @@
+"""Day-by-day projection schedules exported as CSV, Parquet or Excel.
+
+A schedule has one row per product and day (0..days) with the gross return,
+commission, BSMV, stopaj and net value on that day, i.e. the values behind
+the growth charts. Rows are produced by ``schedule_chunks`` a product and at
+most ``CHUNK_DAYS`` days at a time, and each writer turns the chunks into
+bytes as they come. A long export of many funds never exists as one
+DataFrame: memory is bounded by one chunk plus the writer's buffer. CSV and
+Parquet bytes are yielded chunk by chunk, so an HTTP download can start at
+once. An .xlsx file is a zip archive that is only complete when closed, so
+the Excel writer keeps its rows in temporary files (XlsxWriter's
+``constant_memory`` mode) and yields the file at the end.
+"""
+import functools
+import io
+
+import numpy as np
+import pandas as pd
+
+from calculations import BSMV_RATE, fixed_income_returns, fund_returns
+
+# Days per chunk of one product
+CHUNK_DAYS = 10_000
+
+SCHEDULE_COLUMNS = ("Ürün", "Gün", "Brüt Getiri", "Komisyon", "BSMV", "Stopaj", "Net Değer")
+
+# Rows per Excel sheet (the format's limit, less the header row)
+EXCEL_SHEET_ROWS = 1_048_575
+
+
+def fixed_income_product(name, interest_rate, commission_rate, tax_rate, bsmv_rate=BSMV_RATE, growth_factors=None):
+    """A deposit or repo in a schedule; ``growth_factors`` optionally gives the growth per day index."""
+    returns = functools.partial(
+        fixed_income_returns,
+        interest_rate=interest_rate,
+        commission_rate=commission_rate,
+        tax_rate=tax_rate,
+        bsmv_rate=bsmv_rate
+    )
+    return {"name": name, "returns": returns, "growth_factors": growth_factors}
+
+
+def fund_product(name, daily_return, commission_rate=0.0, tax_rate=0.0, bsmv_rate=BSMV_RATE, growth_factors=None):
+    """A fund in a schedule; ``growth_factors`` optionally gives the growth per day index."""
+    returns = functools.partial(
+        fund_returns,
+        daily_return=daily_return,
+        commission_rate=commission_rate,
+        tax_rate=tax_rate,
+        bsmv_rate=bsmv_rate
+    )
+    return {"name": name, "returns": returns, "growth_factors": growth_factors}
+
+
+def schedule_chunks(investment_amount, days, products, chunk_days=CHUNK_DAYS):
+    """DataFrames of ``SCHEDULE_COLUMNS`` covering every product for day 0..``days``."""
+    for product in products:
+        for start in range(0, days + 1, chunk_days):
+            day_index = np.arange(start, min(start + chunk_days, days + 1))
+            factors = product["growth_factors"]
+            result = product["returns"](
+                investment_amount,
+                day_index,
+                growth_factor=None if factors is None else np.asarray(factors)[day_index]
+            )
+            yield pd.DataFrame({
+                "Ürün": product["name"],
+                "Gün": day_index,
+                "Brüt Getiri": result["gross_return"],
+                "Komisyon": result["commission"],
+                "BSMV": result["bsmv"],
+                "Stopaj": result["tax"],
+                "Net Değer": result["final_balance"],
+            }).round(2)
+
+
+def csv_stream(chunks):
+    """UTF-8 CSV bytes, with a byte order mark so Excel reads the Turkish headers."""
+    for i, chunk in enumerate(chunks):
+        text = chunk.to_csv(index=False, header=i == 0)
+        yield ("﻿" + text if i == 0 else text).encode("utf-8")
+
+
+class _Drain(io.RawIOBase):
+    """Write-only sink whose contents are taken out after every write batch."""
+
+    def __init__(self):
+        self.parts = []
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self.parts.append(bytes(data))
+        return len(data)
+
+    def take(self):
+        data = b"".join(self.parts)
+        self.parts = []
+        return data
+
+
+def parquet_stream(chunks):
+    """Parquet bytes, one row group per chunk."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    sink = _Drain()
+    writer = None
+    for chunk in chunks:
+        table = pa.Table.from_pandas(chunk, preserve_index=False)
+        if writer is None:
+            writer = pq.ParquetWriter(sink, table.schema)
+        writer.write_table(table)
+        yield sink.take()
+    if writer is not None:
+        writer.close()
+    yield sink.take()
+
+
+def excel_stream(chunks):
+    """.xlsx bytes, written with bounded memory and yielded once complete."""
+    import xlsxwriter
+
+    output = io.BytesIO()
+    # NaN (a fund without a return) becomes an Excel error cell instead of failing mid-file
+    workbook = xlsxwriter.Workbook(output, {"constant_memory": True, "nan_inf_to_errors": True})
+    money = workbook.add_format({"num_format": "#,##0.00"})
+    worksheet = None
+    row = EXCEL_SHEET_ROWS
+    for chunk in chunks:
+        # Rows as tuples of Python scalars, sliced wherever a sheet fills up
+        records = chunk.itertuples(index=False, name=None)
+        for record in records:
+            if row == EXCEL_SHEET_ROWS:
+                worksheet = workbook.add_worksheet(f"Tablo {len(workbook.worksheets()) + 1}")
+                worksheet.write_row(0, 0, SCHEDULE_COLUMNS)
+                worksheet.set_column(2, len(SCHEDULE_COLUMNS) - 1, 14, money)
+                row = 0
+            row += 1
+            worksheet.write_row(row, 0, record)
+    if worksheet is None:
+        workbook.add_worksheet().write_row(0, 0, SCHEDULE_COLUMNS)
+    workbook.close()
+    yield output.getvalue()
+
+
+# Format -> (writer, MIME type, file extension)
+FORMATS = {
+    "csv": (csv_stream, "text/csv", "csv"),
+    "parquet": (parquet_stream, "application/vnd.apache.parquet", "parquet"),
+    "xlsx": (excel_stream, "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet", "xlsx"),
+}
+
+
+def export_stream(export_format, investment_amount, days, products):
+    """Byte chunks of the schedule of ``products`` in ``export_format`` (a ``FORMATS`` key)."""
+    writer = FORMATS[export_format][0]
+    return writer(schedule_chunks(investment_amount, days, products))
+
+
+def export_bytes(export_format, investment_amount, days, products):
+    """The whole export file, e.g. for ``st.download_button``."""
+    return b"".join(export_stream(export_format, investment_amount, days, products))
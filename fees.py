@@ -0,0 +1,127 @@
+"""Tax and fee schedules loaded from ``fees.csv`` and applied as array lookups.
+
+Each row of the file is one bracket::
+
+    product,fee,min_days,effective_from,rate
+    deposit,stopaj,0,2020-01-01,15
+
+- ``product``: ``deposit`` (Gecelik Mevduat), ``repo`` (Gecelik Repo) or
+  ``fund`` (Yatırım Fonu)
+- ``fee``: ``commission`` (yearly percent of the principal, accrued daily),
+  ``bsmv`` (percent of the commission) or ``stopaj`` (percent of the gross
+  return)
+- ``min_days``: the bracket covers holding periods from this many days up to
+  the next bracket of the same schedule
+- ``effective_from``: the brackets of a product and fee dated on one day form
+  a schedule, which replaces the earlier one from that day on
+- ``rate``: percent
+
+On load the rows are compiled into one table of shape
+``(fees, products, dates + 1, durations + 1)`` over every distinct effective
+date and ``min_days``. Looking up the rates of any batch of scenarios is then
+two ``searchsorted`` calls and one fancy index, with no Python branching per
+scenario. Dates, durations or products without a rule pay no fee.
+"""
+import functools
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+from calculations import fund_returns
+
+FEES_FILE = "fees.csv"
+
+# Product codes in table order
+PRODUCT_TYPES = ("deposit", "repo", "fund")
+DEPOSIT, REPO, FUND = 0, 1, 2
+
+FEES = ("commission", "bsmv", "stopaj")
+
+
+class FeeSchedule:
+    """Compiled tax and fee brackets by product, holding period and date."""
+
+    def __init__(self, rules):
+        rules = rules.assign(
+            effective_from=pd.to_datetime(rules["effective_from"]).values.astype("datetime64[D]"),
+            min_days=rules["min_days"].astype(np.int64),
+            rate=rules["rate"].astype(float),
+        )
+        unknown = (set(rules["product"]) - set(PRODUCT_TYPES)) | (set(rules["fee"]) - set(FEES))
+        if unknown:
+            raise ValueError(f"Unknown products or fees in the fee schedule: {sorted(unknown)}")
+        duplicated = rules.duplicated(["product", "fee", "effective_from", "min_days"])
+        if duplicated.any():
+            raise ValueError(f"Duplicate brackets in the fee schedule:\n{rules[duplicated]}")
+
+        self.dates = np.unique(rules["effective_from"].values)
+        self.durations = np.unique(rules["min_days"].values)
+
+        # Slot 0 on the date and duration axes is "before the first rule"
+        self.table = np.zeros((len(FEES), len(PRODUCT_TYPES), self.dates.size + 1, self.durations.size + 1))
+        for (product, fee), schedules in rules.groupby(["product", "fee"]):
+            fee_table = self.table[FEES.index(fee), PRODUCT_TYPES.index(product)]
+            starts = np.unique(schedules["effective_from"].values)
+            for start, end in zip(starts, np.append(starts[1:], np.datetime64("NaT"))):
+                brackets = schedules[schedules["effective_from"] == start].sort_values("min_days")
+                first = np.searchsorted(self.dates, start, side="right")
+                last = self.dates.size + 1 if np.isnat(end) else np.searchsorted(self.dates, end, side="right")
+                bracket = np.searchsorted(brackets["min_days"].values, self.durations, side="right") - 1
+                rates = np.where(bracket >= 0, brackets["rate"].values[np.maximum(bracket, 0)], 0.0)
+                fee_table[first:last, 1:] = rates
+
+    @classmethod
+    def from_csv(cls, path=FEES_FILE):
+        return cls(pd.read_csv(path, dtype={"product": str, "fee": str, "effective_from": str}))
+
+    def rates(self, product, duration_days, on=None):
+        """Rates in percent of every fee, as a dict of arrays broadcast over the inputs.
+
+        ``product`` holds product codes (``"fund"``) or indices (``FUND``);
+        ``on`` is the valuation date, today by default.
+        """
+        product = product_index(product)
+        on = np.asarray(date.today() if on is None else on, dtype="datetime64[D]")
+        date_slot = np.searchsorted(self.dates, on, side="right")
+        duration_slot = np.searchsorted(self.durations, np.asarray(duration_days), side="right")
+        rates = self.table[:, product, date_slot, duration_slot]
+        return dict(zip(FEES, rates))
+
+    def evaluate(self, investment_amount, duration_days, product, rate, on=None):
+        """Net results of a batch of scenarios with the fees in force.
+
+        ``rate`` is the yearly interest in percent for deposits and repos and
+        the latest daily return (a decimal) for funds. Returns the
+        ``fund_returns`` dict of arrays.
+        """
+        product = product_index(product)
+        fees = self.rates(product, duration_days, on)
+        rate = np.asarray(rate, dtype=float)
+        daily_return = np.where(product == FUND, rate, rate / 100 / 365)
+        return fund_returns(
+            investment_amount,
+            duration_days,
+            daily_return,
+            commission_rate=fees["commission"],
+            tax_rate=fees["stopaj"],
+            bsmv_rate=fees["bsmv"] / 100
+        )
+
+
+def product_index(product):
+    """Table indices of product codes; indices pass through unchanged."""
+    product = np.asarray(product)
+    if product.dtype.kind not in "USO":
+        return product.astype(np.intp)
+    names, inverse = np.unique(product, return_inverse=True)
+    unknown = set(names) - set(PRODUCT_TYPES)
+    if unknown:
+        raise ValueError(f"Unknown products: {sorted(unknown)}")
+    return np.array([PRODUCT_TYPES.index(name) for name in names], dtype=np.intp)[inverse].reshape(product.shape)
+
+
+@functools.lru_cache(maxsize=4)
+def get_fee_schedule(path=FEES_FILE):
+    """Schedule compiled once per process and file."""
+    return FeeSchedule.from_csv(path)
@@ -0,0 +1,145 @@
+"""Conditional HTTP fetch over a pooled session, backed by an on-disk copy.
+
+The last good payload of every URL is kept in ``data/http_cache`` together
+with its ``ETag`` and ``Last-Modified`` validators. ``fetch`` serves that copy
+straight from disk while it is younger than ``max_age``; after that it asks
+the server with ``If-None-Match`` / ``If-Modified-Since`` and treats a 304 as
+"reuse the copy". When the server cannot be reached the copy is served as
+stale rather than failing.
+
+With ``background=True`` a copy older than ``max_age`` is returned at once
+and revalidated in a daemon thread (at most one per URL), so a caller on the
+startup path only waits for the network when there is no copy at all; the
+refreshed copy is served from the next call on.
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+DEFAULT_CACHE_DIR = os.path.join("data", "http_cache")
+
+# (connect, read) timeouts in seconds
+DEFAULT_TIMEOUT = (3.05, 15)
+
+_session = None
+_session_lock = threading.Lock()
+
+# URLs with a background revalidation in flight
+_revalidating = set()
+_revalidating_lock = threading.Lock()
+
+
+def get_session():
+    """Process-wide session so every rerun reuses pooled connections."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=1)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            _session = session
+    return _session
+
+
+def _cache_paths(cache_dir, url):
+    key = hashlib.sha256(url.encode("utf-8")).hexdigest()[:24]
+    return os.path.join(cache_dir, key + ".body"), os.path.join(cache_dir, key + ".json")
+
+
+def _read_cache(cache_dir, url):
+    body_path, meta_path = _cache_paths(cache_dir, url)
+    if not (os.path.exists(body_path) and os.path.exists(meta_path)):
+        return None, None
+    with open(meta_path, encoding="utf-8") as f:
+        meta = json.load(f)
+    with open(body_path, "rb") as f:
+        body = f.read()
+    return body, meta
+
+
+def _write_atomic(path, data):
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def _write_cache(cache_dir, url, body, meta):
+    os.makedirs(cache_dir, exist_ok=True)
+    body_path, meta_path = _cache_paths(cache_dir, url)
+    # Body first, so the validators never describe a payload that is not on disk
+    _write_atomic(body_path, body)
+    _write_atomic(meta_path, json.dumps(meta).encode("utf-8"))
+
+
+def fetch(url, cache_dir=DEFAULT_CACHE_DIR, max_age=0, timeout=DEFAULT_TIMEOUT, background=False):
+    """Return ``(content, source)`` for ``url``.
+
+    ``source`` tells where the bytes came from: ``"disk"`` (copy younger than
+    ``max_age`` seconds, no request made), ``"revalidating"`` (older copy
+    served while a background request refreshes it, with ``background=True``),
+    ``"not_modified"`` (server answered 304), ``"network"`` (fresh 200
+    response) or ``"stale"`` (request failed, last good copy served). Raises
+    the request error when there is no copy.
+    """
+    body, meta = _read_cache(cache_dir, url)
+    if body is not None and time.time() - meta["fetched_at"] < max_age:
+        return body, "disk"
+
+    if body is not None and background:
+        with _revalidating_lock:
+            start = url not in _revalidating
+            _revalidating.add(url)
+        if start:
+            threading.Thread(target=_revalidate, args=(url, cache_dir, timeout), daemon=True).start()
+        return body, "revalidating"
+
+    return _request(url, cache_dir, body, meta, timeout)
+
+
+def _revalidate(url, cache_dir, timeout):
+    try:
+        body, meta = _read_cache(cache_dir, url)
+        _request(url, cache_dir, body, meta, timeout)
+    except requests.RequestException:
+        # The copy stays as it is; the next call tries again
+        pass
+    finally:
+        with _revalidating_lock:
+            _revalidating.discard(url)
+
+
+def _request(url, cache_dir, body, meta, timeout):
+    """Conditional GET against the copy ``body``/``meta``, updating the copy on disk."""
+    headers = {}
+    if meta is not None:
+        if meta.get("etag"):
+            headers["If-None-Match"] = meta["etag"]
+        if meta.get("last_modified"):
+            headers["If-Modified-Since"] = meta["last_modified"]
+
+    try:
+        response = get_session().get(url, headers=headers, timeout=timeout)
+        if response.status_code == 304 and body is not None:
+            meta["fetched_at"] = time.time()
+            _write_atomic(_cache_paths(cache_dir, url)[1], json.dumps(meta).encode("utf-8"))
+            return body, "not_modified"
+        response.raise_for_status()
+    except requests.RequestException:
+        if body is not None:
+            return body, "stale"
+        raise
+
+    _write_cache(cache_dir, url, response.content, {
+        "url": url,
+        "etag": response.headers.get("ETag"),
+        "last_modified": response.headers.get("Last-Modified"),
+        "fetched_at": time.time(),
+    })
+    return response.content, "network"
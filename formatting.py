@@ -0,0 +1,148 @@
+"""Turkish number formatting (``1.234,56`` and ``%12,34``).
+
+``format_turkish`` and ``format_turkish_percent`` format one value for the
+cards and chart ticks. The ``*_array`` variants format a whole NumPy array
+or pandas Series at once: digits, separators and signs are assembled as a
+byte matrix with array operations, so formatting tens of thousands of
+values costs a handful of NumPy calls instead of a Python loop per value.
+
+Both round the exact value of each float to the requested number of
+decimals (ties to even), so a value prints the same on a card and in a
+table, and both render an exact zero as a bare ``0`` like the original card code did.
+A missing (NaN) or infinite value prints as ``MISSING`` in both.
+"""
+import math
+
+import numpy as np
+import pandas as pd
+
+# Swap Python's "1,234.56" separators for Turkish "1.234,56"
+_TURKISH_SEPARATORS = str.maketrans({",": ".", ".": ","})
+
+# Shown instead of a number for missing (NaN) or infinite values
+MISSING = "—"
+
+_ZERO, _DOT, _COMMA, _MINUS = (ord(char) for char in "0.,-")
+
+
+def format_turkish(number, decimals=2):
+    """Format number with Turkish locale (1.234,56)"""
+    if not math.isfinite(number):
+        return MISSING
+    if number == 0:
+        return "0"
+    return f"{number:,.{decimals}f}".translate(_TURKISH_SEPARATORS)
+
+
+def format_turkish_percent(number, decimals=2):
+    """Format percentage with Turkish locale (%12,34)"""
+    if not math.isfinite(number):
+        return MISSING
+    return f"%{format_turkish(number, decimals)}"
+
+
+def _digit_columns(values, width):
+    """Decimal digits of non-negative ints as uint8 ASCII, most significant first."""
+    powers = 10 ** np.arange(width - 1, -1, -1, dtype=np.int64)
+    return (values[:, np.newaxis] // powers % 10).astype(np.uint8) + _ZERO
+
+
+def _split(values):
+    """High and low halves of float64 values, each with at most 26 significant bits."""
+    scaled = values * 134217729.0  # 2 ** 27 + 1
+    high = scaled - (scaled - values)
+    return high, values - high
+
+
+def _round_scaled(values, scale):
+    """``values * scale`` rounded to ints exactly as ``f"{value:.{decimals}f}"`` rounds.
+
+    The float product is off by up to half an ulp, which flips ties such as
+    ``367.15 * 10``. Dekker's error-free product gives the exact remainder, so
+    the rounding is decided on the exact value of the float, with exact ties
+    going to the even neighbour like Python's formatting.
+    """
+    product = values * scale
+    value_high, value_low = _split(values)
+    scale_high, scale_low = _split(np.float64(scale))
+    error = (((value_high * scale_high - product) + value_high * scale_low) + value_low * scale_high) + value_low * scale_low
+
+    whole = np.floor(product)
+    # product - whole is exact; so is its distance to 0.5
+    above_half = (product - whole) - 0.5
+    up = (above_half > -error) | ((above_half == -error) & (whole % 2 == 1))
+    return whole.astype(np.int64) + up
+
+
+def format_turkish_array(values, decimals=2, prefix=""):
+    """Format every value of an array or Series with Turkish separators.
+
+    ``prefix`` (ASCII only) is put in front of each value, after which the
+    sign follows, e.g. ``%-1,50``. NaN and infinite values become
+    ``MISSING``, without the prefix. Returns an array of ``str`` of the same shape, or a Series with
+    the same index when given a Series.
+    """
+    index = values.index if isinstance(values, pd.Series) else None
+    values = np.asarray(values, dtype=np.float64)
+    shape = values.shape
+    flat = values.ravel()
+    count = flat.size
+    if count == 0:
+        result = np.array([], dtype=str).reshape(shape)
+        return pd.Series(result, index=index, dtype=object) if index is not None else result
+
+    finite = np.isfinite(flat)
+    clean = np.where(finite, flat, 0.0)
+    negative = clean < 0
+    scale = 10 ** decimals
+    scaled = _round_scaled(np.abs(clean), scale)
+    int_part = scaled // scale
+
+    # Integer digits with a "." before every group of three, right-aligned
+    int_width = len(str(int(int_part.max())))
+    int_digits = _digit_columns(int_part, int_width)
+    columns = []
+    for k in range(int_width):
+        if k > 0 and (int_width - k) % 3 == 0:
+            columns.append(np.full(count, _DOT, dtype=np.uint8))
+        columns.append(int_digits[:, k])
+    if decimals > 0:
+        columns.append(np.full(count, _COMMA, dtype=np.uint8))
+        columns.extend(_digit_columns(scaled % scale, decimals).T)
+    body = np.stack(columns, axis=1)
+
+    # Significant characters per value: its own digits, separators and decimals
+    digits = 1 + (int_part[:, np.newaxis] >= 10 ** np.arange(1, int_width, dtype=np.int64)).sum(axis=1)
+    length = digits + (digits - 1) // 3 + (decimals + 1 if decimals > 0 else 0)
+    start = body.shape[1] - length
+
+    # Left-align each value behind an optional sign: gather from
+    # [minus, body..., NUL] so a row reads "-" (if negative), then its
+    # significant characters, then NUL padding
+    padded = np.empty((count, body.shape[1] + 2), dtype=np.uint8)
+    padded[:, 0] = _MINUS
+    padded[:, 1:-1] = body
+    padded[:, -1] = 0
+    sign = negative.astype(np.int64)
+    position = np.arange(int(length.max()) + 1)
+    source = (1 + start - sign)[:, np.newaxis] + position
+    source = np.where(position < (length + sign)[:, np.newaxis], source, padded.shape[1] - 1)
+    source[negative, 0] = 0
+    text = np.take_along_axis(padded, source, axis=1)
+
+    prefix_bytes = np.frombuffer(prefix.encode("ascii"), dtype=np.uint8)
+    out = np.empty((count, len(prefix_bytes) + text.shape[1]), dtype=np.uint8)
+    out[:, :len(prefix_bytes)] = prefix_bytes
+    out[:, len(prefix_bytes):] = text
+
+    # Trailing NUL bytes are dropped by the fixed-width bytes dtype
+    result = out.view(f"S{out.shape[1]}").ravel().astype(str)
+    result[flat == 0] = prefix + "0"
+    result[~finite] = MISSING
+    result = result.reshape(shape)
+    return pd.Series(result, index=index, dtype=object) if index is not None else result
+
+
+def format_turkish_percent_array(values, decimals=2):
+    """Batch version of ``format_turkish_percent``."""
+    return format_turkish_array(values, decimals, prefix="%")
@@ -0,0 +1,112 @@
+"""Schema and vectorized parsing of fund files (``funds.csv`` and snapshots).
+
+A fund file has the columns ``Fon Kodu``, ``Fon Adı``, ``Tarih`` (``%d.%m.%Y``)
+and ``Değişim`` (the daily return as a decimal). ``read_fund_csv`` reads one
+with every column as text through the pyarrow CSV reader. ``parse_fund_frame``
+turns the text columns into typed ones without a Python call per row:
+
+- ``Fon Kodu`` and ``Fon Adı`` become categoricals
+- ``Tarih`` is parsed with the fixed format, once per distinct date (a
+  history file repeats a few thousand dates over millions of rows)
+- ``Değişim`` accepts Turkish decimals (``0,0013``, ``1.234,5``) and a
+  trailing ``%`` (``0,13%`` is 0.0013)
+
+Values that are not usable returns become NaN, and the reason is kept in the
+``Değişim Durumu`` column (``RETURN_*`` codes) so callers can tell an empty
+cell from text that does not parse and from the ``-1`` sentinel. The source
+writes ``-1`` (-100%, also accepted as ``-100%``) for funds without a price change that day (e.g.
+``TP2``); a real fund cannot lose its whole value in a day, so it is never
+treated as a return.
+"""
+import numpy as np
+import pandas as pd
+
+COLUMNS = ("Fon Kodu", "Fon Adı", "Tarih", "Değişim")
+DATE_FORMAT = "%d.%m.%Y"
+
+# Marks a missing return in the source
+SENTINEL_RETURN = -1.0
+
+# Değişim Durumu codes
+RETURN_OK, RETURN_EMPTY, RETURN_INVALID, RETURN_SENTINEL = 0, 1, 2, 3
+RETURN_STATUS_LABELS = {
+    RETURN_OK: "Geçerli",
+    RETURN_EMPTY: "Boş",
+    RETURN_INVALID: "Okunamadı",
+    RETURN_SENTINEL: "Eksik (-1)",
+}
+
+
+def read_fund_csv(source):
+    """Read a fund file (path or file-like) with every column as ``string``.
+
+    Uses the pyarrow CSV reader directly: it skips a UTF-8 byte order mark and
+    avoids the fixed cost of going through ``pd.read_csv`` for small files.
+    """
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+
+    convert = pa_csv.ConvertOptions(
+        include_columns=list(COLUMNS),
+        column_types={column: pa.string() for column in COLUMNS}
+    )
+    table = pa_csv.read_csv(source, convert_options=convert)
+    return table.to_pandas(types_mapper={pa.string(): pd.StringDtype()}.get)
+
+
+def parse_returns(values):
+    """Daily returns and their ``RETURN_*`` status codes; unusable values are NaN."""
+    values = pd.Series(values)
+    if pd.api.types.is_numeric_dtype(values):
+        numbers = values.to_numpy(dtype=np.float64, na_value=np.nan, copy=True)
+        status = np.where(np.isnan(numbers), RETURN_EMPTY, RETURN_OK).astype(np.uint8)
+    else:
+        text = values.astype("string").str.strip()
+        empty = (text.isna() | (text == "")).to_numpy(dtype=bool)
+        percent = text.str.endswith("%").to_numpy(dtype=bool, na_value=False)
+        if percent.any():
+            text = text.str.rstrip("%")
+        # With a decimal comma, dots only group thousands
+        comma = text.str.contains(",", regex=False).to_numpy(dtype=bool, na_value=False)
+        if comma.any():
+            text = text.mask(comma, text.str.replace(".", "", regex=False).str.replace(",", ".", regex=False))
+        numbers = _to_float(text)
+        numbers = np.where(percent, numbers / 100, numbers)
+        status = np.where(empty, RETURN_EMPTY, np.where(np.isnan(numbers), RETURN_INVALID, RETURN_OK)).astype(np.uint8)
+
+    # Checked on the normalized value, so "-1", "-1,0" and "-100%" are all flagged
+    sentinel = numbers == SENTINEL_RETURN
+    status[sentinel] = RETURN_SENTINEL
+    numbers[sentinel] = np.nan
+    return numbers, status
+
+
+def _to_float(text):
+    """Float64 of a string Series: pyarrow's cast when every value parses, else NaN per bad value."""
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    try:
+        return pc.cast(pa.array(text, from_pandas=True), pa.float64()).to_numpy(zero_copy_only=False)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        return pd.to_numeric(text, errors="coerce").to_numpy(dtype=np.float64, na_value=np.nan)
+
+
+def parse_dates(values):
+    """``datetime64[ns]`` of ``%d.%m.%Y`` dates, NaT where a value does not parse."""
+    codes, uniques = pd.factorize(pd.Series(values), use_na_sentinel=True)
+    parsed = pd.to_datetime(pd.Series(uniques, dtype="string"), format=DATE_FORMAT, errors="coerce").to_numpy()
+    # Append NaT for the missing-value code -1
+    return np.append(parsed, np.datetime64("NaT", "ns"))[codes]
+
+
+def parse_fund_frame(raw):
+    """Typed copy of a fund frame plus the ``Değişim Durumu`` column."""
+    returns, status = parse_returns(raw["Değişim"])
+    return pd.DataFrame({
+        "Fon Kodu": pd.Categorical(raw["Fon Kodu"].astype("string").str.strip()),
+        "Fon Adı": pd.Categorical(raw["Fon Adı"]),
+        "Tarih": parse_dates(raw["Tarih"]),
+        "Değişim": returns,
+        "Değişim Durumu": status,
+    })
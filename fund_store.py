@@ -0,0 +1,258 @@
+"""Append-only, memory-mapped history of daily fund returns (Değişim).
+
+The store lives in a directory (``data/fund_store`` by default) with two files:
+
+- ``returns.f8``: a float64 matrix of shape ``(days, fund_capacity)``. Row ``i``
+  is calendar day ``start_date + i``; column ``j`` is the ``j``-th fund code.
+  Cells without a value are NaN.
+- ``meta.json``: the start date, the number of days, the column capacity and
+  the fund codes and names in column order.
+
+Rows are days, so appending a new day is a plain file append and one date
+across every fund is a contiguous row. A fund's whole history is a strided
+column of the same memory map. Both slices are views found by index
+arithmetic, and nothing is read from disk until a slice is touched.
+"""
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_STORE_DIR = os.path.join("data", "fund_store")
+RETURNS_FILE = "returns.f8"
+META_FILE = "meta.json"
+
+# Columns are reserved in powers of two so adding funds rarely rewrites the file
+MIN_FUND_CAPACITY = 64
+
+# Days of NaN padding written per block when the date axis grows
+EXTEND_BLOCK_DAYS = 366
+
+ONE_DAY = np.timedelta64(1, "D")
+
+
+class FundStore:
+    """Fund × date matrix of daily returns backed by a memory-mapped file.
+
+    A single writer is assumed; any number of readers can open the same
+    directory. Readers see new data after calling ``reload``.
+    """
+
+    def __init__(self, path=DEFAULT_STORE_DIR):
+        self.path = path
+        self._meta = None
+        self._returns = None
+        self._code_index = None
+
+    # Metadata
+
+    @property
+    def meta(self):
+        if self._meta is None:
+            meta_path = os.path.join(self.path, META_FILE)
+            if os.path.exists(meta_path):
+                with open(meta_path, encoding="utf-8") as f:
+                    self._meta = json.load(f)
+            else:
+                self._meta = {"start_date": None, "days": 0, "fund_capacity": 0, "codes": [], "names": []}
+        return self._meta
+
+    @property
+    def codes(self):
+        return self.meta["codes"]
+
+    @property
+    def names(self):
+        return self.meta["names"]
+
+    @property
+    def start_date(self):
+        start = self.meta["start_date"]
+        return None if start is None else np.datetime64(start, "D")
+
+    @property
+    def dates(self):
+        if self.start_date is None:
+            return np.array([], dtype="datetime64[D]")
+        return self.start_date + np.arange(self.meta["days"])
+
+    @property
+    def code_index(self):
+        if self._code_index is None:
+            self._code_index = {code: i for i, code in enumerate(self.codes)}
+        return self._code_index
+
+    def fund_index(self, code):
+        """Column of a fund code. Raises KeyError for unknown funds."""
+        return self.code_index[code]
+
+    def date_index(self, date):
+        """Row of a calendar date. Raises KeyError outside the stored range."""
+        if self.start_date is None:
+            raise KeyError(date)
+        row = int((np.datetime64(date, "D") - self.start_date) // ONE_DAY)
+        if not 0 <= row < self.meta["days"]:
+            raise KeyError(date)
+        return row
+
+    def reload(self):
+        """Drop cached metadata and mappings so the next access sees new data."""
+        self._meta = None
+        self._returns = None
+        self._code_index = None
+
+    # Reading
+
+    @property
+    def returns(self):
+        """Read-only ``(days, funds)`` view of the memory-mapped matrix."""
+        if self._returns is None:
+            days, capacity = self.meta["days"], self.meta["fund_capacity"]
+            if days == 0 or capacity == 0:
+                return np.empty((0, len(self.codes)))
+            matrix = np.memmap(self._returns_path(), dtype=np.float64, mode="r", shape=(days, capacity))
+            self._returns = matrix[:, :len(self.codes)]
+        return self._returns
+
+    def fund_series(self, code):
+        """Every stored day of one fund, as a view (NaN where missing)."""
+        return self.returns[:, self.fund_index(code)]
+
+    def day(self, date):
+        """Every fund on one date, as a view (NaN where missing)."""
+        return self.returns[self.date_index(date)]
+
+    def lookup(self, codes, dates):
+        """Stored values for parallel sequences of fund codes and dates.
+
+        Touches only the requested cells. Unknown funds and dates outside the
+        stored range come back as NaN.
+        """
+        codes = pd.Series(codes).reset_index(drop=True)
+        values = np.full(len(codes), np.nan)
+        if self.start_date is None or len(codes) == 0:
+            return values
+        rows = ((pd.Series(dates).to_numpy().astype("datetime64[D]") - self.start_date) // ONE_DAY).astype(np.int64)
+        cols = codes.map(self.code_index).to_numpy(dtype=np.float64)
+        found = ~np.isnan(cols) & (rows >= 0) & (rows < self.meta["days"])
+        values[found] = self.returns[rows[found], cols[found].astype(np.int64)]
+        return values
+
+    def fund_frame(self, code):
+        """One fund's history as a Series indexed by date, without missing days."""
+        series = pd.Series(self.fund_series(code), index=pd.DatetimeIndex(self.dates), name=code)
+        return series.dropna()
+
+    def latest(self):
+        """Most recent value of every fund, in the ``funds.csv`` schema."""
+        returns = self.returns
+        if returns.size == 0:
+            return pd.DataFrame(columns=["Fon Kodu", "Fon Adı", "Tarih", "Değişim"])
+        present = ~np.isnan(returns)
+        has_value = present.any(axis=0)
+        # Last row holding a value, per fund
+        last_row = returns.shape[0] - 1 - present[::-1].argmax(axis=0)
+        columns = np.flatnonzero(has_value)
+        rows = last_row[columns]
+        return pd.DataFrame({
+            "Fon Kodu": np.asarray(self.codes, dtype=object)[columns],
+            "Fon Adı": np.asarray(self.names, dtype=object)[columns],
+            "Tarih": pd.DatetimeIndex(self.dates[rows]),
+            "Değişim": returns[rows, columns],
+        })
+
+    # Writing
+
+    def append(self, frame):
+        """Write the (fund, date) values of ``frame`` into the store.
+
+        ``frame`` has the ``funds.csv`` columns with ``Tarih`` already parsed
+        to datetimes and ``Değişim`` to floats. New funds get new columns and
+        later dates extend the date axis; dates before the first stored day
+        are rejected because the file only grows at the end. Returns the
+        number of cells written.
+        """
+        if frame.empty:
+            return 0
+
+        dates = frame["Tarih"].to_numpy().astype("datetime64[D]")
+        meta = self.meta
+        if meta["start_date"] is None:
+            meta["start_date"] = str(dates.min())
+        start = self.start_date
+        if dates.min() < start:
+            raise ValueError(f"Cannot write {dates.min()} before the first stored day {start}")
+
+        # Register funds not seen before
+        latest_names = frame.drop_duplicates("Fon Kodu", keep="last")
+        for code, name in zip(latest_names["Fon Kodu"], latest_names["Fon Adı"]):
+            if code not in self.code_index:
+                self.code_index[code] = len(meta["codes"])
+                meta["codes"].append(code)
+                meta["names"].append(name)
+
+        self._ensure_capacity(len(meta["codes"]))
+        self._ensure_days(int((dates.max() - start) // ONE_DAY) + 1)
+
+        rows = ((dates - start) // ONE_DAY).astype(np.int64)
+        cols = frame["Fon Kodu"].map(self.code_index).to_numpy(dtype=np.int64)
+        matrix = np.memmap(self._returns_path(), dtype=np.float64, mode="r+", shape=(meta["days"], meta["fund_capacity"]))
+        matrix[rows, cols] = frame["Değişim"].to_numpy(dtype=np.float64)
+        matrix.flush()
+        del matrix
+
+        self._write_meta()
+        self._returns = None
+        return len(frame)
+
+    def _returns_path(self):
+        return os.path.join(self.path, RETURNS_FILE)
+
+    def _write_meta(self):
+        os.makedirs(self.path, exist_ok=True)
+        tmp_path = os.path.join(self.path, META_FILE + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.meta, f, ensure_ascii=False)
+        os.replace(tmp_path, os.path.join(self.path, META_FILE))
+
+    def _ensure_capacity(self, funds):
+        """Widen the matrix so it has at least ``funds`` columns."""
+        meta = self.meta
+        capacity = meta["fund_capacity"]
+        if funds <= capacity:
+            return
+        new_capacity = max(MIN_FUND_CAPACITY, 1 << (funds - 1).bit_length())
+        days = meta["days"]
+        os.makedirs(self.path, exist_ok=True)
+
+        if days > 0:
+            # Copy into a wider file in day blocks, then swap it in
+            tmp_path = self._returns_path() + ".tmp"
+            old = np.memmap(self._returns_path(), dtype=np.float64, mode="r", shape=(days, capacity))
+            new = np.memmap(tmp_path, dtype=np.float64, mode="w+", shape=(days, new_capacity))
+            for block in range(0, days, EXTEND_BLOCK_DAYS):
+                stop = min(block + EXTEND_BLOCK_DAYS, days)
+                new[block:stop, :capacity] = old[block:stop]
+                new[block:stop, capacity:] = np.nan
+            new.flush()
+            del old, new
+            os.replace(tmp_path, self._returns_path())
+
+        meta["fund_capacity"] = new_capacity
+        self._returns = None
+
+    def _ensure_days(self, days):
+        """Append NaN rows so the matrix covers at least ``days`` days."""
+        meta = self.meta
+        missing = days - meta["days"]
+        if missing <= 0:
+            return
+        os.makedirs(self.path, exist_ok=True)
+        with open(self._returns_path(), "ab") as f:
+            for block in range(0, missing, EXTEND_BLOCK_DAYS):
+                rows = min(EXTEND_BLOCK_DAYS, missing - block)
+                f.write(np.full((rows, meta["fund_capacity"]), np.nan).tobytes())
+        meta["days"] = days
+        self._returns = None
+
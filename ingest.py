@@ -0,0 +1,157 @@
+"""Incremental ingest of daily fund snapshots into the fund store.
+
+A snapshot is any file in the ``funds.csv`` schema (``Fon Kodu, Fon Adı,
+Tarih, Değişim``). Sources can be a single file, a directory of snapshot
+files or a URL:
+
+    python ingest.py snapshots/
+    python ingest.py https://raw.githubusercontent.com/srtczn/compBoard/main/funds.csv
+
+Each snapshot is diffed against the store cell by cell and only new or
+changed (fund, date) values are written, so re-running an ingest is a
+no-op. Files in a directory that were already ingested and have not
+changed since are skipped without being read. Every run appends its
+counts to ``ingest_log.jsonl`` next to the store.
+"""
+import argparse
+import io
+import json
+import os
+import time
+from datetime import datetime
+
+import numpy as np
+
+from fetch import fetch
+from fund_file import COLUMNS, parse_dates, parse_returns, read_fund_csv
+from fund_store import DEFAULT_STORE_DIR, FundStore
+
+SNAPSHOT_COLUMNS = list(COLUMNS)
+MANIFEST_FILE = "ingested.json"
+LOG_FILE = "ingest_log.jsonl"
+
+
+def parse_snapshot(raw):
+    """Parse a raw snapshot frame: dates to datetimes, Değişim to floats (NaN when missing)."""
+    snapshot = raw[SNAPSHOT_COLUMNS].copy()
+    snapshot["Tarih"] = parse_dates(snapshot["Tarih"])
+    snapshot["Değişim"], _ = parse_returns(snapshot["Değişim"])
+    return snapshot
+
+
+def read_snapshot(source):
+    """Read one snapshot file or URL into a parsed frame."""
+    if source.startswith(("http://", "https://")):
+        content, _ = fetch(source)
+        raw = read_fund_csv(io.BytesIO(content))
+    else:
+        raw = read_fund_csv(source)
+    return parse_snapshot(raw)
+
+
+def ingest_frame(store, snapshot):
+    """Write the new and changed rows of a parsed snapshot into ``store``.
+
+    Returns a dict of counts: ``rows`` read, ``deduped`` (repeated
+    (fund, date) pairs within the snapshot), ``new`` and ``updated`` cells
+    written, ``unchanged`` cells already stored with the same value and
+    ``skipped`` rows without a value or a date, or dated before the store's first day.
+    """
+    stats = {"rows": len(snapshot), "deduped": 0, "new": 0, "updated": 0, "unchanged": 0, "skipped": 0}
+
+    snapshot = snapshot.drop_duplicates(["Fon Kodu", "Tarih"], keep="last").reset_index(drop=True)
+    stats["deduped"] = stats["rows"] - len(snapshot)
+
+    values = snapshot["Değişim"].to_numpy(dtype=np.float64)
+    dates = snapshot["Tarih"].to_numpy().astype("datetime64[D]")
+    skipped = np.isnan(values) | np.isnat(dates)
+    if store.start_date is not None:
+        skipped |= dates < store.start_date
+
+    stored = store.lookup(snapshot["Fon Kodu"], snapshot["Tarih"])
+    new = ~skipped & np.isnan(stored)
+    updated = ~skipped & ~new & (stored != values)
+
+    stats["skipped"] = int(skipped.sum())
+    stats["new"] = int(new.sum())
+    stats["updated"] = int(updated.sum())
+    stats["unchanged"] = len(snapshot) - stats["skipped"] - stats["new"] - stats["updated"]
+
+    store.append(snapshot[new | updated])
+    return stats
+
+
+def _snapshot_files(directory):
+    return sorted(
+        os.path.join(directory, name)
+        for name in os.listdir(directory)
+        if name.lower().endswith(".csv")
+    )
+
+
+def _load_manifest(store):
+    manifest_path = os.path.join(store.path, MANIFEST_FILE)
+    if os.path.exists(manifest_path):
+        with open(manifest_path, encoding="utf-8") as f:
+            return json.load(f)
+    return {}
+
+
+def _save_manifest(store, manifest):
+    os.makedirs(store.path, exist_ok=True)
+    tmp_path = os.path.join(store.path, MANIFEST_FILE + ".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f)
+    os.replace(tmp_path, os.path.join(store.path, MANIFEST_FILE))
+
+
+def _log(store, entry):
+    os.makedirs(store.path, exist_ok=True)
+    with open(os.path.join(store.path, LOG_FILE), "a", encoding="utf-8") as f:
+        f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+
+
+def ingest(source, store_dir=DEFAULT_STORE_DIR):
+    """Ingest a file, a directory of files or a URL. Returns one stats dict per snapshot read."""
+    store = FundStore(store_dir)
+    if os.path.isdir(source):
+        manifest = _load_manifest(store)
+        sources = []
+        for path in _snapshot_files(source):
+            stat = os.stat(path)
+            signature = [stat.st_size, stat.st_mtime_ns]
+            key = os.path.abspath(path)
+            if manifest.get(key) != signature:
+                sources.append((path, key, signature))
+    else:
+        manifest = None
+        sources = [(source, None, None)]
+
+    results = []
+    for path, key, signature in sources:
+        started = time.perf_counter()
+        stats = ingest_frame(store, read_snapshot(path))
+        stats["source"] = path
+        stats["elapsed_ms"] = round((time.perf_counter() - started) * 1000, 2)
+        stats["ingested_at"] = datetime.now().isoformat(timespec="seconds")
+        _log(store, stats)
+        results.append(stats)
+        if manifest is not None:
+            manifest[key] = signature
+            _save_manifest(store, manifest)
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Append new fund snapshot rows to the fund store.")
+    parser.add_argument("sources", nargs="+", help="snapshot file, directory of snapshot files or URL")
+    parser.add_argument("--store", default=DEFAULT_STORE_DIR, help="fund store directory")
+    args = parser.parse_args()
+
+    for source in args.sources:
+        for stats in ingest(source, args.store):
+            print(
+                f"{stats['source']}: {stats['rows']} rows, {stats['new']} new, {stats['updated']} updated, "
+                f"{stats['unchanged']} unchanged, {stats['deduped']} deduped, {stats['skipped']} skipped "
+                f"({stats['elapsed_ms']} ms)"
+            )
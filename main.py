@@ -1,13 +1,18 @@
 import streamlit as st
-import pandas as pd
 import numpy as np
-import io
-import requests
-from datetime import datetime, timedelta
 import os
-from PIL import Image
-import matplotlib.pyplot as plt
-import locale
+from datetime import date, timedelta
+import metrics
+from business_calendar import CONVENTIONS, get_business_calendar
+from dataset import get_compounding_table, get_fund_dataset
+from charts import chart_cache, chart_key, figure
+from formatting import format_turkish, format_turkish_percent
+from calculations import calculate_growth, fixed_income_returns, fund_returns, to_scalars
+from export import FORMATS, export_bytes, fixed_income_product, fund_product
+from fees import DEPOSIT, FUND, PRODUCT_TYPES, REPO, get_fee_schedule
+from fund_file import RETURN_STATUS_LABELS
+from fund_store import FundStore
+from simulation import MIN_HISTORY, bootstrap_model, fitted_model, max_paths, normal_model, simulate_fund_bands
 
 # Set page configuration with custom name and icon
 st.set_page_config(
@@ -22,6 +27,9 @@ st.set_page_config(
     }
 )
 
+# Time this rerun's stages (see metrics.py)
+metrics.begin_rerun("main")
+
 # Hide the native navigation
 st.markdown("""
 <style>
@@ -147,123 +155,14 @@ st.markdown(f"""
 # App header
 st.markdown("<h1 class='main-header'>Mundi Getiri Hesaplama</h1>", unsafe_allow_html=True)
 
-# Function to convert string percentage to float
-def convert_to_float(value):
-    if isinstance(value, str):
-        # Replace comma with dot if needed
-        value = value.replace(',', '.')
-        # Remove any % sign if present
-        value = value.replace('%', '')
-    return float(value)
-
-# Function to format numbers in Turkish locale (. as thousands separator, , as decimal)
-def format_turkish(number, decimals=2):
-    """Format number with Turkish locale (1.234,56)"""
-    if number == 0:
-        return "0"
-    
-    # Get integer and decimal parts
-    if decimals > 0:
-        integer_part = int(number)
-        decimal_part = abs(number) - abs(int(number))
-        
-        # Format integer part with thousands separator
-        formatted_int = ""
-        int_str = str(abs(integer_part))
-        for i, digit in enumerate(reversed(int_str)):
-            if i > 0 and i % 3 == 0:
-                formatted_int = "." + formatted_int
-            formatted_int = digit + formatted_int
-        
-        if integer_part < 0:
-            formatted_int = "-" + formatted_int
-            
-        # Format decimal part
-        formatted_decimal = str(int(decimal_part * (10 ** decimals)))
-        # Pad with leading zeros if needed
-        formatted_decimal = formatted_decimal.zfill(decimals)
-        
-        return f"{formatted_int},{formatted_decimal}"
-    else:
-        # No decimals, just format integer
-        integer_part = int(round(number, 0))
-        formatted_int = ""
-        int_str = str(abs(integer_part))
-        for i, digit in enumerate(reversed(int_str)):
-            if i > 0 and i % 3 == 0:
-                formatted_int = "." + formatted_int
-            formatted_int = digit + formatted_int
-            
-        if integer_part < 0:
-            formatted_int = "-" + formatted_int
-            
-        return formatted_int
-
-# Function to format percentage in Turkish locale
-def format_turkish_percent(number, decimals=2):
-    """Format percentage with Turkish locale (12,34%)"""
-    formatted = format_turkish(number, decimals)
-    return f"%{formatted}"
-
-# Load fund data from GitHub repository
-@st.cache_data(ttl=3600)  # Cache for 1 hour
-def load_fund_data():
-    try:
-        # GitHub raw content URL for the funds.csv file
-        github_url = "https://raw.githubusercontent.com/srtczn/compBoard/main/funds.csv"
-        
-        response = requests.get(github_url)
-        response.raise_for_status()  # Raise an exception for HTTP errors
-        
-        # Check if we got a valid response
-        if response.status_code == 200:
-            return pd.read_csv(io.StringIO(response.text))
-        else:
-            st.error(f"Failed to fetch data: HTTP {response.status_code}")
-            # Try local file as fallback
-            if os.path.exists("funds.csv"):
-                st.warning("Using local funds.csv file as fallback")
-                return pd.read_csv("funds.csv")
-            else:
-                # Use minimal fallback data if all else fails
-                fallback_data = """Fon Kodu,Fon Adı,Tarih,Değişim
-HVTAL,ALBATROSS PORTFÖY BİRİNCİ PARA PİYASASI (TL) FONU,08.05.2025,0.001542316975"""
-                st.warning("Using minimal fallback data")
-                return pd.read_csv(io.StringIO(fallback_data))
-    except Exception as e:
-        st.error(f"Error loading fund data: {e}")
-        # Try local file as fallback
-        if os.path.exists("funds.csv"):
-            st.warning("Using local funds.csv file as fallback")
-            return pd.read_csv("funds.csv")
-        else:
-            # Use minimal fallback data if all else fails
-            fallback_data = """Fon Kodu,Fon Adı,Tarih,Değişim
-HVTAL,ALBATROSS PORTFÖY BİRİNCİ PARA PİYASASI (TL) FONU,08.05.2025,0.001542316975"""
-            st.warning("Using minimal fallback data")
-            return pd.read_csv(io.StringIO(fallback_data))
-
-# Load and process fund data
-fund_data = load_fund_data()
-
-# Ensure Değişim column is a float (convert from string if needed)
-fund_data['Değişim'] = fund_data['Değişim'].apply(convert_to_float)
-
-# Get list of fund codes and names
-fund_options = dict(zip(fund_data['Fon Kodu'], fund_data['Fon Adı']))
-ticker_list = sorted(fund_data['Fon Kodu'].unique())
-
-# Create a dictionary for fund returns (using Fon Kodu as key)
-latest_returns = dict(zip(fund_data['Fon Kodu'], fund_data['Değişim']))
-
-# Create a description for each fund (using Fon Adı from data)
-fund_descriptions = dict(zip(fund_data['Fon Kodu'], fund_data['Fon Adı']))
+# Shared, read-only fund dataset (one copy per server process)
+funds = get_fund_dataset()
+compounding = get_compounding_table(funds)
 
 # Add logo to the sidebar
 logo_path = "assets/logo.webp"
 if os.path.exists(logo_path):
-    logo = Image.open(logo_path)
-    st.sidebar.image(logo, use_container_width=True)
+    st.sidebar.image(logo_path, use_container_width=True)
 else:
     st.sidebar.image("https://i.ibb.co/0jQ5YtL/logo.png", width=200)
 
@@ -272,6 +171,9 @@ st.sidebar.markdown("---")  # Add a separator
 st.sidebar.markdown("### Navigation")
 st.sidebar.page_link("main.py", label="🏦 Mevduat-Fon Karşılaştırma")
 st.sidebar.page_link("pages/funds.py", label="📊 Fon Karşılaştırma")
+st.sidebar.page_link("pages/screener.py", label="🔎 Fon Tarama")
+st.sidebar.page_link("pages/sensitivity.py", label="🗺️ Duyarlılık Analizi")
+st.sidebar.page_link("pages/portfolio.py", label="⚖️ Dağılım Optimizasyonu")
 
 # Create sidebar for inputs
 st.sidebar.markdown("<h2 class='section-header'>Hesaplama Aracı:</h2>", unsafe_allow_html=True)
@@ -294,110 +196,471 @@ duration_days = st.sidebar.number_input(
     step=1
 )
 
-# Divider
-st.sidebar.markdown("---")
-
-# Fixed Income Product A - Gecelik Mevduat
-st.sidebar.markdown("<h3 style='color: {}'>Gecelik Mevduat</h3>".format(colors["chrysler_blue"]), unsafe_allow_html=True)
-
-interest_rate_a = st.sidebar.number_input(
-    "Faiz Oranı (%)",
-    min_value=0.0,
-    max_value=90.0,
-    value=45.50,
-    step=0.05,
-    key="interest_a"
-)
-
-commission_rate_a = st.sidebar.number_input(
-    "Mundi Komisyon Oranı (%)",
-    min_value=0.0,
-    max_value=5.0,
-    value=1.5,
-    step=0.05,
-    key="commission_a"
-)
-
-tax_rate_a = st.sidebar.number_input(
-    "Stopaj Oranı (%)",
-    min_value=0.0,
-    max_value=50.0,
-    value=15.0,
-    step=0.5,
-    key="tax_a"
-)
-
-# Divider
-st.sidebar.markdown("---")
-
-# Fixed Income Product B - Gecelik Repo
-st.sidebar.markdown("<h3 style='color: {}'>Gecelik Repo</h3>".format(colors["dartmouth_green"]), unsafe_allow_html=True)
-
-interest_rate_b = st.sidebar.number_input(
-    "Faiz Oranı (%)",
-    min_value=0.0,
-    max_value=90.0,
-    value=45.0,
-    step=0.05,
-    key="interest_b"
-)
-
-commission_rate_b = st.sidebar.number_input(
-    "Komisyon Oranı (%)",
-    min_value=0.0,
-    max_value=5.0,
-    value=0.0,
-    step=0.05,
-    key="commission_b"
-)
-
-tax_rate_b = st.sidebar.number_input(
-    "Stopaj Oranı (%)",
-    min_value=0.0,
-    max_value=50.0,
-    value=15.0,
-    step=0.5,
-    key="tax_b"
-)
-
-# Divider
-st.sidebar.markdown("---")
-
-# Fund Product - Yatırım Fonları
-st.sidebar.markdown("<h3 style='color: {}'>Yatırım Fonları</h3>".format(colors["sandy_brown"]), unsafe_allow_html=True)
-
-# Create a display string for selectbox
-fund_display_options = [f"{code} - {name}" for code, name in fund_options.items()]
-
-# Map between display string and actual code
-fund_code_map = {f"{code} - {name}": code for code, name in fund_options.items()}
+# Accrue over real dates: the repo rolls over on business days and the fund
+# only moves on business days (holidays.csv)
+use_calendar = st.sidebar.checkbox("İş Günü Takvimi", value=False)
+start_date = None
+if use_calendar:
+    accrual_calendar = get_business_calendar()
+    start_date = st.sidebar.date_input(
+        "Başlangıç Tarihi",
+        value=date.today(),
+        min_value=accrual_calendar.first_day.item(),
+        max_value=accrual_calendar.last_day.item() - timedelta(days=3650),
+        format="DD.MM.YYYY"
+    )
+    # Past the years in holidays.csv only weekends are skipped
+    if not accrual_calendar.covers_holidays(start_date, start_date + timedelta(days=int(duration_days))):
+        coverage = accrual_calendar.holiday_coverage
+        covered = "" if coverage is None else "{:%d.%m.%Y} - {:%d.%m.%Y} arası dışında ".format(*(day.item() for day in coverage))
+        st.sidebar.warning(f"Resmi tatiller {covered}tanımlı değil; bu günlerde sadece hafta sonları tatil sayılır.")
+
+# Monte Carlo simulation of the fund instead of repeating the latest return
+def fund_history(code):
+    """Recorded daily returns of a fund from the local store, or None when too short."""
+    store = FundStore()
+    if code not in store.code_index:
+        return None
+    history = np.asarray(store.fund_series(code))
+    history = history[~np.isnan(history)]
+    return history if history.size >= MIN_HISTORY else None
+
+@st.cache_data(max_entries=32, show_spinner="Senaryolar hesaplanıyor...")
+def run_simulation(amount, days, model, paths, start_date=None):
+    if start_date is None:
+        return simulate_fund_bands(amount, days, model, paths=paths)
+    # Like the fund line, the paths only move on business days: simulate that
+    # many days and place each band point on its calendar day
+    calendar_days = np.arange(days + 1)
+    business_days = get_business_calendar().business_days(start_date, np.datetime64(start_date) + calendar_days)
+    simulation = simulate_fund_bands(amount, int(business_days[-1]), model, paths=paths)
+    bands = np.stack([np.interp(business_days, simulation["days"], band) for band in simulation["bands"]])
+    return {**simulation, "days": calendar_days, "bands": bands}
+
+# Product inputs, cards, chart and recommendation rerun as one fragment: changing
+# a rate or the fund reruns only this part, not the CSS, logo, data load or
+# navigation. The chart and the simulation are cached on their inputs, so the
+# parts a change does not touch are reused.
+@st.fragment
+@metrics.timed("comparison")
+def product_comparison(investment_amount, duration_days, start_date=None):
+    # Fees and taxes in force today for this holding period (fees.csv); the
+    # commission and stopaj inputs start from them
+    fee_rates = get_fee_schedule().rates(PRODUCT_TYPES, duration_days)
+    bsmv_rates = fee_rates["bsmv"] / 100
+    fund_costs = (float(fee_rates["commission"][FUND]), float(fee_rates["stopaj"][FUND]))
+
+    # Divider
+    st.sidebar.markdown("---")
+
+    # Fixed Income Product A - Gecelik Mevduat
+    st.sidebar.markdown("<h3 style='color: {}'>Gecelik Mevduat</h3>".format(colors["chrysler_blue"]), unsafe_allow_html=True)
+
+    interest_rate_a = st.sidebar.number_input(
+        "Faiz Oranı (%)",
+        min_value=0.0,
+        max_value=90.0,
+        value=45.50,
+        step=0.05,
+        key="interest_a"
+    )
+
+    commission_rate_a = st.sidebar.number_input(
+        "Mundi Komisyon Oranı (%)",
+        min_value=0.0,
+        max_value=5.0,
+        value=float(fee_rates["commission"][DEPOSIT]),
+        step=0.05,
+        key="commission_a"
+    )
+
+    tax_rate_a = st.sidebar.number_input(
+        "Stopaj Oranı (%)",
+        min_value=0.0,
+        max_value=50.0,
+        value=float(fee_rates["stopaj"][DEPOSIT]),
+        step=0.5,
+        key="tax_a"
+    )
+
+    # Divider
+    st.sidebar.markdown("---")
+
+    # Fixed Income Product B - Gecelik Repo
+    st.sidebar.markdown("<h3 style='color: {}'>Gecelik Repo</h3>".format(colors["dartmouth_green"]), unsafe_allow_html=True)
+
+    interest_rate_b = st.sidebar.number_input(
+        "Faiz Oranı (%)",
+        min_value=0.0,
+        max_value=90.0,
+        value=45.0,
+        step=0.05,
+        key="interest_b"
+    )
+
+    commission_rate_b = st.sidebar.number_input(
+        "Komisyon Oranı (%)",
+        min_value=0.0,
+        max_value=5.0,
+        value=float(fee_rates["commission"][REPO]),
+        step=0.05,
+        key="commission_b"
+    )
+
+    tax_rate_b = st.sidebar.number_input(
+        "Stopaj Oranı (%)",
+        min_value=0.0,
+        max_value=50.0,
+        value=float(fee_rates["stopaj"][REPO]),
+        step=0.5,
+        key="tax_b"
+    )
+
+    # Divider
+    st.sidebar.markdown("---")
+
+    # Fund Product - Yatırım Fonları
+    st.sidebar.markdown("<h3 style='color: {}'>Yatırım Fonları</h3>".format(colors["sandy_brown"]), unsafe_allow_html=True)
+
+    # Display selectbox with combined code-name options (labels are built once per dataset)
+    selected_display = st.sidebar.selectbox(
+        "Fon Seçiniz",
+        funds.display,
+        index=0
+    )
+
+    # Extract the actual ticker/code
+    selected_index = funds.display_index[selected_display]
+    selected_ticker = funds.codes[selected_index]
+    selected_name = funds.name(selected_index)
+
+    # Get the latest daily return for the selected fund
+    latest_return = float(funds.returns[selected_index])
+    # NaN when the file has no usable return for the fund (e.g. the -1 sentinel)
+    has_return = not np.isnan(latest_return)
+    # Format the percentage with 6 decimal places in Turkish format
+    if has_return:
+        formatted_return_percent = format_turkish_percent(latest_return * 100, 6)
+    else:
+        formatted_return_percent = f"veri yok ({RETURN_STATUS_LABELS[int(funds.return_status[selected_index])]})"
+    fund_info = f"{selected_name} (Son 1 Günlük Getiri: {formatted_return_percent})"
+    st.sidebar.info(fund_info)
+
+    simulate = st.sidebar.checkbox(
+        "Monte Carlo Simülasyonu",
+        value=False,
+        help="Fonun her gün son getirisini tekrarladığı varsayımı yerine günlük getirileri rastgele örnekleyerek olası sonuç aralığını gösterir."
+    )
+
+    if simulate:
+        # A latest return of -100% or less cannot be compounded, only history can be sampled then
+        history = fund_history(selected_ticker)
+        model_options = ["Normal Dağılım"] if latest_return > -1 else []
+        if history is not None:
+            model_options += ["Geçmiş Getirilerden Örnekleme", "Geçmişe Uyarlanmış Normal Dağılım"]
+        if not model_options:
+            st.sidebar.warning("Bu fonun günlük getirisi geçersiz olduğu için simülasyon yapılamıyor.")
+            simulate = False
+
+    if simulate:
+        model_choice = st.sidebar.radio("Getiri Modeli", model_options)
+
+        if model_choice == "Normal Dağılım":
+            annual_volatility = st.sidebar.number_input(
+                "Yıllık Volatilite (%)",
+                min_value=0.0,
+                max_value=100.0,
+                value=5.0,
+                step=0.5
+            )
+            fund_model = normal_model(latest_return, annual_volatility / 100 / np.sqrt(365))
+        elif model_choice == "Geçmiş Getirilerden Örnekleme":
+            fund_model = bootstrap_model(history)
+        else:
+            fund_model = fitted_model(history)
+
+        path_count = st.sidebar.select_slider(
+            "Senaryo Sayısı",
+            options=[1_000, 10_000, 50_000, 100_000],
+            value=10_000,
+            format_func=lambda n: format_turkish(n, 0)
+        )
+        # Sampling history draws every day, so long horizons allow fewer paths
+        path_limit = max_paths(fund_model, duration_days)
+        if path_count > path_limit:
+            path_count = path_limit
+            st.sidebar.caption(f"Bu süre için en fazla {format_turkish(path_count, 0)} senaryo hesaplanır.")
+
+    # Calculate returns for each product
+    # Fixed Income Product A - Gecelik Mevduat with daily compounding
+    with metrics.span("calculate"):
+        # (1 + r) ** day for day 0..duration_days, read from the shared table
+        fund_curve = compounding.curve(selected_index, duration_days)
+        deposit_curve = repo_curve = None
+        if start_date is not None:
+            # Growth to each date of the range under each product's convention;
+            # the fund compounds once per business day
+            accrual_calendar = get_business_calendar()
+            deposit_curve = accrual_calendar.growth_curve(CONVENTIONS["deposit"], interest_rate_a / 100 / 365, start_date, duration_days)
+            repo_curve = accrual_calendar.growth_curve(CONVENTIONS["repo"], interest_rate_b / 100 / 365, start_date, duration_days)
+            end_dates = np.datetime64(start_date) + np.arange(duration_days + 1)
+            fund_curve = fund_curve[accrual_calendar.business_days(start_date, end_dates)]
+
+        deposit = to_scalars(fixed_income_returns(
+            investment_amount, duration_days, interest_rate_a, commission_rate_a, tax_rate_a,
+            bsmv_rate=bsmv_rates[DEPOSIT], growth_factor=None if deposit_curve is None else deposit_curve[-1]
+        ))
+
+        # Fixed Income Product B - Gecelik Repo with daily compounding
+        repo = to_scalars(fixed_income_returns(
+            investment_amount, duration_days, interest_rate_b, commission_rate_b, tax_rate_b,
+            bsmv_rate=bsmv_rates[REPO], growth_factor=None if repo_curve is None else repo_curve[-1]
+        ))
+
+        # Fund Product - Yatırım Fonu
+        fund = to_scalars(fund_returns(
+            investment_amount,
+            duration_days,
+            latest_return,
+            growth_factor=fund_curve[-1],
+            commission_rate=fund_costs[0],
+            tax_rate=fund_costs[1],
+            bsmv_rate=bsmv_rates[FUND]
+        ))
+
+    with metrics.span("simulate"):
+        simulation = run_simulation(investment_amount, duration_days, fund_model, path_count, start_date) if simulate else None
+
+    net_return_a = deposit["net_return"]
+    net_return_b = repo["net_return"]
+    fund_return = fund["net_return"]
+
+    # Find the best performing product
+    results = {
+        "Gecelik Mevduat": net_return_a,
+        "Gecelik Repo": net_return_b,
+        "Yatırım Fonu": fund_return
+    }
+    # A fund without a return is not compared
+    if not has_return:
+        del results["Yatırım Fonu"]
+
+    best_return = max(results.values())
+    best_product = max(results, key=results.get)
+
+    # Calculate percentage comparisons
+    percentage_a = (net_return_a / best_return) * 100 if best_return > 0 else 100
+    percentage_b = (net_return_b / best_return) * 100 if best_return > 0 else 100
+    percentage_fund = (fund_return / best_return) * 100 if best_return > 0 else 100
+    fund_comparison = format_turkish_percent(percentage_fund, 1) if has_return else "-"
+
+    # Display the results in columns
+    with metrics.span("cards"):
+        col1, col2, col3 = st.columns(3)
+
+        # Fixed Income Product A - Gecelik Mevduat
+        with col1:
+            st.markdown(f"""
+            <div class="card product-a-card">
+                <h3 class="card-title">Gecelik Mevduat</h3>
+                <div class="result-value">₺{format_turkish(net_return_a)}</div>
+                <div class="result-label">Toplam Getiri</div>
+                <div class="result-value">₺{format_turkish(deposit["final_balance"])}</div>
+                <div class="result-label">Net Dönüş Tutarı</div>
+                <div class="divider"></div>
+                <div class="result-label">Detaylar:</div>
+                <div>Brüt Geri Dönüş Tutarı: ₺{format_turkish(deposit["gross_return"])}</div>
+                <div>Mundi Komisyonu: -₺{format_turkish(deposit["commission"])}</div>
+                <div>BSMV: -₺{format_turkish(deposit["bsmv"])}</div>
+                <div>Stopaj: -₺{format_turkish(deposit["tax"])}</div>
+                <div class="divider"></div>
+                <div class="percent-compare">
+                    En iyi getiri ile karşılaştırma: {format_turkish_percent(percentage_a, 1)}
+                    <p>{" ★ EN İYİ GETİRİ" if best_product == "Gecelik Mevduat" else ""}</p>
+                </div>
+            </div>
+            """, unsafe_allow_html=True)
+
+        # Fixed Income Product B - Gecelik Repo
+        with col2:
+            st.markdown(f"""
+            <div class="card product-b-card">
+                <h3 class="card-title">Gecelik Repo</h3>
+                <div class="result-value">₺{format_turkish(net_return_b)}</div>
+                <div class="result-label">Toplam Getiri</div>
+                <div class="result-value">₺{format_turkish(repo["final_balance"])}</div>
+                <div class="result-label">Net Dönüş Tutarı</div>
+                <div class="divider"></div>
+                <div class="result-label">Detaylar:</div>
+                <div>Brüt Geri Dönüş Tutarı: ₺{format_turkish(repo["gross_return"])}</div>
+                <div>Komisyon: -₺{format_turkish(repo["commission"])}</div>
+                <div>BSMV: -₺{format_turkish(repo["bsmv"])}</div>
+                <div>Stopaj: -₺{format_turkish(repo["tax"])}</div>
+                <div class="divider"></div>
+                <div class="percent-compare">
+                    En iyi getiri ile karşılaştırma: {format_turkish_percent(percentage_b, 1)}
+                    <p>{" ★ EN İYİ GETİRİ" if best_product == "Gecelik Repo" else ""}</p>
+                </div>
+            </div>
+            """, unsafe_allow_html=True)
+
+        # Fund Product - Yatırım Fonu
+        simulation_details = ""
+        if simulation is not None:
+            p5, p50, p95 = simulation["final"]
+            simulation_details = f"""
+                <div>Simülasyon P5 / P50 / P95: ₺{format_turkish(p5)} / ₺{format_turkish(p50)} / ₺{format_turkish(p95)}</div>
+                <div>Zarar Olasılığı: {format_turkish_percent(simulation["loss_probability"] * 100, 1)}</div>"""
+
+        # Fund fees and stopaj are only listed when the schedule charges them
+        fund_cost_details = ""
+        if fund["commission"] or fund["tax"]:
+            fund_cost_details = f"""
+                <div>Brüt Geri Dönüş Tutarı: ₺{format_turkish(fund["gross_return"])}</div>
+                <div>Komisyon: -₺{format_turkish(fund["commission"])}</div>
+                <div>BSMV: -₺{format_turkish(fund["bsmv"])}</div>
+                <div>Stopaj: -₺{format_turkish(fund["tax"])}</div>"""
+
+        fund_results = f"""
+                <div class="result-value">₺{format_turkish(fund_return)}</div>
+                <div class="result-label">Toplam Getiri</div>
+                <div class="result-value">₺{format_turkish(fund["final_balance"])}</div>
+                <div class="result-label">Net Dönüş Tutarı</div>
+                <div class="divider"></div>
+                <div class="result-label">Detaylar:</div>
+                <div>Günlük Getiri: {formatted_return_percent}</div>
+                <div>Bileşik Getiri: {format_turkish_percent(fund["total_return"], 2)}</div>
+                {fund_cost_details}"""
+        if not has_return:
+            fund_results = f"""
+                <div class="result-label">Bu fon için geçerli günlük getiri yok</div>
+                <div class="divider"></div>
+                <div>Günlük Getiri: {formatted_return_percent}</div>"""
+
+        with col3:
+            st.markdown(f"""
+            <div class="card fund-card">
+                <h3 class="card-title">Fon: {selected_ticker}</h3>
+                {fund_results}
+                {simulation_details}
+                <div class="divider"></div>
+                <div class="percent-compare">
+                    En iyi getiri ile karşılaştırma: {fund_comparison}
+                    <p>{" ★ EN İYİ GETİRİ" if best_product == "Yatırım Fonu" else ""}</p>
+                </div>
+            </div>
+            """, unsafe_allow_html=True)
+
+    # Additional information and charts
+    st.markdown("<h2 class='section-header'>Getiri Analizi</h2>", unsafe_allow_html=True)
+
+    # Performance comparison chart
+    def draw_growth_chart():
+        # All three curves are computed as arrays in one pass
+        with metrics.span("calculate_growth"):
+            growth_a, growth_b, growth_fund = calculate_growth(
+                investment_amount,
+                duration_days,
+                deposit=(interest_rate_a, commission_rate_a, tax_rate_a),
+                repo=(interest_rate_b, commission_rate_b, tax_rate_b),
+                daily_return=latest_return,
+                bsmv_rate=bsmv_rates,
+                fund_factors=fund_curve,
+                fund_costs=fund_costs,
+                deposit_factors=deposit_curve,
+                repo_factors=repo_curve
+            )
+        days_axis = np.arange(duration_days + 1)
+
+        # matplotlib is only imported once a chart is actually drawn
+        from matplotlib.ticker import FuncFormatter
+
+        fig = figure(figsize=(10, 5))
+        ax = fig.add_subplot()
+
+        # Plot with colors from our palette
+        ax.plot(days_axis, growth_a, color=colors["chrysler_blue"], label="Gecelik Mevduat", linewidth=2)
+        ax.plot(days_axis, growth_b, color=colors["dartmouth_green"], label="Gecelik Repo", linewidth=2)
+        if has_return:
+            ax.plot(days_axis, growth_fund, color=colors["sandy_brown"], label=f"{selected_ticker}", linewidth=2)
+
+        # Simulated P5-P95 band and median of the fund
+        if simulation is not None:
+            low, median, high = simulation["bands"]
+            ax.fill_between(simulation["days"], low, high, color=colors["sandy_brown"], alpha=0.2, label=f"{selected_ticker} P5-P95")
+            ax.plot(simulation["days"], median, color=colors["sandy_brown"], linestyle='--', linewidth=1.5, label=f"{selected_ticker} P50")
+
+        ax.set_xlabel('Gün')
+        ax.set_ylabel('Tutar (₺)')
+        ax.set_title('Yatırımın tahmini performansı')
+
+        # Format y-axis with Turkish number format
+        def turkish_currency_formatter(x, pos):
+            return f'₺{format_turkish(x, 0)}'
+
+        ax.yaxis.set_major_formatter(FuncFormatter(turkish_currency_formatter))
+
+        ax.legend()
+        ax.grid(True, linestyle='--', alpha=0.7)
+
+        # Set background color for the chart
+        ax.set_facecolor(colors["platinum"])
+        fig.patch.set_facecolor('white')
+        return fig
+
+    # Reuse the rendered image when every input of the chart is unchanged
+    growth_chart_key = chart_key(
+        "growth",
+        amount=investment_amount,
+        days=duration_days,
+        deposit=(interest_rate_a, commission_rate_a, tax_rate_a),
+        repo=(interest_rate_b, commission_rate_b, tax_rate_b),
+        ticker=selected_ticker,
+        daily_return=latest_return,
+        fund_costs=fund_costs,
+        bsmv=bsmv_rates.tolist(),
+        start_date=None if start_date is None else start_date.isoformat(),
+        bands=simulation["bands"].round(2).ravel().tolist() if simulation is not None else None
+    )
+    st.image(chart_cache.get_or_render(growth_chart_key, draw_growth_chart), use_container_width=True)
+
+    # Day-by-day schedule of the three products; files are only generated when a button is clicked
+    schedule_products = [
+        fixed_income_product("Gecelik Mevduat", interest_rate_a, commission_rate_a, tax_rate_a, bsmv_rates[DEPOSIT], deposit_curve),
+        fixed_income_product("Gecelik Repo", interest_rate_b, commission_rate_b, tax_rate_b, bsmv_rates[REPO], repo_curve),
+    ]
+    if has_return:
+        schedule_products.append(fund_product(selected_ticker, latest_return, *fund_costs, bsmv_rates[FUND], fund_curve))
+    export_formats = [("csv", "CSV"), ("parquet", "Parquet"), ("xlsx", "Excel")]
+    for column, (export_format, label) in zip(st.columns(len(export_formats)), export_formats):
+        column.download_button(
+            f"Günlük Tablo ({label})",
+            data=lambda export_format=export_format: export_bytes(export_format, investment_amount, duration_days, schedule_products),
+            file_name=f"gunluk_tablo_{duration_days}_gun.{FORMATS[export_format][2]}",
+            mime=FORMATS[export_format][1],
+            on_click="ignore",
+            use_container_width=True
+        )
+
+    # Summary and recommendation
+    st.markdown("<h2 class='section-header'>Sonuç</h2>", unsafe_allow_html=True)
+
+    best_choice_explanation = {
+        "Gecelik Mevduat": f"Gecelik Mevduat günlük bileşik faiz ile daha uygun faiz oranı ve daha düşük ücret/vergi kombinasyonu sayesinde en iyi getiriyi sağlıyor.",
+        "Gecelik Repo": f"Gecelik Repo, daha yüksek ücretlere rağmen günlük bileşik faiz ve üstün faiz oranı sayesinde daha iyi performans gösteriyor.",
+        "Yatırım Fonu": f"Yatırım Fonu ({selected_ticker} - {selected_name}) güçlü bileşik günlük büyüme sayesinde en yüksek getiriyi sunuyor, ancak daha fazla risk taşıyabilir."
+    }
 
-# Display selectbox with combined code-name options
-selected_display = st.sidebar.selectbox(
-    "Fon Seçiniz",
-    fund_display_options,
-    index=0
-)
+    st.markdown(f"""
+    <div style="background-color: rgba(44, 19, 32, 0.05); padding: 1.5rem; border-radius: 10px; margin-top: 1rem; border-left: 5px solid {colors["dark_purple"]};">
+        <h3>Tavsiye</h3>
+        <p><strong>{best_product}</strong>'nin {format_turkish(duration_days, 0)} gün içinde <strong>₺{format_turkish(results[best_product])}</strong> ile en yüksek getiriyi sağlaması öngörülüyor.</p>
+        <p>{best_choice_explanation[best_product]}</p>
+        <p>Geçmiş performansın gelecekteki sonuçları garanti etmediğini, özellikle piyasa volatilitesine tabi olabilecek yatırım fonu seçeneği için, unutmayın.</p>
+    </div>
+    """, unsafe_allow_html=True)
 
-# Extract the actual ticker/code
-selected_ticker = fund_code_map[selected_display]
-
-# Get the latest daily return for the selected fund
-latest_return = latest_returns[selected_ticker]
-# Format the percentage with 6 decimal places in Turkish format
-formatted_return_percent = format_turkish_percent(latest_return * 100, 6)
-fund_info = f"{fund_descriptions[selected_ticker]} (Son 1 Günlük Getiri: {formatted_return_percent})"
-st.sidebar.info(fund_info)
-
-# Process the "Tarih" column to ensure it's in datetime format
-try:
-    fund_data['Tarih'] = pd.to_datetime(fund_data['Tarih'], format='%d.%m.%Y')
-except:
-    try:
-        # Try alternative format
-        fund_data['Tarih'] = pd.to_datetime(fund_data['Tarih'])
-    except Exception as e:
-        st.warning(f"Date format conversion issue: {e}. Using original dates.")
+product_comparison(investment_amount, duration_days, start_date)
 
 # Show data source and update date at the end of the sidebar
 st.sidebar.markdown("---")
@@ -405,251 +668,14 @@ st.sidebar.markdown("<h3 class='section-header'>Veri Kaynağı</h3>", unsafe_all
 st.sidebar.info("Data source: srtczn/compBoard GitHub repository")
 
 # Show when the data was last updated (most recent date in the dataset)
-try:
-    latest_data_date = fund_data['Tarih'].max().strftime('%d.%m.%Y')
-    st.sidebar.success(f"Son veri güncelleme: {latest_data_date}")
-except:
-    # If date conversion failed, don't display this
-    pass
-
-# BSMV tax rate (fixed at 5%)
-bsmv_rate = 0.05
-
-# Calculate returns for each product
-# Fixed Income Product A - Gecelik Mevduat with daily compounding
-interest_rate_a_decimal = interest_rate_a / 100
-daily_rate_a = interest_rate_a_decimal / 365
-commission_rate_a_decimal = commission_rate_a / 100
-daily_commission_rate_a = commission_rate_a_decimal / 365
-tax_rate_a_decimal = tax_rate_a / 100
-
-# Calculate daily interest for the investment period
-future_value_a = investment_amount * (1 + daily_rate_a) ** duration_days
-gross_return_a = future_value_a - investment_amount
-
-# Calculate commission using the daily rate model as requested
-commission_a = investment_amount * daily_commission_rate_a * duration_days
-
-# Calculate BSMV (5% of commission)
-bsmv_a = commission_a * bsmv_rate
-
-# Calculate income tax (stopaj) directly on the gross return
-tax_a = gross_return_a * tax_rate_a_decimal
-
-# Calculate final net return
-net_return_a = gross_return_a - commission_a - bsmv_a - tax_a
-final_balance_a = investment_amount + net_return_a
-
-# Fixed Income Product B - Gecelik Repo with daily compounding
-interest_rate_b_decimal = interest_rate_b / 100
-daily_rate_b = interest_rate_b_decimal / 365
-commission_rate_b_decimal = commission_rate_b / 100
-daily_commission_rate_b = commission_rate_b_decimal / 365
-tax_rate_b_decimal = tax_rate_b / 100
-
-# Calculate daily interest for the investment period
-future_value_b = investment_amount * (1 + daily_rate_b) ** duration_days
-gross_return_b = future_value_b - investment_amount
-
-# Calculate commission using the daily rate model
-commission_b = investment_amount * daily_commission_rate_b * duration_days
-
-# Calculate BSMV (5% of commission)
-bsmv_b = commission_b * bsmv_rate
-
-# Calculate income tax (stopaj) directly on the gross return
-tax_b = gross_return_b * tax_rate_b_decimal
-
-# Calculate final net return
-net_return_b = gross_return_b - commission_b - bsmv_b - tax_b
-final_balance_b = investment_amount + net_return_b
-
-# Fund Product - Yatırım Fonu
-fund_future_value = investment_amount * (1 + latest_return) ** duration_days
-fund_return = fund_future_value - investment_amount
-final_balance_fund = investment_amount + fund_return
-
-# Find the best performing product
-results = {
-    "Gecelik Mevduat": net_return_a,
-    "Gecelik Repo": net_return_b,
-    "Yatırım Fonu": fund_return
-}
-
-best_return = max(results.values())
-best_product = max(results, key=results.get)
-
-# Calculate percentage comparisons
-percentage_a = (net_return_a / best_return) * 100 if best_return > 0 else 100
-percentage_b = (net_return_b / best_return) * 100 if best_return > 0 else 100
-percentage_fund = (fund_return / best_return) * 100 if best_return > 0 else 100
-
-# Display the results in columns
-col1, col2, col3 = st.columns(3)
-
-# Fixed Income Product A - Gecelik Mevduat
-with col1:
-    st.markdown(f"""
-    <div class="card product-a-card">
-        <h3 class="card-title">Gecelik Mevduat</h3>
-        <div class="result-value">₺{format_turkish(net_return_a)}</div>
-        <div class="result-label">Toplam Getiri</div>
-        <div class="result-value">₺{format_turkish(final_balance_a)}</div>
-        <div class="result-label">Net Dönüş Tutarı</div>
-        <div class="divider"></div>
-        <div class="result-label">Detaylar:</div>
-        <div>Brüt Geri Dönüş Tutarı: ₺{format_turkish(gross_return_a)}</div>
-        <div>Mundi Komisyonu: -₺{format_turkish(commission_a)}</div>
-        <div>BSMV: -₺{format_turkish(bsmv_a)}</div>
-        <div>Stopaj: -₺{format_turkish(tax_a)}</div>
-        <div class="divider"></div>
-        <div class="percent-compare">
-            En iyi getiri ile karşılaştırma: {format_turkish_percent(percentage_a, 1)}
-            <p>{" ★ EN İYİ GETİRİ" if best_product == "Gecelik Mevduat" else ""}</p>
-        </div>
-    </div>
-    """, unsafe_allow_html=True)
-
-# Fixed Income Product B - Gecelik Repo
-with col2:
-    st.markdown(f"""
-    <div class="card product-b-card">
-        <h3 class="card-title">Gecelik Repo</h3>
-        <div class="result-value">₺{format_turkish(net_return_b)}</div>
-        <div class="result-label">Toplam Getiri</div>
-        <div class="result-value">₺{format_turkish(final_balance_b)}</div>
-        <div class="result-label">Net Dönüş Tutarı</div>
-        <div class="divider"></div>
-        <div class="result-label">Detaylar:</div>
-        <div>Brüt Geri Dönüş Tutarı: ₺{format_turkish(gross_return_b)}</div>
-        <div>Komisyon: -₺{format_turkish(commission_b)}</div>
-        <div>BSMV: -₺{format_turkish(bsmv_b)}</div>
-        <div>Stopaj: -₺{format_turkish(tax_b)}</div>
-        <div class="divider"></div>
-        <div class="percent-compare">
-            En iyi getiri ile karşılaştırma: {format_turkish_percent(percentage_b, 1)}
-            <p>{" ★ EN İYİ GETİRİ" if best_product == "Gecelik Repo" else ""}</p>
-        </div>
-    </div>
-    """, unsafe_allow_html=True)
-
-# Fund Product - Yatırım Fonu
-with col3:
-    st.markdown(f"""
-    <div class="card fund-card">
-        <h3 class="card-title">Fon: {selected_ticker}</h3>
-        <div class="result-value">₺{format_turkish(fund_return)}</div>
-        <div class="result-label">Toplam Getiri</div>
-        <div class="result-value">₺{format_turkish(final_balance_fund)}</div>
-        <div class="result-label">Net Dönüş Tutarı</div>
-        <div class="divider"></div>
-        <div class="result-label">Detaylar:</div>
-        <div>Günlük Getiri: {format_turkish_percent(latest_return * 100, 6)}</div>
-        <div>Bileşik Getiri: {format_turkish_percent(((1 + latest_return) ** duration_days - 1) * 100, 2)}</div>
-        <div class="divider"></div>
-        <div class="percent-compare">
-            En iyi getiri ile karşılaştırma: {format_turkish_percent(percentage_fund, 1)}
-            <p>{" ★ EN İYİ GETİRİ" if best_product == "Yatırım Fonu" else ""}</p>
-        </div>
-    </div>
-    """, unsafe_allow_html=True)
-
-# Additional information and charts
-st.markdown("<h2 class='section-header'>Getiri Analizi</h2>", unsafe_allow_html=True)
-
-# Performance comparison chart - Updated for compound interest and new commission calculation
-def calculate_growth(days):
-    growth_a = []
-    growth_b = []
-    growth_fund = []
-    
-    for d in range(days+1):
-        # For day 0, just use initial investment
-        if d == 0:
-            growth_a.append(investment_amount)
-            growth_b.append(investment_amount)
-            growth_fund.append(investment_amount)
-            continue
-        
-        # Calculate daily growth for Product A - Gecelik Mevduat
-        interest_earned_a = investment_amount * (1 + daily_rate_a) ** d - investment_amount
-        commission_cost_a = investment_amount * daily_commission_rate_a * d
-        bsmv_cost_a = commission_cost_a * bsmv_rate
-        # Stopaj is calculated directly on gross interest
-        tax_cost_a = interest_earned_a * tax_rate_a_decimal
-        net_value_a = investment_amount + interest_earned_a - commission_cost_a - bsmv_cost_a - tax_cost_a
-        growth_a.append(net_value_a)
-        
-        # Calculate daily growth for Product B - Gecelik Repo
-        interest_earned_b = investment_amount * (1 + daily_rate_b) ** d - investment_amount
-        commission_cost_b = investment_amount * daily_commission_rate_b * d
-        bsmv_cost_b = commission_cost_b * bsmv_rate
-        # Stopaj is calculated directly on gross interest
-        tax_cost_b = interest_earned_b * tax_rate_b_decimal
-        net_value_b = investment_amount + interest_earned_b - commission_cost_b - bsmv_cost_b - tax_cost_b
-        growth_b.append(net_value_b)
-        
-        # Calculate daily growth for the Fund product
-        fund_value = investment_amount * (1 + latest_return) ** d
-        growth_fund.append(fund_value)
-    
-    return growth_a, growth_b, growth_fund
-
-# Only show the chart if duration is reasonable for visualization
-if duration_days <= 365:
-    growth_a, growth_b, growth_fund = calculate_growth(duration_days)
-    
-    fig, ax = plt.figure(figsize=(10, 5)), plt.axes()
-    
-    # Plot with colors from our palette
-    ax.plot(range(duration_days+1), growth_a, color=colors["chrysler_blue"], label="Gecelik Mevduat", linewidth=2)
-    ax.plot(range(duration_days+1), growth_b, color=colors["dartmouth_green"], label="Gecelik Repo", linewidth=2)
-    ax.plot(range(duration_days+1), growth_fund, color=colors["sandy_brown"], label=f"{selected_ticker}", linewidth=2)
-    
-    ax.set_xlabel('Gün')
-    ax.set_ylabel('Tutar (₺)')
-    ax.set_title('Yatırımın tahmini performansı')
-    
-    # Format y-axis with Turkish number format
-    from matplotlib.ticker import FuncFormatter
-    
-    def turkish_currency_formatter(x, pos):
-        return f'₺{format_turkish(x, 0)}'
-    
-    ax.yaxis.set_major_formatter(FuncFormatter(turkish_currency_formatter))
-    
-    ax.legend()
-    ax.grid(True, linestyle='--', alpha=0.7)
-    
-    # Set background color for the chart
-    ax.set_facecolor(colors["platinum"])
-    fig.patch.set_facecolor('white')
-    
-    st.pyplot(fig)
-else:
-    st.info("Yatırım süresi 365 günden fazla olduğunda büyüme grafiği gösterilmez.")
-
-# Summary and recommendation
-st.markdown("<h2 class='section-header'>Sonuç</h2>", unsafe_allow_html=True)
-
-best_choice_explanation = {
-    "Gecelik Mevduat": f"Gecelik Mevduat günlük bileşik faiz ile daha uygun faiz oranı ve daha düşük ücret/vergi kombinasyonu sayesinde en iyi getiriyi sağlıyor.",
-    "Gecelik Repo": f"Gecelik Repo, daha yüksek ücretlere rağmen günlük bileşik faiz ve üstün faiz oranı sayesinde daha iyi performans gösteriyor.",
-    "Yatırım Fonu": f"Yatırım Fonu ({selected_ticker} - {fund_descriptions[selected_ticker]}) güçlü bileşik günlük büyüme sayesinde en yüksek getiriyi sunuyor, ancak daha fazla risk taşıyabilir."
-}
-
-st.markdown(f"""
-<div style="background-color: rgba(44, 19, 32, 0.05); padding: 1.5rem; border-radius: 10px; margin-top: 1rem; border-left: 5px solid {colors["dark_purple"]};">
-    <h3>Tavsiye</h3>
-    <p><strong>{best_product}</strong>'nin {format_turkish(duration_days, 0)} gün içinde <strong>₺{format_turkish(results[best_product])}</strong> ile en yüksek getiriyi sağlaması öngörülüyor.</p>
-    <p>{best_choice_explanation[best_product]}</p>
-    <p>Geçmiş performansın gelecekteki sonuçları garanti etmediğini, özellikle piyasa volatilitesine tabi olabilecek yatırım fonu seçeneği için, unutmayın.</p>
-</div>
-""", unsafe_allow_html=True)
+if funds.latest_date is not None:
+    st.sidebar.success(f"Son veri güncelleme: {funds.latest_date.strftime('%d.%m.%Y')}")
 
 # Footer with version and GitHub link
 st.markdown(f"""
 <div style="font-size: 0.8rem; color: {colors["dark_purple"]}; text-align: center; margin-top: 2rem;">
     <p>Mundi Getiri Hesaplama v1.0 | <a href="https://github.com/srtczn/compBoard" target="_blank">GitHub</a></p>
 </div>
-""", unsafe_allow_html=True) 
\ No newline at end of file
+""", unsafe_allow_html=True) 
+
+metrics.finish_rerun()
@@ -0,0 +1,222 @@
+"""Low-overhead timing spans and counters, exported in Prometheus text format.
+
+Pages wrap their stages in named spans::
+
+    metrics.begin_rerun("main")
+    with metrics.span("calculate"):
+        ...
+    metrics.finish_rerun()
+
+Every span is added to a process-wide histogram (one per span name, fixed
+buckets) and to the list of spans of the rerun running on the current
+thread; Streamlit runs each session's script on its own thread. A span costs
+two ``perf_counter`` calls and a short locked update, so it stays on in
+production.
+
+``finish_rerun`` records the whole rerun as the ``rerun`` span, rewrites the
+metrics file named by ``COMPBOARD_METRICS_FILE`` (at most every
+``EXPORT_INTERVAL`` seconds, e.g. for node_exporter's textfile collector) and,
+with ``?debug=1`` in the URL or ``COMPBOARD_DEBUG=1``, shows this rerun's
+spans and the cache counters in an expander.
+"""
+import bisect
+import functools
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+# Histogram bucket upper bounds in seconds
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+METRICS_FILE = os.environ.get("COMPBOARD_METRICS_FILE")
+EXPORT_INTERVAL = 15
+
+PREFIX = "compboard"
+
+
+class Histogram:
+    """Cumulative-bucket histogram of durations in seconds."""
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, seconds):
+        self.counts[bisect.bisect_left(BUCKETS, seconds)] += 1
+        self.sum += seconds
+        self.count += 1
+
+
+class Registry:
+    """Span histograms, event counters and cache stats sources for one process."""
+
+    def __init__(self):
+        self.histograms = {}
+        self.counters = {}
+        self.caches = {}
+        self._lock = threading.Lock()
+
+    def observe(self, name, seconds):
+        with self._lock:
+            histogram = self.histograms.get(name)
+            if histogram is None:
+                histogram = self.histograms[name] = Histogram()
+            histogram.observe(seconds)
+
+    def count(self, name, value=1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def register_cache(self, name, stats):
+        """Export ``stats()`` (a dict with hits/misses/... counts) as cache ``name``."""
+        self.caches[name] = stats
+
+    def cache_stats(self):
+        return {name: stats() for name, stats in self.caches.items()}
+
+    def prometheus(self):
+        """All metrics in the Prometheus text exposition format."""
+        lines = []
+        with self._lock:
+            histograms = {name: (list(h.counts), h.sum, h.count) for name, h in self.histograms.items()}
+            counters = dict(self.counters)
+
+        metric = f"{PREFIX}_span_seconds"
+        lines.append(f"# HELP {metric} Time spent in each instrumented stage.")
+        lines.append(f"# TYPE {metric} histogram")
+        for name, (counts, total, count) in sorted(histograms.items()):
+            cumulative = 0
+            for bound, bucket_count in zip(BUCKETS + ("+Inf",), counts):
+                cumulative += bucket_count
+                lines.append(f'{metric}_bucket{{span="{name}",le="{bound}"}} {cumulative}')
+            lines.append(f'{metric}_sum{{span="{name}"}} {total:.6f}')
+            lines.append(f'{metric}_count{{span="{name}"}} {count}')
+
+        for name in sorted({name for name, _ in counters}):
+            metric = f"{PREFIX}_{name}_total"
+            lines.append(f"# TYPE {metric} counter")
+            for (counter, labels), value in sorted(counters.items()):
+                if counter == name:
+                    label_text = ",".join(f'{key}="{label}"' for key, label in labels)
+                    lines.append(f"{metric}{{{label_text}}} {value}" if label_text else f"{metric} {value}")
+
+        caches = self.cache_stats()
+        for field in ("hits", "misses", "evictions", "entries", "bytes"):
+            kind = "counter" if field in ("hits", "misses", "evictions") else "gauge"
+            metric = f"{PREFIX}_cache_{field}" + ("_total" if kind == "counter" else "")
+            rows = [(name, stats[field]) for name, stats in sorted(caches.items()) if field in stats]
+            if rows:
+                lines.append(f"# TYPE {metric} {kind}")
+                lines.extend(f'{metric}{{cache="{name}"}} {value}' for name, value in rows)
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+# Spans of the rerun running on each thread
+_rerun = threading.local()
+_last_export = 0.0
+_export_lock = threading.Lock()
+
+
+@contextmanager
+def span(name):
+    """Time the enclosed block as stage ``name``."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        seconds = time.perf_counter() - started
+        registry.observe(name, seconds)
+        spans = getattr(_rerun, "spans", None)
+        if spans is not None:
+            spans.append((name, seconds))
+
+
+def timed(name):
+    """Decorator form of ``span``, e.g. for a ``st.fragment`` that reruns on its own."""
+    def decorate(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def count(name, value=1, **labels):
+    registry.count(name, value, **labels)
+
+
+def begin_rerun(page):
+    """Start collecting the spans of this script run."""
+    _rerun.page = page
+    _rerun.spans = []
+    _rerun.started = time.perf_counter()
+    registry.count("reruns", page=page)
+
+
+def finish_rerun():
+    """Record the rerun, export the metrics file when due and show the debug panel if enabled."""
+    started = getattr(_rerun, "started", None)
+    if started is None:
+        return
+    seconds = time.perf_counter() - started
+    registry.observe("rerun", seconds)
+    spans = _rerun.spans + [("rerun", seconds)]
+    _rerun.spans = _rerun.started = None
+
+    if METRICS_FILE:
+        export_if_due(METRICS_FILE)
+    if debug_enabled():
+        debug_panel(spans)
+
+
+def write_metrics(path):
+    """Atomically write the Prometheus text to ``path``."""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(registry.prometheus())
+    os.replace(tmp_path, path)
+
+
+def export_if_due(path):
+    global _last_export
+    now = time.monotonic()
+    with _export_lock:
+        if now - _last_export < EXPORT_INTERVAL:
+            return
+        _last_export = now
+        write_metrics(path)
+
+
+def debug_enabled():
+    if os.environ.get("COMPBOARD_DEBUG") == "1":
+        return True
+    import streamlit as st
+    return st.query_params.get("debug") == "1"
+
+
+def debug_panel(spans):
+    """Per-session expander with this rerun's spans and the process-wide cache counters."""
+    import pandas as pd
+    import streamlit as st
+
+    with st.expander("⏱️ Performans Ayrıntıları"):
+        st.dataframe(
+            pd.DataFrame({
+                "Aşama": [name for name, _ in spans],
+                "Süre (ms)": [round(seconds * 1000, 2) for _, seconds in spans],
+            }),
+            hide_index=True,
+            use_container_width=True
+        )
+        caches = registry.cache_stats()
+        if caches:
+            st.dataframe(pd.DataFrame(caches).T, use_container_width=True)
@@ -1,12 +1,14 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
-from datetime import datetime, timedelta
 import os
-from PIL import Image
-import matplotlib.pyplot as plt
-import locale
-from matplotlib.ticker import FuncFormatter
+import metrics
+from charts import chart_cache, chart_key, figure
+from formatting import format_turkish, format_turkish_percent
+from dataset import get_fund_dataset
+from calculations import top_k
+from export import FORMATS, export_bytes, fund_product
+from fees import FEES, FUND, get_fee_schedule
 
 # Set page configuration
 st.set_page_config(
@@ -21,6 +23,9 @@ st.set_page_config(
     }
 )
 
+# Time this rerun's stages (see metrics.py)
+metrics.begin_rerun("funds")
+
 # Hide the native navigation
 st.markdown("""
 <style>
@@ -135,88 +140,16 @@ st.markdown(f"""
 # App header
 st.markdown("<h1 class='main-header'>Fon Karşılaştırma</h1>", unsafe_allow_html=True)
 
-# Function to convert string percentage to float
-def convert_to_float(value):
-    if isinstance(value, str):
-        value = value.replace(',', '.')
-        value = value.replace('%', '')
-    return float(value)
-
-# Function to format numbers in Turkish locale
-def format_turkish(number, decimals=2):
-    if number == 0:
-        return "0"
-    
-    if decimals > 0:
-        integer_part = int(number)
-        decimal_part = abs(number) - abs(int(number))
-        
-        formatted_int = ""
-        int_str = str(abs(integer_part))
-        for i, digit in enumerate(reversed(int_str)):
-            if i > 0 and i % 3 == 0:
-                formatted_int = "." + formatted_int
-            formatted_int = digit + formatted_int
-        
-        if integer_part < 0:
-            formatted_int = "-" + formatted_int
-            
-        formatted_decimal = str(int(decimal_part * (10 ** decimals)))
-        formatted_decimal = formatted_decimal.zfill(decimals)
-        
-        return f"{formatted_int},{formatted_decimal}"
-    else:
-        integer_part = int(round(number, 0))
-        formatted_int = ""
-        int_str = str(abs(integer_part))
-        for i, digit in enumerate(reversed(int_str)):
-            if i > 0 and i % 3 == 0:
-                formatted_int = "." + formatted_int
-            formatted_int = digit + formatted_int
-            
-        if integer_part < 0:
-            formatted_int = "-" + formatted_int
-            
-        return formatted_int
-
-# Function to format percentage in Turkish locale
-def format_turkish_percent(number, decimals=2):
-    formatted = format_turkish(number, decimals)
-    return f"%{formatted}"
-
-# Load fund data
-@st.cache_data(ttl=3600)
-def load_fund_data():
-    try:
-        if os.path.exists("funds.csv"):
-            return pd.read_csv("funds.csv")
-        else:
-            st.error("Funds data file not found")
-            return pd.DataFrame()
-    except Exception as e:
-        st.error(f"Error loading fund data: {e}")
-        return pd.DataFrame()
-
-# Load and process fund data
-fund_data = load_fund_data()
-if not fund_data.empty:
-    fund_data['Değişim'] = fund_data['Değişim'].apply(convert_to_float)
-    fund_options = dict(zip(fund_data['Fon Kodu'], fund_data['Fon Adı']))
-    latest_returns = dict(zip(fund_data['Fon Kodu'], fund_data['Değişim']))
-    
-    # Get top 3 funds based on Değişim
-    top_funds = fund_data.sort_values('Değişim', ascending=False).head(3)
-    default_funds = top_funds['Fon Kodu'].tolist()
-else:
-    fund_options = {}
-    latest_returns = {}
-    default_funds = []
+# Shared, read-only fund dataset (one copy per server process)
+funds = get_fund_dataset()
+
+# Get top 3 funds based on Değişim
+default_funds = [int(i) for i in top_k(np.nan_to_num(funds.returns, nan=-np.inf), 3)]
 
 # Add logo to the sidebar
 logo_path = "assets/logo.webp"
 if os.path.exists(logo_path):
-    logo = Image.open(logo_path)
-    st.sidebar.image(logo, use_container_width=True)
+    st.sidebar.image(logo_path, use_container_width=True)
 else:
     st.sidebar.image("https://i.ibb.co/0jQ5YtL/logo.png", width=200)
 
@@ -225,6 +158,9 @@ st.sidebar.markdown("---")  # Add a separator
 st.sidebar.markdown("### Navigation")
 st.sidebar.page_link("main.py", label="🏦 Mevduat-Fon Karşılaştırma")
 st.sidebar.page_link("pages/funds.py", label="📊 Fon Karşılaştırma")
+st.sidebar.page_link("pages/screener.py", label="🔎 Fon Tarama")
+st.sidebar.page_link("pages/sensitivity.py", label="🗺️ Duyarlılık Analizi")
+st.sidebar.page_link("pages/portfolio.py", label="⚖️ Dağılım Optimizasyonu")
 
 # Sidebar inputs
 st.sidebar.markdown("<h2 class='section-header'>Yatırım Bilgileri</h2>", unsafe_allow_html=True)
@@ -243,7 +179,7 @@ investment_amount = st.sidebar.number_input(
 investment_period = st.sidebar.number_input(
     "Süre (Gün)",
     min_value=1,
-    max_value=365,
+    max_value=3650,
     value=30,
     step=1
 )
@@ -251,122 +187,138 @@ investment_period = st.sidebar.number_input(
 # Main content area
 st.markdown("<h2 class='section-header'>Fon Seçimi</h2>", unsafe_allow_html=True)
 
-# Create three columns for fund selection
-col1, col2, col3 = st.columns(3)
-
-# Fund selection dropdowns
-selected_funds = []
-with col1:
-    fund1 = st.selectbox(
-        "1. Fon",
-        options=list(fund_options.keys()),
-        format_func=lambda x: f"{x} - {fund_options[x]}",
-        key="fund1",
-        index=list(fund_options.keys()).index(default_funds[0]) if default_funds else 0
-    )
-    selected_funds.append(fund1)
-
-with col2:
-    fund2 = st.selectbox(
-        "2. Fon",
-        options=list(fund_options.keys()),
-        format_func=lambda x: f"{x} - {fund_options[x]}",
-        key="fund2",
-        index=list(fund_options.keys()).index(default_funds[1]) if len(default_funds) > 1 else 1
-    )
-    selected_funds.append(fund2)
-
-with col3:
-    fund3 = st.selectbox(
-        "3. Fon",
-        options=list(fund_options.keys()),
-        format_func=lambda x: f"{x} - {fund_options[x]}",
-        key="fund3",
-        index=list(fund_options.keys()).index(default_funds[2]) if len(default_funds) > 2 else 2
-    )
-    selected_funds.append(fund3)
+# Any number of funds up to MAX_SELECTED, the top three preselected
+MAX_SELECTED = 50
+selected_labels = st.multiselect(
+    f"Fonlar (en fazla {MAX_SELECTED})",
+    options=funds.display,
+    default=[funds.display[i] for i in default_funds],
+    max_selections=MAX_SELECTED,
+    key="funds",
+    placeholder="Fon seçiniz"
+)
+
+if not selected_labels:
+    st.info("Karşılaştırmak için en az bir fon seçiniz.")
+    metrics.finish_rerun()
+    st.stop()
+
+selected_indices = np.array([funds.display_index[label] for label in selected_labels], dtype=np.intp)
+selected_funds = funds.codes[selected_indices]
 
 # Calculate results
 st.markdown("<h2 class='section-header'>Karşılaştırma Sonuçları</h2>", unsafe_allow_html=True)
 
-# Calculate daily returns and final amounts
-results = []
-for fund in selected_funds:
-    daily_return = latest_returns.get(fund, 0)
-    final_amount = investment_amount * (1 + daily_return) ** investment_period
-    total_return = ((final_amount / investment_amount) - 1) * 100
-    
-    # Calculate additional metrics
-    daily_return_amount = investment_amount * daily_return
-    total_return_amount = final_amount - investment_amount
-    
-    results.append({
-        'fund': fund,
-        'name': fund_options[fund],
-        'daily_return': daily_return,
-        'final_amount': final_amount,
-        'total_return': total_return,
-        'daily_return_amount': daily_return_amount,
-        'total_return_amount': total_return_amount
-    })
+# Returns and final amounts of every selected fund in one batch
+with metrics.span("calculate"):
+    daily_returns = funds.returns[selected_indices]
+    # Fund fees and stopaj in force today (fees.csv)
+    batch = get_fee_schedule().evaluate(investment_amount, investment_period, FUND, daily_returns)
+    # Funds without a usable return never rank first
+    best = int(top_k(np.where(np.isnan(batch['total_return']), -np.inf, batch['total_return']), 1)[0])
+    compared_to_best = (batch['total_return'] / batch['total_return'][best] - 1) * 100
 
-# Find the best performing fund
-best_fund = max(results, key=lambda x: x['total_return'])
-
-# Display results
-result_cols = st.columns(3)
-for i, result in enumerate(results):
-    with result_cols[i]:
-        st.markdown(f"""
-        <div class="card fund-card">
-            <h3 class="card-title">{result['name']}</h3>
-            <div class="result-value">₺{format_turkish(result['total_return_amount'])}</div>
-            <div class="result-label">Toplam Getiri</div>
-            <div class="result-value">₺{format_turkish(result['final_amount'])}</div>
-            <div class="result-label">Net Dönüş Tutarı</div>
-            <div class="divider"></div>
-            <div class="result-label">Detaylar:</div>
-            <div>Günlük Getiri: {format_turkish_percent(result['daily_return'] * 100)}</div>
-            <div>Günlük Getiri Tutarı: ₺{format_turkish(result['daily_return_amount'])}</div>
-            <div>Toplam Getiri Oranı: {format_turkish_percent(result['total_return'])}</div>
-            <div class="divider"></div>
-            <div class="percent-compare">
-                En iyi getiri ile karşılaştırma: {format_turkish_percent((result['total_return'] / best_fund['total_return'] - 1) * 100, 1)}
-                <p>{" ★ EN İYİ GETİRİ" if result['fund'] == best_fund['fund'] else ""}</p>
-            </div>
-        </div>
-        """, unsafe_allow_html=True)
+# Best performing fund
+st.markdown(f"""
+<div class="card fund-card">
+    <h3 class="card-title">★ EN İYİ GETİRİ: {selected_funds[best]} - {funds.name(selected_indices[best])}</h3>
+    <div class="result-value">₺{format_turkish(batch['net_return'][best])}</div>
+    <div class="result-label">Toplam Getiri</div>
+    <div class="result-value">₺{format_turkish(batch['final_balance'][best])}</div>
+    <div class="result-label">Net Dönüş Tutarı</div>
+    <div class="divider"></div>
+    <div>Günlük Getiri: {format_turkish_percent(daily_returns[best] * 100, 6)}</div>
+    <div>Toplam Getiri Oranı: {format_turkish_percent(batch['total_return'][best])}</div>
+</div>
+""", unsafe_allow_html=True)
+
+# All selected funds; the numbers stay numeric so every column sorts correctly
+with metrics.span("table"):
+    results = pd.DataFrame({
+        'Fon Kodu': selected_funds,
+        'Fon Adı': funds.name_categories[funds.name_codes[selected_indices]],
+        'Günlük Getiri': daily_returns * 100,
+        'Günlük Getiri Tutarı (₺)': batch['daily_return_amount'],
+        'Toplam Getiri (₺)': batch['net_return'],
+        'Net Dönüş Tutarı (₺)': batch['final_balance'],
+        'Toplam Getiri Oranı': batch['total_return'],
+        'En İyi Getiriye Göre': compared_to_best,
+    })
+    st.dataframe(
+        results.style.format({
+            'Günlük Getiri': lambda value: format_turkish_percent(value, 6),
+            'Günlük Getiri Tutarı (₺)': format_turkish,
+            'Toplam Getiri (₺)': format_turkish,
+            'Net Dönüş Tutarı (₺)': format_turkish,
+            'Toplam Getiri Oranı': format_turkish_percent,
+            'En İyi Getiriye Göre': lambda value: format_turkish_percent(value, 1),
+        }, na_rep=""),
+        hide_index=True,
+        use_container_width=True
+    )
 
 # Create comparison graph
 st.markdown("<h2 class='section-header'>Getiri Karşılaştırma Grafiği</h2>", unsafe_allow_html=True)
 
-# Create data for the bar chart
-fund_names = [f"{fund} - {fund_options[fund]}" for fund in selected_funds]
-fund_returns = [investment_amount * ((1 + latest_returns[fund]) ** investment_period - 1) for fund in selected_funds]
-
-# Create the plot
-plt.figure(figsize=(12, 6))
-x = range(len(fund_names))
-width = 0.35
-
-# Plot bars
-plt.bar(x, fund_returns, width, label='Fon Getirisi', color=colors["sandy_brown"])
-
-# Customize the plot
-plt.title('Fon Getiri Karşılaştırması', fontsize=14, pad=20)
-plt.xlabel('Fonlar', fontsize=12)
-plt.ylabel('Tutar (TL)', fontsize=12)
-plt.xticks(x, fund_names, rotation=45, ha='right')
-plt.grid(True, linestyle='--', alpha=0.7)
-plt.legend()
-
-# Format y-axis with Turkish number format
-def turkish_currency_formatter(x, pos):
-    return f'₺{format_turkish(x, 0)}'
-plt.gca().yaxis.set_major_formatter(FuncFormatter(turkish_currency_formatter))
-
-# Adjust layout to prevent label cutoff
-plt.tight_layout()
+def draw_comparison_chart():
+    # One horizontal bar per fund, best at the top, drawn in a single call
+    order = np.argsort(np.nan_to_num(batch['net_return'], nan=-np.inf))
+    bar_colors = np.where(order == best, colors["dartmouth_green"], colors["sandy_brown"])
+
+    # Create the plot (matplotlib is only imported once a chart is actually drawn)
+    from matplotlib.ticker import FuncFormatter
+
+    fig = figure(figsize=(12, max(4, 0.3 * len(order) + 1.5)))
+    ax = fig.add_subplot()
+    ax.barh(np.arange(len(order)), batch['net_return'][order], color=bar_colors)
+
+    # Customize the plot
+    ax.set_title('Fon Getiri Karşılaştırması', fontsize=14, pad=20)
+    ax.set_xlabel('Tutar (TL)', fontsize=12)
+    ax.set_ylabel('Fonlar', fontsize=12)
+    ax.set_yticks(np.arange(len(order)), selected_funds[order])
+    ax.grid(True, axis='x', linestyle='--', alpha=0.7)
+
+    # Format x-axis with Turkish number format
+    def turkish_currency_formatter(x, pos):
+        return f'₺{format_turkish(x, 0)}'
+    ax.xaxis.set_major_formatter(FuncFormatter(turkish_currency_formatter))
+
+    # Adjust layout to prevent label cutoff
+    fig.tight_layout()
+
+    return fig
+
+# Fund fees and stopaj in force today; the bars and the schedules below are net of them
+fund_fees = get_fee_schedule().rates(FUND, investment_period)
+
+# Reuse the rendered image when the selection, amount, period, returns and fees are unchanged
+comparison_chart_key = chart_key(
+    "fund_comparison",
+    amount=investment_amount,
+    period=investment_period,
+    funds=list(selected_funds),
+    daily_returns=list(daily_returns),
+    fees=[fund_fees[fee] for fee in FEES]
+)
+st.image(chart_cache.get_or_render(comparison_chart_key, draw_comparison_chart), use_container_width=True)
+
+# Day-by-day schedule of every selected fund; files are only generated when a button is clicked
+schedule_products = [
+    fund_product(code, daily_return, fund_fees["commission"], fund_fees["stopaj"], fund_fees["bsmv"] / 100)
+    for code, daily_return in zip(selected_funds, daily_returns)
+    # Funds without a return have no schedule
+    if not np.isnan(daily_return)
+]
+export_formats = [("csv", "CSV"), ("parquet", "Parquet"), ("xlsx", "Excel")]
+for column, (export_format, label) in zip(st.columns(len(export_formats)), export_formats):
+    column.download_button(
+        f"Günlük Tablo ({label})",
+        data=lambda export_format=export_format: export_bytes(export_format, investment_amount, investment_period, schedule_products),
+        file_name=f"fon_gunluk_tablo_{investment_period}_gun.{FORMATS[export_format][2]}",
+        mime=FORMATS[export_format][1],
+        on_click="ignore",
+        use_container_width=True
+    )
 
-# Display the plot
-st.pyplot(plt) 
\ No newline at end of file
+metrics.finish_rerun()
@@ -0,0 +1,208 @@
+import streamlit as st
+import pandas as pd
+import numpy as np
+import os
+import metrics
+from formatting import format_turkish, format_turkish_percent
+from dataset import get_fund_dataset
+from allocation import optimize_allocation, product_rates
+from fees import DEPOSIT, FUND, PRODUCT_TYPES, REPO, get_fee_schedule
+
+# Set page configuration
+st.set_page_config(
+    page_title="Dağılım Optimizasyonu",
+    page_icon="⚖️",
+    layout="wide",
+    initial_sidebar_state="expanded",
+    menu_items={
+        'Get Help': None,
+        'Report a bug': None,
+        'About': None
+    }
+)
+
+# Time this rerun's stages (see metrics.py)
+metrics.begin_rerun("portfolio")
+
+# Hide the native navigation
+st.markdown("""
+<style>
+    #MainMenu {visibility: hidden;}
+    header {visibility: hidden;}
+    footer {visibility: hidden;}
+</style>
+""", unsafe_allow_html=True)
+
+# Reuse the same color palette
+colors = {
+    "chrysler_blue": "#3527DD",
+    "dark_purple": "#2C1320",
+    "sandy_brown": "#FA9F42",
+    "dartmouth_green": "#0B6E4F",
+    "platinum": "#E0E0E2"
+}
+
+# Reuse the same CSS
+st.markdown(f"""
+<style>
+    .main-header {{
+        color: {colors["dartmouth_green"]};
+        font-size: 2.5rem;
+        font-weight: 600;
+        margin-bottom: 1rem;
+        text-align: center;
+    }}
+
+    .section-header {{
+        color: {colors["dark_purple"]};
+        font-size: 1.5rem;
+        font-weight: 500;
+        margin-top: 1rem;
+        margin-bottom: 0.5rem;
+    }}
+
+    .stNumberInput div[data-baseweb="input"] {{
+        border-color: {colors["dartmouth_green"]};
+    }}
+
+    .stSelectbox div[data-baseweb="select"] {{
+        border-color: {colors["dartmouth_green"]};
+    }}
+</style>
+""", unsafe_allow_html=True)
+
+# App header
+st.markdown("<h1 class='main-header'>Dağılım Optimizasyonu</h1>", unsafe_allow_html=True)
+
+# Shared, read-only fund dataset (one copy per server process)
+funds = get_fund_dataset()
+
+# Add logo to the sidebar
+logo_path = "assets/logo.webp"
+if os.path.exists(logo_path):
+    st.sidebar.image(logo_path, use_container_width=True)
+else:
+    st.sidebar.image("https://i.ibb.co/0jQ5YtL/logo.png", width=200)
+
+# Custom navigation
+st.sidebar.markdown("---")  # Add a separator
+st.sidebar.markdown("### Navigation")
+st.sidebar.page_link("main.py", label="🏦 Mevduat-Fon Karşılaştırma")
+st.sidebar.page_link("pages/funds.py", label="📊 Fon Karşılaştırma")
+st.sidebar.page_link("pages/screener.py", label="🔎 Fon Tarama")
+st.sidebar.page_link("pages/sensitivity.py", label="🗺️ Duyarlılık Analizi")
+st.sidebar.page_link("pages/portfolio.py", label="⚖️ Dağılım Optimizasyonu")
+
+# Sidebar inputs
+st.sidebar.markdown("<h2 class='section-header'>Yatırım Bilgileri</h2>", unsafe_allow_html=True)
+
+investment_amount = st.sidebar.number_input(
+    "Yatırım Tutarı (₺)",
+    min_value=1000,
+    max_value=10000000,
+    value=100000,
+    step=1000,
+    format="%d"
+)
+
+duration_days = st.sidebar.number_input(
+    "Süre (Gün)",
+    min_value=1,
+    max_value=3650,
+    value=30,
+    step=1
+)
+
+st.sidebar.markdown("---")
+
+# Fees and taxes in force today for this holding period (fees.csv); the
+# commission and stopaj inputs start from them, as on the main page
+fee_rates = get_fee_schedule().rates(PRODUCT_TYPES, duration_days)
+bsmv_rates = fee_rates["bsmv"] / 100
+fund_costs = (float(fee_rates["commission"][FUND]), float(fee_rates["stopaj"][FUND]))
+
+# Product rates, same defaults as the main page
+st.sidebar.markdown("<h3 style='color: {}'>Gecelik Mevduat</h3>".format(colors["chrysler_blue"]), unsafe_allow_html=True)
+interest_rate_a = st.sidebar.number_input("Faiz Oranı (%)", min_value=0.0, max_value=90.0, value=45.50, step=0.05, key="interest_a")
+commission_rate_a = st.sidebar.number_input("Mundi Komisyon Oranı (%)", min_value=0.0, max_value=5.0, value=float(fee_rates["commission"][DEPOSIT]), step=0.05, key="commission_a")
+tax_rate_a = st.sidebar.number_input("Stopaj Oranı (%)", min_value=0.0, max_value=50.0, value=float(fee_rates["stopaj"][DEPOSIT]), step=0.5, key="tax_a")
+
+st.sidebar.markdown("<h3 style='color: {}'>Gecelik Repo</h3>".format(colors["dartmouth_green"]), unsafe_allow_html=True)
+interest_rate_b = st.sidebar.number_input("Faiz Oranı (%)", min_value=0.0, max_value=90.0, value=45.0, step=0.05, key="interest_b")
+commission_rate_b = st.sidebar.number_input("Komisyon Oranı (%)", min_value=0.0, max_value=5.0, value=float(fee_rates["commission"][REPO]), step=0.05, key="commission_b")
+tax_rate_b = st.sidebar.number_input("Stopaj Oranı (%)", min_value=0.0, max_value=50.0, value=float(fee_rates["stopaj"][REPO]), step=0.5, key="tax_b")
+
+# Allocation constraints
+st.markdown("<h2 class='section-header'>Kısıtlar</h2>", unsafe_allow_html=True)
+
+col1, col2, col3 = st.columns(3)
+with col1:
+    min_deposit_share = st.number_input("En Az Mevduat Payı (%)", min_value=0.0, max_value=100.0, value=0.0, step=5.0)
+    max_deposit_share = st.number_input("En Fazla Mevduat Payı (%)", min_value=0.0, max_value=100.0, value=100.0, step=5.0)
+with col2:
+    max_repo_share = st.number_input("En Fazla Repo Payı (%)", min_value=0.0, max_value=100.0, value=100.0, step=5.0)
+    max_fund_share = st.number_input("Fon Başına En Fazla Pay (%)", min_value=0.0, max_value=100.0, value=25.0, step=5.0)
+with col3:
+    max_funds = st.number_input("En Fazla Fon Sayısı", min_value=0, max_value=len(funds), value=min(3, len(funds)), step=1)
+
+deposit = (interest_rate_a, commission_rate_a, tax_rate_a)
+repo = (interest_rate_b, commission_rate_b, tax_rate_b)
+
+with metrics.span("optimize"):
+    try:
+        allocation = optimize_allocation(
+            investment_amount,
+            duration_days,
+            deposit,
+            repo,
+            funds.returns,
+            max_deposit_share=max_deposit_share / 100,
+            max_repo_share=max_repo_share / 100,
+            max_fund_share=max_fund_share / 100,
+            min_deposit_share=min_deposit_share / 100,
+            max_funds=int(max_funds),
+            bsmv_rate=bsmv_rates,
+            fund_costs=fund_costs
+        )
+    except ValueError:
+        allocation = None
+
+if allocation is None:
+    st.error("Bu kısıtlarla tutarın tamamı dağıtılamıyor. Lütfen üst sınırları artırın veya en az mevduat payını düşürün.")
+    metrics.finish_rerun()
+    st.stop()
+
+# The optimum next to putting everything in the single best product
+rates, _ = product_rates(duration_days, deposit, repo, funds.returns, bsmv_rates, fund_costs)
+single_best = float(investment_amount * np.nanmax(rates))
+
+st.markdown("<h2 class='section-header'>Önerilen Dağılım</h2>", unsafe_allow_html=True)
+
+col1, col2, col3 = st.columns(3)
+col1.metric("Net Getiri", f"₺{format_turkish(allocation['net_return'])}")
+col2.metric("Net Dönüş Tutarı", f"₺{format_turkish(allocation['final_balance'])}")
+col3.metric("Tek En İyi Ürün (kısıtsız)", f"₺{format_turkish(single_best)}")
+
+st.caption(
+    f"Kesintiler: Komisyon ₺{format_turkish(allocation['commission'])}, "
+    f"BSMV ₺{format_turkish(allocation['bsmv'])}, "
+    f"Stopaj ₺{format_turkish(allocation['tax'])}"
+)
+
+# Only the products that receive money
+product_names = np.concatenate([["Gecelik Mevduat", "Gecelik Repo"], [funds.display[i] for i in range(len(funds))]])
+used = np.flatnonzero(allocation['weights'] > 0)
+used = used[np.argsort(allocation['amounts'][used])[::-1]]
+
+st.dataframe(
+    pd.DataFrame({
+        'Ürün': product_names[used],
+        'Pay': [format_turkish_percent(share * 100, 1) for share in allocation['weights'][used]],
+        'Tutar (₺)': [format_turkish(amount) for amount in allocation['amounts'][used]],
+        'Net Getiri (₺)': [format_turkish(value) for value in allocation['net_returns'][used]],
+    }),
+    hide_index=True,
+    use_container_width=True
+)
+
+metrics.finish_rerun()
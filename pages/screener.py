@@ -0,0 +1,159 @@
+import streamlit as st
+import pandas as pd
+import numpy as np
+import os
+import metrics
+from formatting import format_turkish, format_turkish_array, format_turkish_percent_array
+from dataset import get_fund_dataset
+from calculations import top_k
+from fees import FUND, get_fee_schedule
+
+# Set page configuration
+st.set_page_config(
+    page_title="Fon Tarama",
+    page_icon="🔎",
+    layout="wide",
+    initial_sidebar_state="expanded",
+    menu_items={
+        'Get Help': None,
+        'Report a bug': None,
+        'About': None
+    }
+)
+
+# Time this rerun's stages (see metrics.py)
+metrics.begin_rerun("screener")
+
+# Hide the native navigation
+st.markdown("""
+<style>
+    #MainMenu {visibility: hidden;}
+    header {visibility: hidden;}
+    footer {visibility: hidden;}
+</style>
+""", unsafe_allow_html=True)
+
+# Reuse the same color palette
+colors = {
+    "chrysler_blue": "#3527DD",
+    "dark_purple": "#2C1320",
+    "sandy_brown": "#FA9F42",
+    "dartmouth_green": "#0B6E4F",
+    "platinum": "#E0E0E2"
+}
+
+# Reuse the same CSS
+st.markdown(f"""
+<style>
+    .main-header {{
+        color: {colors["dartmouth_green"]};
+        font-size: 2.5rem;
+        font-weight: 600;
+        margin-bottom: 1rem;
+        text-align: center;
+    }}
+
+    .section-header {{
+        color: {colors["dark_purple"]};
+        font-size: 1.5rem;
+        font-weight: 500;
+        margin-top: 1rem;
+        margin-bottom: 0.5rem;
+    }}
+
+    .stNumberInput div[data-baseweb="input"] {{
+        border-color: {colors["dartmouth_green"]};
+    }}
+
+    .stSelectbox div[data-baseweb="select"] {{
+        border-color: {colors["dartmouth_green"]};
+    }}
+</style>
+""", unsafe_allow_html=True)
+
+# App header
+st.markdown("<h1 class='main-header'>Fon Tarama</h1>", unsafe_allow_html=True)
+
+# Shared, read-only fund dataset (one copy per server process)
+funds = get_fund_dataset()
+codes, daily_returns = funds.codes, funds.returns
+
+# Add logo to the sidebar
+logo_path = "assets/logo.webp"
+if os.path.exists(logo_path):
+    st.sidebar.image(logo_path, use_container_width=True)
+else:
+    st.sidebar.image("https://i.ibb.co/0jQ5YtL/logo.png", width=200)
+
+# Custom navigation
+st.sidebar.markdown("---")  # Add a separator
+st.sidebar.markdown("### Navigation")
+st.sidebar.page_link("main.py", label="🏦 Mevduat-Fon Karşılaştırma")
+st.sidebar.page_link("pages/funds.py", label="📊 Fon Karşılaştırma")
+st.sidebar.page_link("pages/screener.py", label="🔎 Fon Tarama")
+st.sidebar.page_link("pages/sensitivity.py", label="🗺️ Duyarlılık Analizi")
+st.sidebar.page_link("pages/portfolio.py", label="⚖️ Dağılım Optimizasyonu")
+
+# Sidebar inputs
+st.sidebar.markdown("<h2 class='section-header'>Yatırım Bilgileri</h2>", unsafe_allow_html=True)
+
+investment_amount = st.sidebar.number_input(
+    "Yatırım Tutarı (₺)",
+    min_value=1000,
+    max_value=10000000,
+    value=10000,
+    step=1000,
+    format="%d"
+)
+
+investment_period = st.sidebar.number_input(
+    "Süre (Gün)",
+    min_value=1,
+    max_value=3650,
+    value=30,
+    step=1
+)
+
+page_size = st.sidebar.selectbox("Sayfa Başına Fon", [10, 25, 50, 100], index=1)
+
+# Project every fund at the chosen horizon in one pass
+with metrics.span("calculate"):
+    # Fund fees and stopaj in force today (fees.csv)
+    projection = get_fee_schedule().evaluate(investment_amount, investment_period, FUND, daily_returns)
+    net_returns = np.where(np.isnan(projection['net_return']), -np.inf, projection['net_return'])
+
+fund_count = len(codes)
+page_count = max(1, -(-fund_count // page_size))
+
+st.markdown("<h2 class='section-header'>Fon Sıralaması</h2>", unsafe_allow_html=True)
+
+page = st.number_input(
+    f"Sayfa (toplam {format_turkish(page_count, 0)})",
+    min_value=1,
+    max_value=page_count,
+    value=1,
+    step=1
+)
+
+# Only the funds up to the end of the requested page are sorted
+with metrics.span("rank"):
+    ranked = top_k(net_returns, page * page_size)[(page - 1) * page_size:]
+
+with metrics.span("table"):
+    st.dataframe(
+        pd.DataFrame({
+            'Sıra': np.arange((page - 1) * page_size + 1, (page - 1) * page_size + 1 + len(ranked)),
+            'Fon Kodu': codes[ranked],
+            'Fon Adı': funds.name_categories[funds.name_codes[ranked]],
+            'Günlük Getiri': format_turkish_percent_array(daily_returns[ranked] * 100, 6),
+            'Toplam Getiri (₺)': format_turkish_array(projection['net_return'][ranked]),
+            'Net Dönüş Tutarı (₺)': format_turkish_array(projection['final_balance'][ranked]),
+            'Toplam Getiri Oranı': format_turkish_percent_array(projection['total_return'][ranked]),
+        }),
+        hide_index=True,
+        use_container_width=True
+    )
+
+st.caption(f"{format_turkish(fund_count, 0)} fon {format_turkish(investment_period, 0)} günlük vade için tarandı.")
+
+metrics.finish_rerun()
@@ -0,0 +1,277 @@
+import streamlit as st
+import numpy as np
+import os
+import time
+import metrics
+from charts import chart_cache, chart_key, figure
+from formatting import format_turkish, format_turkish_percent
+from dataset import get_compounding_table, get_fund_dataset
+from calculations import PRODUCTS, sensitivity_grid
+from fees import DEPOSIT, FUND, PRODUCT_TYPES, REPO, get_fee_schedule
+
+# Set page configuration
+st.set_page_config(
+    page_title="Duyarlılık Analizi",
+    page_icon="🗺️",
+    layout="wide",
+    initial_sidebar_state="expanded",
+    menu_items={
+        'Get Help': None,
+        'Report a bug': None,
+        'About': None
+    }
+)
+
+# Time this rerun's stages (see metrics.py)
+metrics.begin_rerun("sensitivity")
+
+# Hide the native navigation
+st.markdown("""
+<style>
+    #MainMenu {visibility: hidden;}
+    header {visibility: hidden;}
+    footer {visibility: hidden;}
+</style>
+""", unsafe_allow_html=True)
+
+# Reuse the same color palette
+colors = {
+    "chrysler_blue": "#3527DD",
+    "dark_purple": "#2C1320",
+    "sandy_brown": "#FA9F42",
+    "dartmouth_green": "#0B6E4F",
+    "platinum": "#E0E0E2"
+}
+
+# Reuse the same CSS
+st.markdown(f"""
+<style>
+    .main-header {{
+        color: {colors["dartmouth_green"]};
+        font-size: 2.5rem;
+        font-weight: 600;
+        margin-bottom: 1rem;
+        text-align: center;
+    }}
+
+    .section-header {{
+        color: {colors["dark_purple"]};
+        font-size: 1.5rem;
+        font-weight: 500;
+        margin-top: 1rem;
+        margin-bottom: 0.5rem;
+    }}
+
+    .stNumberInput div[data-baseweb="input"] {{
+        border-color: {colors["dartmouth_green"]};
+    }}
+
+    .stSelectbox div[data-baseweb="select"] {{
+        border-color: {colors["dartmouth_green"]};
+    }}
+</style>
+""", unsafe_allow_html=True)
+
+# App header
+st.markdown("<h1 class='main-header'>Duyarlılık Analizi</h1>", unsafe_allow_html=True)
+
+# Shared, read-only fund dataset (one copy per server process)
+funds = get_fund_dataset()
+compounding = get_compounding_table(funds)
+
+# Add logo to the sidebar
+logo_path = "assets/logo.webp"
+if os.path.exists(logo_path):
+    st.sidebar.image(logo_path, use_container_width=True)
+else:
+    st.sidebar.image("https://i.ibb.co/0jQ5YtL/logo.png", width=200)
+
+# Custom navigation
+st.sidebar.markdown("---")  # Add a separator
+st.sidebar.markdown("### Navigation")
+st.sidebar.page_link("main.py", label="🏦 Mevduat-Fon Karşılaştırma")
+st.sidebar.page_link("pages/funds.py", label="📊 Fon Karşılaştırma")
+st.sidebar.page_link("pages/screener.py", label="🔎 Fon Tarama")
+st.sidebar.page_link("pages/sensitivity.py", label="🗺️ Duyarlılık Analizi")
+st.sidebar.page_link("pages/portfolio.py", label="⚖️ Dağılım Optimizasyonu")
+
+# Sidebar inputs
+st.sidebar.markdown("<h2 class='section-header'>Analiz Aralığı</h2>", unsafe_allow_html=True)
+
+investment_amount = st.sidebar.number_input(
+    "Yatırım Tutarı (₺)",
+    min_value=1000,
+    max_value=10000000,
+    value=10000,
+    step=1000,
+    format="%d"
+)
+
+max_duration = st.sidebar.number_input(
+    "En Uzun Süre (Gün)",
+    min_value=2,
+    max_value=3650,
+    value=3650,
+    step=1
+)
+
+rate_range = st.sidebar.slider(
+    "Mevduat Faiz Oranı Aralığı (%)",
+    min_value=0.0,
+    max_value=90.0,
+    value=(30.0, 60.0),
+    step=0.5
+)
+
+rate_steps = st.sidebar.number_input(
+    "Faiz Adım Sayısı",
+    min_value=2,
+    max_value=500,
+    value=200,
+    step=10
+)
+
+st.sidebar.markdown("---")
+
+# Fees and taxes in force today (fees.csv), looked up for every holding
+# period on the map so each duration gets its own bracket
+durations = np.arange(1, max_duration + 1)
+fee_rates = get_fee_schedule().rates(np.arange(len(PRODUCT_TYPES))[:, np.newaxis], durations)
+bsmv_rates = fee_rates["bsmv"] / 100
+fund_costs = (fee_rates["commission"][FUND], fee_rates["stopaj"][FUND])
+
+use_fee_schedule = st.sidebar.checkbox(
+    "Komisyon ve stopajı vadeye göre tarifeden al",
+    value=True,
+    help="Açıkken her süre fees.csv'deki kendi dilimiyle hesaplanır; kapalıyken aşağıdaki oranlar tüm sürelere uygulanır."
+)
+
+
+def product_costs(product, key, commission_label):
+    """(commission, stopaj) of a product: per duration from the schedule, or the sidebar values."""
+    if use_fee_schedule:
+        return fee_rates["commission"][product], fee_rates["stopaj"][product]
+    # Start from the bracket of the longest horizon on the map
+    commission = st.sidebar.number_input(commission_label, min_value=0.0, max_value=5.0, value=float(fee_rates["commission"][product][-1]), step=0.05, key=f"commission_{key}")
+    tax = st.sidebar.number_input("Stopaj Oranı (%)", min_value=0.0, max_value=50.0, value=float(fee_rates["stopaj"][product][-1]), step=0.5, key=f"tax_{key}")
+    return commission, tax
+
+
+# Product costs
+st.sidebar.markdown("<h3 style='color: {}'>Gecelik Mevduat</h3>".format(colors["chrysler_blue"]), unsafe_allow_html=True)
+deposit_costs = product_costs(DEPOSIT, "a", "Mundi Komisyon Oranı (%)")
+
+st.sidebar.markdown("<h3 style='color: {}'>Gecelik Repo</h3>".format(colors["dartmouth_green"]), unsafe_allow_html=True)
+repo_spread = st.sidebar.number_input(
+    "Mevduata Göre Faiz Farkı (puan)",
+    min_value=-20.0,
+    max_value=20.0,
+    value=-0.5,
+    step=0.05,
+    key="spread_b"
+)
+repo_costs = product_costs(REPO, "b", "Komisyon Oranı (%)")
+
+st.sidebar.markdown("<h3 style='color: {}'>Yatırım Fonları</h3>".format(colors["sandy_brown"]), unsafe_allow_html=True)
+selected_display = st.sidebar.selectbox(
+    "Fon Seçiniz",
+    funds.display,
+    index=0
+)
+selected_index = funds.display_index[selected_display]
+selected_ticker = funds.codes[selected_index]
+daily_return = float(funds.returns[selected_index])
+
+# Compute the whole grid in one vectorized batch
+with metrics.span("calculate"):
+    start = time.perf_counter()
+    rates = np.linspace(rate_range[0], rate_range[1], int(rate_steps))
+    net_returns, winner, margin = sensitivity_grid(
+        investment_amount,
+        rates,
+        durations,
+        deposit_costs=deposit_costs,
+        repo_costs=repo_costs,
+        daily_return=daily_return,
+        repo_spread=repo_spread,
+        bsmv_rate=bsmv_rates,
+        fund_factors=compounding.curve(selected_index, max_duration),
+        fund_costs=fund_costs
+    )
+    compute_ms = (time.perf_counter() - start) * 1000
+
+st.markdown("<h2 class='section-header'>En İyi Ürün Haritası</h2>", unsafe_allow_html=True)
+
+def draw_sensitivity_chart():
+    product_colors = [colors["chrysler_blue"], colors["dartmouth_green"], colors["sandy_brown"]]
+    extent = [durations[0], durations[-1], rates[0], rates[-1]]
+
+    # matplotlib is only imported once a chart is actually drawn
+    from matplotlib.colors import ListedColormap
+    from matplotlib.patches import Patch
+
+    fig = figure(figsize=(14, 5))
+    ax_winner, ax_margin = fig.subplots(1, 2)
+
+    # Winning product per cell
+    ax_winner.imshow(
+        winner,
+        cmap=ListedColormap(product_colors),
+        vmin=0,
+        vmax=len(PRODUCTS) - 1,
+        origin='lower',
+        aspect='auto',
+        interpolation='nearest',
+        extent=extent
+    )
+    ax_winner.set_title('Kazanan Ürün')
+    ax_winner.set_xlabel('Süre (Gün)')
+    ax_winner.set_ylabel('Mevduat Faiz Oranı (%)')
+    ax_winner.legend(
+        handles=[Patch(color=color, label=label) for color, label in zip(product_colors, PRODUCTS)],
+        loc='upper right'
+    )
+
+    # Lead of the winner over the runner-up
+    margin_image = ax_margin.imshow(
+        margin,
+        cmap='viridis',
+        origin='lower',
+        aspect='auto',
+        interpolation='nearest',
+        extent=extent
+    )
+    ax_margin.set_title('Kazanan Farkı (₺)')
+    ax_margin.set_xlabel('Süre (Gün)')
+    ax_margin.set_ylabel('Mevduat Faiz Oranı (%)')
+    fig.colorbar(margin_image, ax=ax_margin)
+
+    fig.tight_layout()
+    return fig
+
+# Reuse the rendered heatmaps when every input of the grid is unchanged
+sensitivity_chart_key = chart_key(
+    "sensitivity",
+    amount=investment_amount,
+    max_duration=max_duration,
+    rate_range=rate_range,
+    rate_steps=rate_steps,
+    deposit=deposit_costs,
+    repo=(repo_spread,) + tuple(repo_costs),
+    ticker=selected_ticker,
+    daily_return=daily_return,
+    bsmv_rates=bsmv_rates,
+    fund_costs=fund_costs
+)
+st.image(chart_cache.get_or_render(sensitivity_chart_key, draw_sensitivity_chart), use_container_width=True)
+
+# Share of the grid each product wins
+win_share = np.bincount(winner.ravel(), minlength=len(PRODUCTS)) / winner.size * 100
+share_cols = st.columns(len(PRODUCTS))
+for i, product in enumerate(PRODUCTS):
+    label = f"{product} ({selected_ticker})" if product == "Yatırım Fonu" else product
+    share_cols[i].metric(label, format_turkish_percent(win_share[i], 1))
+
+st.caption(f"{format_turkish(winner.size, 0)} senaryo × {len(PRODUCTS)} ürün {format_turkish(compute_ms, 0)} ms içinde hesaplandı.")
+
+metrics.finish_rerun()
@@ -0,0 +1,220 @@
+"""Monte Carlo projection bands for fund outcomes.
+
+``fund_returns`` assumes a fund repeats its latest daily return every day.
+``simulate_fund_bands`` instead draws many paths of daily returns and reports
+percentile bands of the balance over time, so the chart shows how wide the
+outcomes can be.
+
+Paths are compounded in log space (``log(1 + r)`` summed over days). Two
+return models are supported, both plain dicts so they can be sent to worker
+processes:
+
+- ``normal_model`` / ``fitted_model``: daily log-growth is normal. A sum of k
+  normal days is again normal, so each path only needs one draw per reported
+  point instead of one per day.
+- ``bootstrap_model``: daily returns are resampled from a fund's recorded
+  history (see ``fund_store.FundStore``). Every day is drawn and summed
+  between reported points with ``np.add.reduceat``.
+
+Paths are simulated in chunks of about ``CHUNK_DRAWS`` random numbers. Each
+chunk gets its own child of one ``SeedSequence``, so a seed gives the same
+bands whether the chunks run in this process or in a process pool. A chunk is
+reduced to a fixed-size histogram of log-growth per reported day before the
+next one runs, and the percentiles are interpolated from the summed
+histograms, so memory does not grow with the number of paths.
+"""
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+DEFAULT_PERCENTILES = (5, 50, 95)
+
+# Random numbers drawn per chunk (about 4 MB as float32)
+CHUNK_DRAWS = 1_000_000
+
+# Most days the bands are reported at; longer horizons are sampled evenly
+MAX_POINTS = 250
+
+# Percentiles are read from a histogram of log-growth per reported day,
+# spanning this many standard deviations around the mean
+HISTOGRAM_BINS = 4096
+HISTOGRAM_SPREAD = 8.0
+
+# Most random numbers one simulation may draw; the bootstrap draws every day,
+# so long horizons get fewer paths (see max_paths)
+MAX_DRAWS = 100_000_000
+
+# Fewest recorded returns a bootstrap model may be built from
+MIN_HISTORY = 20
+
+
+def normal_model(daily_return, volatility):
+    """Normal daily log-growth centred on ``daily_return`` (a decimal).
+
+    ``volatility`` is the standard deviation of one day's log-growth. The
+    median path equals the deterministic ``fund_returns`` projection.
+    """
+    if not daily_return > -1:
+        raise ValueError(f"daily return must be above -100%, got {daily_return}")
+    return {"kind": "normal", "mean": float(np.log1p(daily_return)), "std": float(volatility)}
+
+
+def fitted_model(history):
+    """Normal model with the mean and deviation of a return history."""
+    log_growth = np.log1p(_clean_history(history))
+    return {"kind": "normal", "mean": float(log_growth.mean()), "std": float(log_growth.std(ddof=1))}
+
+
+def bootstrap_model(history):
+    """Resample days from a return history (NaN days are dropped)."""
+    return {"kind": "bootstrap", "log_growth": np.log1p(_clean_history(history)).astype(np.float32)}
+
+
+def _clean_history(history):
+    history = np.asarray(history, dtype=float)
+    history = history[~np.isnan(history)]
+    if history.size < MIN_HISTORY:
+        raise ValueError(f"need at least {MIN_HISTORY} recorded returns, got {history.size}")
+    return history
+
+
+def report_days(days, points=MAX_POINTS):
+    """Day indices 0..days at which the bands are reported."""
+    if days + 1 <= points:
+        return np.arange(days + 1)
+    return np.unique(np.linspace(0, days, points).round().astype(np.int64))
+
+
+def max_paths(model, duration_days, points=MAX_POINTS):
+    """Most paths ``model`` can simulate over ``duration_days`` within ``MAX_DRAWS``."""
+    days = report_days(int(duration_days), points)
+    draws_per_path = days.size - 1 if model["kind"] == "normal" else int(days[-1])
+    return max(1, MAX_DRAWS // max(draws_per_path, 1))
+
+
+def _simulate_chunk(task):
+    """Cumulative log-growth at each reported day (rows) of ``paths`` paths (columns)."""
+    seed, paths, days, model = task
+    rng = np.random.default_rng(seed)
+    steps = np.diff(days)
+
+    if model["kind"] == "normal":
+        # Sum of k normal days ~ N(k * mean, k * std^2)
+        increments = rng.standard_normal((paths, steps.size), dtype=np.float32)
+        increments *= np.sqrt(steps) * model["std"]
+        increments += steps * model["mean"]
+    else:
+        table = model["log_growth"]
+        index_type = np.int16 if table.size <= np.iinfo(np.int16).max else np.int32
+        picks = rng.integers(0, table.size, size=(paths, int(days[-1])), dtype=index_type)
+        increments = np.add.reduceat(table[picks], days[:-1], axis=1)
+
+    log_growth = np.zeros((days.size, paths), dtype=np.float32)
+    np.cumsum(increments.T, axis=0, out=log_growth[1:])
+    return log_growth
+
+
+def _histogram_bins(model, days):
+    """Lower edge and bin width of the log-growth histogram at each reported day.
+
+    The range is ``HISTOGRAM_SPREAD`` standard deviations of the sum of k
+    days around its mean (within the bootstrap table's hard bounds);
+    anything beyond it is counted in the edge bins.
+    """
+    if model["kind"] == "normal":
+        mean, std = model["mean"], model["std"]
+        low, high = days * mean - HISTOGRAM_SPREAD * std * np.sqrt(days), days * mean + HISTOGRAM_SPREAD * std * np.sqrt(days)
+    else:
+        table = model["log_growth"].astype(np.float64)
+        mean, std = table.mean(), table.std()
+        low = np.maximum(days * table.min(), days * mean - HISTOGRAM_SPREAD * std * np.sqrt(days))
+        high = np.minimum(days * table.max(), days * mean + HISTOGRAM_SPREAD * std * np.sqrt(days))
+    # Day 0 (and a constant model) has a single value: give it a tiny bin
+    width = np.maximum((high - low) / HISTOGRAM_BINS, 1e-12)
+    return low, width
+
+
+def _summarize_chunk(task):
+    """Histogram counts per reported day, sum of final growth and losing paths of one chunk."""
+    seed, paths, days, model, low, width = task
+    log_growth = _simulate_chunk((seed, paths, days, model))
+
+    bins = (log_growth - low[:, np.newaxis].astype(np.float32)) / width[:, np.newaxis].astype(np.float32)
+    bins = np.clip(bins, 0, HISTOGRAM_BINS - 1, out=bins).astype(np.int32)
+    bins += (np.arange(days.size, dtype=np.int32) * HISTOGRAM_BINS)[:, np.newaxis]
+    counts = np.bincount(bins.ravel(), minlength=days.size * HISTOGRAM_BINS).reshape(days.size, HISTOGRAM_BINS)
+
+    final = log_growth[-1].astype(np.float64)
+    return counts, float(np.exp(final).sum()), int((final < 0).sum())
+
+
+def _histogram_percentiles(counts, low, width, percentiles):
+    """Percentiles (rows) at each reported day (columns), interpolated within a bin."""
+    cumulative = np.cumsum(counts, axis=1)
+    total = cumulative[:, -1]
+    result = np.empty((len(percentiles), counts.shape[0]))
+    rows = np.arange(counts.shape[0])
+    for i, percentile in enumerate(percentiles):
+        rank = percentile / 100 * total
+        # First bin whose cumulative count reaches the rank
+        index = np.minimum((cumulative < rank[:, np.newaxis]).sum(axis=1), counts.shape[1] - 1)
+        before = np.where(index > 0, cumulative[rows, np.maximum(index - 1, 0)], 0)
+        inside = np.maximum(counts[rows, index], 1)
+        result[i] = low + width * (index + np.clip((rank - before) / inside, 0, 1))
+    return result
+
+
+def simulate_fund_bands(investment_amount, duration_days, model, paths=10_000, seed=0,
+                        percentiles=DEFAULT_PERCENTILES, points=MAX_POINTS, workers=None):
+    """Percentile bands of a fund balance over ``paths`` simulated paths.
+
+    ``workers`` > 1 spreads the chunks over a process pool. Returns a dict:
+    ``days`` (reported day indices), ``percentiles``, ``bands`` (balances,
+    shape ``(len(percentiles), len(days))``), ``final`` (the last column of
+    ``bands``), ``mean_final_balance`` and ``loss_probability`` (share of
+    paths ending below the investment).
+    """
+    days = report_days(int(duration_days), points)
+    if days.size < 2:
+        balances = np.full((len(percentiles), 1), float(investment_amount))
+        return {
+            "days": days, "percentiles": tuple(percentiles), "bands": balances, "final": balances[:, -1],
+            "mean_final_balance": float(investment_amount), "loss_probability": 0.0,
+        }
+
+    draws_per_path = days.size - 1 if model["kind"] == "normal" else int(days[-1])
+    chunk_paths = max(1, min(paths, CHUNK_DRAWS // draws_per_path))
+    sizes = [min(chunk_paths, paths - start) for start in range(0, paths, chunk_paths)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    low, width = _histogram_bins(model, days)
+    tasks = [(child, size, days, model, low, width) for child, size in zip(seeds, sizes)]
+
+    # Chunks are reduced to histogram counts as they finish, so memory stays
+    # at one chunk whatever the number of paths
+    counts = np.zeros((days.size, HISTOGRAM_BINS), dtype=np.int64)
+    growth_sum = 0.0
+    losses = 0
+    if workers and workers > 1 and len(tasks) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            summaries = pool.map(_summarize_chunk, tasks)
+            for chunk_counts, chunk_growth, chunk_losses in summaries:
+                counts += chunk_counts
+                growth_sum += chunk_growth
+                losses += chunk_losses
+    else:
+        for task in tasks:
+            chunk_counts, chunk_growth, chunk_losses = _summarize_chunk(task)
+            counts += chunk_counts
+            growth_sum += chunk_growth
+            losses += chunk_losses
+
+    # exp is monotonic, so percentiles can be taken in log space
+    bands = investment_amount * np.exp(_histogram_percentiles(counts, low, width, percentiles))
+    return {
+        "days": days,
+        "percentiles": tuple(percentiles),
+        "bands": bands,
+        "final": bands[:, -1],
+        "mean_final_balance": float(investment_amount * growth_sum / paths),
+        "loss_probability": losses / paths,
+    }
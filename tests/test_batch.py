@@ -0,0 +1,42 @@
+"""Batch rows are checked with the API's rules before they are priced.
+
+    python -m pytest tests
+"""
+import io
+import os
+import sys
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+import numpy as np
+import pandas as pd
+
+from batch import price_scenarios
+from fees import get_fee_schedule
+
+SCENARIOS = """amount,days,fund,deposit_rate
+100000,30,HVT,
+1000,,HVT,
+-5,30,HVT,
+1000,30.5,HVT,
+1000,90,,
+1000,90,HVT,120
+"""
+
+
+def test_invalid_rows_get_an_error_instead_of_numbers():
+    scenarios = pd.read_csv(io.StringIO(SCENARIOS), dtype={"fund": str})
+    funds = pd.Series([0.003], index=["HVT"])
+    priced = price_scenarios(scenarios, funds, get_fee_schedule(os.path.join(REPO_ROOT, "fees.csv")))
+
+    assert priced["error"].isna().tolist() == [True, False, False, False, False, False]
+    assert priced["best"].tolist()[0] == "fund"
+    assert priced["best"].iloc[1:].isna().all()
+    assert priced.loc[1:, "deposit_net_return"].isna().all()
+    assert priced["error"][5] == "deposit_rate must be between 0.0 and 90.0"
+
+    # days stays a whole number despite the empty cell
+    assert priced["days"].dtype == "Int64"
+    assert priced["days"].tolist()[:3] == [30, pd.NA, 30]
+    assert np.isfinite(priced["deposit_net_return"][0])
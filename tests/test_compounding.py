@@ -0,0 +1,52 @@
+"""A synced compounding table keeps its factors when another sync follows.
+
+    python -m pytest tests
+"""
+import os
+import sys
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+import numpy as np
+
+from compounding import CompoundingTable
+
+
+def test_sync_matches_np_power(tmp_path):
+    table = CompoundingTable(str(tmp_path), max_days=30)
+    table.sync(["A", "B"], [0.001, np.nan])
+    assert table.at(0, 30) == np.power(1.001, 30)
+    assert np.isnan(table.at(1, 30))
+    np.testing.assert_array_equal(table.curve(0, 10), np.power(1.001, np.arange(11)))
+
+
+def test_later_sync_leaves_earlier_table_alone(tmp_path):
+    first = CompoundingTable(str(tmp_path), max_days=365)
+    first.sync(["X", "Y"], [0.001, 0.002])
+    before = first.at(0, 365)
+
+    second = CompoundingTable(str(tmp_path), max_days=365)
+    stats = second.sync(["X", "Y", "Z"], [0.003, 0.002, 0.0005])
+
+    assert stats == {"funds": 3, "appended": 1, "recomputed": 1}
+    assert first.at(0, 365) == before
+    assert second.at(0, 365) == np.power(1.003, 365)
+    assert second.at(1, 365) == np.power(1.002, 365)
+    assert second.at(2, 365) == np.power(1.0005, 365)
+
+
+def test_unchanged_sync_writes_nothing(tmp_path):
+    CompoundingTable(str(tmp_path), max_days=30).sync(["A"], [0.001])
+    files = sorted(os.listdir(tmp_path))
+    stats = CompoundingTable(str(tmp_path), max_days=30).sync(["A"], [0.001])
+    assert stats["appended"] == stats["recomputed"] == 0
+    assert sorted(os.listdir(tmp_path)) == files
+
+
+def test_keeps_current_and_previous_file(tmp_path):
+    for rate in (0.001, 0.002, 0.003):
+        table = CompoundingTable(str(tmp_path), max_days=30)
+        table.sync(["A"], [rate])
+    assert len([entry for entry in os.listdir(tmp_path) if entry.endswith(".f8")]) == 2
+    assert CompoundingTable(str(tmp_path), max_days=30).factors[0, 30] == np.power(1.003, 30)
@@ -0,0 +1,96 @@
+"""fetch against a local HTTP stub: disk copy, conditional requests and fallbacks.
+
+    python -m pytest tests
+"""
+import http.server
+import os
+import sys
+import threading
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+import pytest
+import requests
+
+from fetch import fetch
+
+BODY = b"Fon Kodu,Fon Ad\xc4\xb1,Tarih,De\xc4\x9fi\xc5\x9fim\nHVT,H FONU,16.05.2025,0.0014\n"
+ETAG = '"v1"'
+
+
+class EtagHandler(http.server.BaseHTTPRequestHandler):
+    """Serves BODY with an ETag and answers a matching If-None-Match with 304."""
+
+    requests_seen = []
+
+    def do_GET(self):
+        self.requests_seen.append(dict(self.headers))
+        if self.headers.get("If-None-Match") == ETAG:
+            self.send_response(304)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("ETag", ETAG)
+        self.send_header("Content-Length", str(len(BODY)))
+        self.end_headers()
+        self.wfile.write(BODY)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    EtagHandler.requests_seen = []
+    stub = http.server.ThreadingHTTPServer(("127.0.0.1", 0), EtagHandler)
+    threading.Thread(target=stub.serve_forever, daemon=True).start()
+    yield stub
+    stub.shutdown()
+    stub.server_close()
+
+
+def url_of(stub):
+    return f"http://127.0.0.1:{stub.server_port}/funds.csv"
+
+
+def test_disk_copy_then_conditional_request(server, tmp_path):
+    url = url_of(server)
+    assert fetch(url, cache_dir=str(tmp_path)) == (BODY, "network")
+
+    # Young enough: served from disk without a request
+    assert fetch(url, cache_dir=str(tmp_path), max_age=3600) == (BODY, "disk")
+    assert len(EtagHandler.requests_seen) == 1
+
+    # Expired: revalidated with the stored ETag and answered with 304
+    assert fetch(url, cache_dir=str(tmp_path), max_age=0) == (BODY, "not_modified")
+    assert EtagHandler.requests_seen[-1].get("If-None-Match") == ETAG
+
+
+def test_stale_copy_when_server_is_down(server, tmp_path):
+    url = url_of(server)
+    fetch(url, cache_dir=str(tmp_path))
+    server.shutdown()
+    server.server_close()
+    assert fetch(url, cache_dir=str(tmp_path), timeout=(0.5, 0.5)) == (BODY, "stale")
+
+
+def test_no_copy_and_no_server_raises(tmp_path):
+    stub = http.server.ThreadingHTTPServer(("127.0.0.1", 0), EtagHandler)
+    url = url_of(stub)
+    stub.server_close()
+    with pytest.raises(requests.RequestException):
+        fetch(url, cache_dir=str(tmp_path), timeout=(0.5, 0.5))
+
+
+def test_background_revalidation_serves_the_copy_at_once(server, tmp_path):
+    url = url_of(server)
+    fetch(url, cache_dir=str(tmp_path))
+    assert fetch(url, cache_dir=str(tmp_path), max_age=0, background=True) == (BODY, "revalidating")
+
+    # The background request revalidates the copy with its ETag
+    deadline = time.monotonic() + 5
+    while len(EtagHandler.requests_seen) < 2 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert EtagHandler.requests_seen[-1].get("If-None-Match") == ETAG
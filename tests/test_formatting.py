@@ -0,0 +1,42 @@
+"""The batch formatters must print every value exactly like the scalar ones.
+
+    python -m pytest tests
+"""
+import os
+import sys
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+import numpy as np
+import pytest
+
+from formatting import format_turkish, format_turkish_array, format_turkish_percent, format_turkish_percent_array
+
+
+@pytest.mark.parametrize("decimals", [0, 1, 2, 6])
+def test_array_rounds_ties_like_scalar(decimals):
+    # Values halfway between two printable ones, where float products round either way
+    halves = (np.random.default_rng(decimals).integers(-10**7, 10**7, 20_000) + 0.5) / 10**decimals
+    values = np.concatenate([halves, [-284.05, 367.15, 0.125, 2.5, -0.5, 1e-9]])
+    expected = [format_turkish(value, decimals) for value in values]
+    assert format_turkish_array(values, decimals).tolist() == expected
+
+
+def test_array_matches_scalar_on_random_values():
+    values = np.random.default_rng(0).normal(0, 1e6, 20_000)
+    assert format_turkish_array(values).tolist() == [format_turkish(value) for value in values]
+    assert format_turkish_percent_array(values, 1).tolist() == [format_turkish_percent(value, 1) for value in values]
+
+
+def test_known_ties():
+    assert format_turkish_array(np.array([-284.05, 367.15]), 1).tolist() == ["-284,1", "367,1"]
+
+
+def test_missing_values_print_placeholder():
+    values = np.array([np.nan, np.inf, -np.inf, 1.5])
+    expected = ["—", "—", "—", "1,50"]
+    assert [format_turkish(value) for value in values] == expected
+    assert format_turkish_array(values).tolist() == expected
+    assert format_turkish_percent_array(values).tolist() == [format_turkish_percent(value) for value in values]
+    assert format_turkish_percent(np.nan) == "—"
@@ -0,0 +1,30 @@
+"""Değişim values parse the same whatever way the source spells them.
+
+    python -m pytest tests
+"""
+import os
+import sys
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+import numpy as np
+import pandas as pd
+
+from fund_file import RETURN_EMPTY, RETURN_INVALID, RETURN_OK, RETURN_SENTINEL, parse_returns
+
+
+def test_spellings_of_a_return():
+    numbers, status = parse_returns(pd.Series(["0.0013", "0,0013", "0,13%", "1.234,5", "", "abc"], dtype="string"))
+    np.testing.assert_allclose(numbers[:4], [0.0013, 0.0013, 0.0013, 1234.5])
+    assert status.tolist() == [RETURN_OK] * 4 + [RETURN_EMPTY, RETURN_INVALID]
+
+
+def test_sentinel_in_every_spelling():
+    numbers, status = parse_returns(pd.Series(["-1", "-1,0", "-100%", "-100,0%", "-1%"], dtype="string"))
+    assert status.tolist() == [RETURN_SENTINEL] * 4 + [RETURN_OK]
+    assert np.isnan(numbers[:4]).all()
+    assert numbers[4] == -0.01
+
+    numbers, status = parse_returns(pd.Series([-1.0, 0.001]))
+    assert status.tolist() == [RETURN_SENTINEL, RETURN_OK]
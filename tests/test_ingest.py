@@ -0,0 +1,68 @@
+"""Ingest runs against a local directory of snapshots are incremental.
+
+    python -m pytest tests
+"""
+import os
+import sys
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+import numpy as np
+
+from fund_store import FundStore
+from ingest import ingest
+
+HEADER = "Fon Kodu,Fon Adı,Tarih,Değişim\n"
+
+
+def write_snapshot(directory, name, rows):
+    path = directory / name
+    path.write_text(HEADER + "".join(f"{row}\n" for row in rows), encoding="utf-8")
+    return path
+
+
+def test_rerun_is_a_no_op(tmp_path):
+    snapshots = tmp_path / "snapshots"
+    snapshots.mkdir()
+    store_dir = str(tmp_path / "store")
+    write_snapshot(snapshots, "2025-05-15.csv", ["AAL,A FONU,15.05.2025,0.0012", "HVT,H FONU,15.05.2025,0.0013"])
+    write_snapshot(snapshots, "2025-05-16.csv", ["AAL,A FONU,16.05.2025,0.0011", "HVT,H FONU,16.05.2025,0.0014"])
+
+    first = ingest(str(snapshots), store_dir)
+    assert [stats["new"] for stats in first] == [2, 2]
+
+    # Unchanged files are not read again
+    assert ingest(str(snapshots), store_dir) == []
+
+    # Reading a file again writes nothing either
+    again = ingest(str(snapshots / "2025-05-16.csv"), store_dir)
+    assert again[0]["new"] == again[0]["updated"] == 0
+    assert again[0]["unchanged"] == 2
+
+    store = FundStore(store_dir)
+    np.testing.assert_array_equal(store.lookup(["AAL", "HVT"], ["2025-05-16", "2025-05-15"]), [0.0011, 0.0013])
+
+
+def test_changed_file_updates_only_changed_cells(tmp_path):
+    snapshots = tmp_path / "snapshots"
+    snapshots.mkdir()
+    store_dir = str(tmp_path / "store")
+    path = write_snapshot(snapshots, "day.csv", ["AAL,A FONU,16.05.2025,0.0011", "HVT,H FONU,16.05.2025,0.0014"])
+    ingest(str(snapshots), store_dir)
+
+    write_snapshot(snapshots, "day.csv", ["AAL,A FONU,16.05.2025,0.0011", "HVT,H FONU,16.05.2025,0.0015"])
+    os.utime(path, ns=(0, os.stat(path).st_mtime_ns + 1))
+    stats, = ingest(str(snapshots), store_dir)
+    assert (stats["new"], stats["updated"], stats["unchanged"]) == (0, 1, 1)
+    assert FundStore(store_dir).lookup(["HVT"], ["2025-05-16"])[0] == 0.0015
+
+
+def test_sentinel_row_is_skipped(tmp_path):
+    path = write_snapshot(tmp_path, "funds.csv", [
+        "HVT,H FONU,16.05.2025,0.0014",
+        "TP2,T FONU,16.05.2025,-1",
+    ])
+    stats, = ingest(str(path), str(tmp_path / "store"))
+    assert (stats["new"], stats["skipped"]) == (1, 1)
+    assert np.isnan(FundStore(str(tmp_path / "store")).lookup(["TP2"], ["2025-05-16"])[0])